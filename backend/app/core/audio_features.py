@@ -0,0 +1,177 @@
+"""
+Streaming audio analysis for the `audio_features` table.
+
+ffmpeg decodes the source's audio to 16 kHz mono 16-bit PCM on a pipe. The
+pipe is read into one preallocated buffer of a fixed number of analysis
+frames at a time, so memory stays constant however long the file is, and
+each block is analysed with whole-array NumPy operations:
+
+- rms_db: RMS loudness of the frame in dBFS
+- peak_db: peak sample level of the frame in dBFS
+- is_silent: rms_db below the silence threshold
+
+Levels are floored at FLOOR_DB, so digital silence stays a finite number.
+"""
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+import numpy as np
+
+from .config import settings
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FULL_SCALE = 32768.0
+FLOOR_DB = -100.0
+# What ffmpeg reports when `-map 0:a:0?` matched nothing
+NO_AUDIO_MESSAGE = "does not contain any stream"
+
+
+@dataclass
+class FeatureBlock:
+    """Features of consecutive analysis frames, one array entry per frame."""
+    timestamp: np.ndarray
+    duration: np.ndarray
+    rms_db: np.ndarray
+    peak_db: np.ndarray
+    is_silent: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+def _to_db(level: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        return np.maximum(20.0 * np.log10(level), FLOOR_DB).astype(np.float32)
+
+
+def analyse_frames(
+    samples: np.ndarray,
+    frame_samples: int,
+    start_sample: int = 0,
+    silence_db: Optional[float] = None
+) -> FeatureBlock:
+    """
+    Compute the features of every frame in a block of samples.
+
+    Args:
+        samples: int16 PCM at SAMPLE_RATE; the last frame may be partial
+        frame_samples: Samples per analysis frame
+        start_sample: Position of the block's first sample in the stream
+        silence_db: Silence threshold (default: AUDIO_SILENCE_DB)
+
+    Returns:
+        FeatureBlock of the block's frames
+    """
+    silence_db = settings.audio_silence_db if silence_db is None else silence_db
+    count = len(samples)
+    frames = -(-count // frame_samples)
+
+    padded = np.zeros(frames * frame_samples, dtype=np.float32)
+    padded[:count] = samples
+    padded /= FULL_SCALE
+    padded = padded.reshape(frames, frame_samples)
+
+    # A partial last frame is averaged over the samples it has
+    lengths = np.full(frames, frame_samples, dtype=np.int64)
+    lengths[-1] = count - (frames - 1) * frame_samples
+
+    rms = np.sqrt(np.einsum("ij,ij->i", padded, padded) / lengths)
+    rms_db = _to_db(rms)
+    starts = start_sample + np.arange(frames, dtype=np.int64) * frame_samples
+    return FeatureBlock(
+        timestamp=starts / SAMPLE_RATE,
+        duration=lengths / SAMPLE_RATE,
+        rms_db=rms_db,
+        peak_db=_to_db(np.maximum(padded.max(axis=1), -padded.min(axis=1))),
+        is_silent=rms_db < silence_db
+    )
+
+
+def _read_into(stream, view: memoryview) -> int:
+    """Fill a buffer from a pipe; returns the bytes read (short only at EOF)."""
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def extract_features(
+    source: str,
+    frame_seconds: Optional[float] = None,
+    block_frames: int = 2048,
+    silence_db: Optional[float] = None,
+    input_options: Optional[Dict[str, Any]] = None,
+    tap: Optional[Callable[[np.ndarray], None]] = None
+) -> Iterator[FeatureBlock]:
+    """
+    Stream the audio of a file and yield its features block by block.
+
+    Args:
+        source: Path or URL of the media
+        frame_seconds: Analysis frame length (default: AUDIO_FRAME_SECONDS)
+        block_frames: Frames decoded and analysed per block
+        silence_db: Silence threshold (default: AUDIO_SILENCE_DB)
+        input_options: Extra ffmpeg input options (e.g. HTTP headers)
+        tap: Called with every block of int16 samples before it is
+             analysed, so other analyses share the decode (the buffer is
+             reused afterwards)
+
+    Yields:
+        FeatureBlock per block, in time order; nothing for a file without
+        audio
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the audio
+    """
+    frame_seconds = frame_seconds or settings.audio_frame_seconds
+    frame_samples = max(1, int(round(frame_seconds * SAMPLE_RATE)))
+
+    args = ["ffmpeg", "-nostdin", "-v", "error"]
+    for key, value in (input_options or {}).items():
+        args += [f"-{key}", str(value)]
+    args += [
+        "-i", source, "-vn", "-map", "0:a:0?",
+        "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1",
+    ]
+    proc = subprocess.Popen(
+        args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    # Drain stderr concurrently so a chatty ffmpeg cannot block on it
+    stderr_chunks: list = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()))
+    drain.start()
+
+    buffer = np.empty(block_frames * frame_samples, dtype=np.int16)
+    view = memoryview(buffer).cast("B")
+    position = 0
+    finished = False
+    try:
+        while True:
+            filled = _read_into(proc.stdout, view) // SAMPLE_WIDTH
+            if filled:
+                if tap is not None:
+                    tap(buffer[:filled])
+                yield analyse_frames(buffer[:filled], frame_samples, position, silence_db)
+                position += filled
+            if filled < len(buffer):
+                finished = True
+                break
+    finally:
+        if not finished:
+            # The consumer stopped early
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+        drain.join()
+
+    if proc.returncode != 0:
+        message = b"".join(stderr_chunks).decode(errors="replace").strip()
+        if position == 0 and NO_AUDIO_MESSAGE in message:
+            return
+        raise RuntimeError(f"ffmpeg could not decode the audio of {source}: {message}")
@@ -0,0 +1,234 @@
+"""
+Parallel chunked rendering of a render plan.
+
+A single ffmpeg encode of a long plan leaves most cores of a worker idle.
+In chunked mode the plan's output timeline is split at source keyframes
+into chunks that are encoded concurrently, each by its own ffmpeg process
+seeking straight to its first keyframe. The video chunks are joined with
+the concat demuxer; audio is cheap to encode, so it is rendered in one
+pass over the whole plan, which keeps it continuous and in sync.
+"""
+import os
+import tempfile
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+import ffmpeg
+
+from . import ffmpeg_async, ffmpeg_progress
+from .config import settings
+from .render_plan import MIN_SEGMENT, RenderPlan, Segment, build_output
+from .render_tiers import EncoderProfile, encoder_profile
+from .smart_cut import scan_keyframes
+
+# Encoder settings for rendered video and audio
+RENDER_ENCODE = {"vcodec": "libx264", "acodec": "aac"}
+
+
+def render_parallelism() -> int:
+    """Configured number of concurrent chunk encodes (0 means one per core)."""
+    return settings.render_parallelism or os.cpu_count() or 1
+
+
+def split_plan(
+    plan: RenderPlan,
+    keyframes: Sequence[float],
+    chunks: int
+) -> List[RenderPlan]:
+    """
+    Split a plan into about `chunks` parts of similar output duration.
+
+    Splits only happen at keyframes inside a segment, so every chunk starts
+    on a keyframe (or on a segment start) and nothing is decoded twice.
+
+    Args:
+        plan: Plan to split
+        keyframes: Sorted source keyframe times
+        chunks: Desired number of chunks
+
+    Returns:
+        Chunk plans in output order; together they cover the whole plan
+    """
+    target = plan.output_duration / max(1, chunks)
+    result: List[RenderPlan] = []
+    current: List[Segment] = []
+    filled = 0.0
+
+    for seg in plan.segments:
+        start = seg.start
+        for k in keyframes:
+            if k <= start or k >= seg.end:
+                continue
+            if filled + (k - start) / seg.speed >= target and len(result) < chunks - 1:
+                current.append(Segment(start, k, seg.speed))
+                result.append(RenderPlan(current))
+                current, filled, start = [], 0.0, k
+        current.append(Segment(start, seg.end, seg.speed))
+        filled += (seg.end - start) / seg.speed
+
+    if current:
+        result.append(RenderPlan(current))
+    return result
+
+
+def exclusive_end(plan: RenderPlan, frame_duration: float) -> RenderPlan:
+    """
+    Pull a chunk's end back by half a frame.
+
+    The next chunk starts on the keyframe at this chunk's end; rounding of
+    the trim bound would otherwise let both chunks encode that frame and
+    shift every later frame (and the audio sync) by one frame.
+
+    Args:
+        plan: Chunk plan
+        frame_duration: Source frame duration in seconds (0 if unknown)
+
+    Returns:
+        The plan with its last segment ending before the boundary frame
+    """
+    last = plan.segments[-1]
+    margin = frame_duration / 2 if frame_duration > 0 else MIN_SEGMENT
+    return RenderPlan(plan.segments[:-1] + [Segment(last.start, last.end - margin, last.speed)])
+
+
+def _seek_options(plan: RenderPlan, input_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Input options that seek to the plan's first frame; copyts keeps the
+    plan's absolute trim times valid after the seek."""
+    return dict(input_options, ss=plan.segments[0].start, copyts=None, start_at_zero=None)
+
+
+def _render_chunk(
+    source: str,
+    plan: RenderPlan,
+    path: str,
+    input_options: Dict[str, Any],
+    threads: int,
+    profile: EncoderProfile
+) -> None:
+    # Chunk processes count against the host's ffmpeg process limit
+    with ffmpeg_async.host_slots.hold():
+        ffmpeg_progress.run(build_output(
+            source,
+            plan,
+            path,
+            has_audio=False,
+            input_options=_seek_options(plan, input_options),
+            output_options={"vcodec": RENDER_ENCODE["vcodec"], "threads": threads, **profile.video_options},
+            max_height=profile.max_height
+        ))
+
+
+def render(
+    source: str,
+    plan: RenderPlan,
+    output_path: str,
+    has_audio: Optional[bool] = None,
+    input_options: Optional[Dict[str, Any]] = None,
+    parallelism: Optional[int] = None,
+    min_chunk_seconds: Optional[float] = None,
+    profile: Optional[EncoderProfile] = None
+) -> int:
+    """
+    Render a plan, in parallel chunks when it is long enough to pay off.
+
+    Args:
+        source: Path or URL of the source video
+        plan: Compiled render plan
+        output_path: File to write
+        has_audio: Whether the source has audio (scanned when None)
+        input_options: Extra ffmpeg input options (e.g. HTTP headers)
+        parallelism: Concurrent chunk encodes (default: RENDER_PARALLELISM)
+        min_chunk_seconds: Shortest chunk worth its own encode
+                           (default: RENDER_CHUNK_MIN_SECONDS)
+        profile: Encoder profile of the render tier (default: final)
+
+    Returns:
+        Number of chunks the video was encoded in
+
+    Raises:
+        ValueError: If the plan has no segments left to render
+    """
+    if not plan.segments:
+        raise ValueError("Render plan removes the whole video")
+
+    input_options = dict(input_options or {})
+    profile = profile or encoder_profile()
+    ffmpeg_progress.expect(plan.output_duration)
+    parallelism = parallelism or render_parallelism()
+    if min_chunk_seconds is None:
+        min_chunk_seconds = settings.render_chunk_min_seconds
+    chunks = min(parallelism, int(plan.output_duration // max(min_chunk_seconds, 1e-3)))
+
+    if chunks < 2:
+        if has_audio is None:
+            has_audio = scan_keyframes(
+                source, plan.segments[0].start, plan.segments[-1].end, input_options
+            ).has_audio
+        ffmpeg_progress.run(build_output(
+            source,
+            plan,
+            output_path,
+            has_audio,
+            _seek_options(plan, input_options),
+            {**RENDER_ENCODE, **profile.video_options},
+            max_height=profile.max_height
+        ))
+        return 1
+
+    scan = scan_keyframes(
+        source, plan.segments[0].start, plan.segments[-1].end, input_options
+    )
+    if has_audio is None:
+        has_audio = scan.has_audio
+    parts = split_plan(plan, scan.keyframes, chunks)
+    # Every chunk but the last ends exclusively at the next one's keyframe
+    encoded = [exclusive_end(part, scan.frame_duration) for part in parts[:-1]] + parts[-1:]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = [os.path.join(temp_dir, f"chunk_{i}.mp4") for i in range(len(parts))]
+        # Each chunk is encoded by its own ffmpeg process; the pool only
+        # launches and waits on them, so threads are enough here. Each
+        # submits in a copy of this context so chunks report job progress
+        threads = max(1, (os.cpu_count() or 1) // len(parts))
+        with ThreadPoolExecutor(max_workers=parallelism) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    _render_chunk, source, part, path, input_options, threads, profile
+                )
+                for part, path in zip(encoded, paths)
+            ]
+            audio_path = None
+            if has_audio:
+                audio_path = os.path.join(temp_dir, "audio.m4a")
+                ffmpeg_progress.run(build_output(
+                    source,
+                    plan,
+                    audio_path,
+                    has_audio=True,
+                    input_options=_seek_options(plan, input_options),
+                    output_options={"acodec": RENDER_ENCODE["acodec"]},
+                    has_video=False
+                ), progress=False)
+            for future in futures:
+                future.result()
+
+        concat_file = os.path.join(temp_dir, "chunks.txt")
+        with open(concat_file, "w") as f:
+            for part, path in zip(parts, paths):
+                # The planned duration, not the probed one, places the next
+                # chunk: the last frame's duration is not always stored
+                f.write(f"file '{path}'\nduration {part.output_duration:.6f}\n")
+
+        streams = [ffmpeg.input(concat_file, format="concat", safe=0).video]
+        if audio_path:
+            streams.append(ffmpeg.input(audio_path).audio)
+        ffmpeg_progress.run(
+            ffmpeg
+            .output(*streams, output_path, c="copy", movflags="+faststart")
+            .overwrite_output(),
+            progress=False,
+            encode=False
+        )
+
+    return len(parts)
@@ -16,6 +16,12 @@ CUT_RANGE = re.compile(
 ADD_TEXT = re.compile(
     r"add text ['\"](?P<text>.+?)['\"] (at|@) (?P<ts>[0-9:\.]+)", re.I
 )
+REMOVE_SILENCES = re.compile(
+    r"\b(remove|cut|trim|delete|strip)\b.*\b(silen(ce|ces|t parts)|dead air|pauses|gaps)\b", re.I
+)
+REMOVE_FILLERS = re.compile(
+    r"\b(remove|cut|trim|delete|strip)\b.*\b(fillers?|filler words|ums?|uhs?)\b", re.I
+)
 
 def match_quick(text: str, video_duration: Optional[float] = None) -> Optional[Dict[str, Any]]:
     """
@@ -64,4 +70,24 @@ def match_quick(text: str, video_duration: Optional[float] = None) -> Optional[D
             "reason": f"Add text '{m['text']}' at {m['ts']}"
         }
     
-    return None 
\ No newline at end of file
+    return None 
+
+def match_silence_removal(text: str) -> Optional[Dict[str, bool]]:
+    """
+    Recognize "remove the silences" / "cut the ums" style commands.
+    
+    These are planned from the audio features and transcript by
+    `app.core.silence_planner` rather than by the LLM.
+    
+    Args:
+        text: The command text to match
+        
+    Returns:
+        {"silences": bool, "fillers": bool} if the command asks for either,
+        None otherwise
+    """
+    silences = bool(REMOVE_SILENCES.search(text))
+    fillers = bool(REMOVE_FILLERS.search(text))
+    if not (silences or fillers):
+        return None
+    return {"silences": silences, "fillers": fillers}
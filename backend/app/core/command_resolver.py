@@ -1,6 +1,7 @@
 import json
 from typing import List, Tuple, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
+import numpy as np
 from openai import OpenAI
 from .models import Transcript
 from .embedding_cache import get_or_create_embeddings
@@ -25,14 +26,17 @@ def semantic_search(query: str, transcript_rows: List[Transcript], top_k: int =
     # Encode the query
     query_embedding = MODEL.encode(query, normalize_embeddings=True)
     
-    # Calculate similarities
-    hits = []
-    for row in transcript_rows:
-        similarity = query_embedding @ row.embedding  # cosine similarity
-        hits.append((row, similarity))
+    if not transcript_rows:
+        return []
+    
+    # Stored embeddings are normalized, so one matrix product gives
+    # cosine similarity for every row
+    matrix = np.vstack([row.embedding for row in transcript_rows])
+    similarities = matrix @ query_embedding
     
     # Return top k results
-    return sorted(hits, key=lambda x: x[1], reverse=True)[:top_k]
+    top = np.argsort(-similarities, kind="stable")[:top_k]
+    return [(transcript_rows[i], float(similarities[i])) for i in top]
 
 async def resolve_command(
     text: str,
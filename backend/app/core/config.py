@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -24,10 +25,125 @@ class Settings(BaseSettings):
     postgres_host: str = Field(..., env="POSTGRES_HOST")
     postgres_port: int = Field(5432, env="POSTGRES_PORT")
     postgres_db: str = Field(..., env="POSTGRES_DB")
-    
+
+    # Read replica settings
+    postgres_replica_dsns: list[str] = Field([], env="POSTGRES_REPLICA_DSNS")
+    replica_read_after_write_window: float = Field(5.0, env="REPLICA_READ_AFTER_WRITE_WINDOW")
+    replica_max_lag: float = Field(1.0, env="REPLICA_MAX_LAG")
+    replica_lag_check_interval: float = Field(1.0, env="REPLICA_LAG_CHECK_INTERVAL")
+
     # Redis settings
     redis_url: str = Field("redis://redis:6379", env="REDIS_URL")
     
+    # Worker queues: relative dequeue weights, job timeouts in seconds and
+    # how many jobs one user may have running at once (0 = no limit)
+    queue_weights: Dict[str, int] = Field(
+        {"interactive": 8, "thumbnails": 4, "export": 2, "backfill": 1},
+        env="QUEUE_WEIGHTS"
+    )
+    queue_job_timeouts: Dict[str, int] = Field(
+        {"interactive": 900, "thumbnails": 900, "export": 4 * 3600, "backfill": 4 * 3600},
+        env="QUEUE_JOB_TIMEOUTS"
+    )
+    fair_share_max_running: int = Field(2, env="FAIR_SHARE_MAX_RUNNING")
+    fair_share_retry_delay: float = Field(1.0, env="FAIR_SHARE_RETRY_DELAY")
+    
+    # Identical job payloads enqueued within this many seconds attach to
+    # the existing job (0 disables deduplication)
+    job_dedup_window: int = Field(600, env="JOB_DEDUP_WINDOW")
+    
+    # Run jobs in a forked work horse (isolated) or in the worker process
+    # itself, which keeps its storage connections alive between jobs
+    worker_fork_jobs: bool = Field(True, env="WORKER_FORK_JOBS")
+    
+    # Process-wide HTTP connection pool for storage and realtime calls
+    http_max_connections: int = Field(20, env="HTTP_MAX_CONNECTIONS")
+    http_keepalive_expiry: float = Field(60.0, env="HTTP_KEEPALIVE_EXPIRY")
+    
+    # Worker media cache
+    media_cache_dir: str = Field("/tmp/cre8rflow/media-cache", env="MEDIA_CACHE_DIR")
+    media_cache_max_bytes: int = Field(20 * 1024 ** 3, env="MEDIA_CACHE_MAX_BYTES")
+    
+    # Audio analysis for audio_features: frame length in seconds and the
+    # RMS level (dBFS) below which a frame counts as silent
+    audio_frame_seconds: float = Field(0.05, env="AUDIO_FRAME_SECONDS")
+    audio_silence_db: float = Field(-40.0, env="AUDIO_SILENCE_DB")
+    
+    # Waveform peak pyramid: samples per bucket of each level (multiples of
+    # the finest) and bits per stored peak (8 or 16)
+    waveform_levels: list[int] = Field([256, 1024, 4096], env="WAVEFORM_LEVELS")
+    waveform_bits: int = Field(8, env="WAVEFORM_BITS")
+    
+    # Probed media info kept in memory per process (entries)
+    media_info_cache_size: int = Field(256, env="MEDIA_INFO_CACHE_SIZE")
+    
+    # Read cut/speed segments over HTTP range requests instead of
+    # downloading the whole source
+    range_fetch_enabled: bool = Field(True, env="RANGE_FETCH_ENABLED")
+    # Lifetime in seconds of the signed URL a range-fetching ffmpeg reads
+    range_fetch_url_ttl: int = Field(3600, env="RANGE_FETCH_URL_TTL")
+    
+    # Frame-accurate cut/trim: copy whole GOPs, re-encode only the edges
+    smart_cut_enabled: bool = Field(True, env="SMART_CUT_ENABLED")
+    
+    # Concurrent ffmpeg/ffprobe processes per host started by the async
+    # helpers (0 = one per CPU), and their timeouts in seconds
+    ffmpeg_max_processes: int = Field(0, env="FFMPEG_MAX_PROCESSES")
+    ffmpeg_slot_dir: str = Field("/tmp/cre8rflow/ffmpeg-slots", env="FFMPEG_SLOT_DIR")
+    ffmpeg_timeout: float = Field(600.0, env="FFMPEG_TIMEOUT")
+    ffprobe_timeout: float = Field(30.0, env="FFPROBE_TIMEOUT")
+    
+    # Rendering backend for single editing actions ("ffmpeg" or "moviepy")
+    render_backend: str = Field("ffmpeg", env="RENDER_BACKEND")
+    
+    # Chunked rendering: concurrent chunk encodes (0 = one per core) and
+    # the shortest chunk worth its own encode, in output seconds
+    render_parallelism: int = Field(0, env="RENDER_PARALLELISM")
+    render_chunk_min_seconds: float = Field(20.0, env="RENDER_CHUNK_MIN_SECONDS")
+    
+    # Render tiers: encoder profiles of quick previews and of final renders
+    # (a max height of 0 keeps the source size), and whether a command's
+    # preview is followed by an automatic final render at lower priority
+    # (otherwise POST /command/export queues it)
+    render_preview_max_height: int = Field(540, env="RENDER_PREVIEW_MAX_HEIGHT")
+    render_preview_preset: str = Field("veryfast", env="RENDER_PREVIEW_PRESET")
+    render_preview_crf: int = Field(30, env="RENDER_PREVIEW_CRF")
+    render_final_max_height: int = Field(0, env="RENDER_FINAL_MAX_HEIGHT")
+    render_final_preset: str = Field("medium", env="RENDER_FINAL_PRESET")
+    render_final_crf: int = Field(18, env="RENDER_FINAL_CRF")
+    render_final_auto: bool = Field(False, env="RENDER_FINAL_AUTO")
+    
+    # Minimum seconds between two progress updates of one render job
+    progress_min_interval: float = Field(0.5, env="PROGRESS_MIN_INTERVAL")
+    
+    # Realtime events are batched over this many seconds; the buffer holds
+    # at most REALTIME_BUFFER_SIZE pending events, and a finishing job waits
+    # at most REALTIME_FLUSH_TIMEOUT seconds for its events to be sent
+    realtime_batch_window: float = Field(0.1, env="REALTIME_BATCH_WINDOW")
+    realtime_buffer_size: int = Field(1000, env="REALTIME_BUFFER_SIZE")
+    realtime_max_batch: int = Field(500, env="REALTIME_MAX_BATCH")
+    realtime_flush_timeout: float = Field(2.0, env="REALTIME_FLUSH_TIMEOUT")
+    
+    # Render result cache: local disk tier and storage tier budgets
+    render_cache_dir: str = Field("/tmp/cre8rflow/render-cache", env="RENDER_CACHE_DIR")
+    render_cache_disk_max_bytes: int = Field(10 * 1024 ** 3, env="RENDER_CACHE_DISK_MAX_BYTES")
+    render_cache_storage_max_bytes: int = Field(100 * 1024 ** 3, env="RENDER_CACHE_STORAGE_MAX_BYTES")
+    
+    # Proxy media made at ingest for previews, thumbnails and transcription:
+    # frame height, keyframe interval in seconds and x264 CRF
+    proxy_enabled: bool = Field(True, env="PROXY_ENABLED")
+    proxy_height: int = Field(540, env="PROXY_HEIGHT")
+    proxy_gop_seconds: float = Field(1.0, env="PROXY_GOP_SECONDS")
+    proxy_crf: int = Field(28, env="PROXY_CRF")
+    
+    # Edit planning
+    cut_snap_tolerance: float = Field(0.75, env="CUT_SNAP_TOLERANCE")
+    
+    # Silence removal: shortest pause worth removing and the room kept on
+    # each side of it, in seconds (the level threshold is AUDIO_SILENCE_DB)
+    silence_min_duration: float = Field(0.6, env="SILENCE_MIN_DURATION")
+    silence_padding: float = Field(0.15, env="SILENCE_PADDING")
+    
     # Rate limiting
     command_rate_limit: int = Field(30, env="COMMAND_RATE_LIMIT")
     
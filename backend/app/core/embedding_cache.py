@@ -2,6 +2,7 @@ from typing import Dict, Optional
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from .models import Transcript
+from .embedding_codec import encode_embedding
 
 # Initialize the embedding model
 MODEL = SentenceTransformer("all-MiniLM-L6-v2")
@@ -35,4 +36,5 @@ def cache_transcript_embeddings(transcript: Transcript) -> None:
         transcript: The transcript to cache embeddings for
     """
     embedding = get_or_create_embeddings(transcript.sentence)
-    transcript.embedding = embedding 
\ No newline at end of file
+    transcript.embedding = embedding
+    transcript.embedding_f32 = encode_embedding(embedding) 
\ No newline at end of file
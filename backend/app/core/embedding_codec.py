@@ -0,0 +1,81 @@
+"""
+Compact binary codec for sentence embeddings.
+
+Embeddings are stored as packed little-endian float32 (`bytea` in Postgres)
+instead of `float[]`, so asyncpg hands us raw bytes and NumPy can view them
+without building a Python float object per dimension.
+"""
+from typing import Iterable, Optional, Sequence
+import numpy as np
+
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+
+def encode_embedding(vector: Iterable[float]) -> bytes:
+    """
+    Pack an embedding vector into little-endian float32 bytes.
+    
+    Args:
+        vector: Embedding as a NumPy array or sequence of floats
+        
+    Returns:
+        Packed bytes, 4 bytes per dimension
+    """
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def decode_embedding(data: bytes) -> np.ndarray:
+    """
+    View packed bytes as a float32 vector without copying.
+    
+    Args:
+        data: Bytes produced by `encode_embedding`
+        
+    Returns:
+        Read-only 1-D float32 array backed by `data`
+    """
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE)
+
+
+def decode_matrix(data: bytes, dim: Optional[int] = None, rows: Optional[int] = None) -> np.ndarray:
+    """
+    View a concatenation of packed embeddings as a 2-D matrix without copying.
+    
+    Args:
+        data: Concatenated bytes of equally sized embeddings
+        dim: Embedding dimension; inferred from `rows` if omitted
+        rows: Number of embeddings in `data`
+        
+    Returns:
+        Read-only (rows, dim) float32 array backed by `data`
+        
+    Raises:
+        ValueError: If neither `dim` nor `rows` is given or the sizes disagree
+    """
+    flat = np.frombuffer(data, dtype=EMBEDDING_DTYPE)
+    if dim is None:
+        if not rows:
+            raise ValueError("decode_matrix needs either dim or rows")
+        dim = flat.size // rows
+    if dim == 0 or flat.size % dim:
+        raise ValueError(f"Cannot reshape {flat.size} floats into rows of {dim}")
+    return flat.reshape(-1, dim)
+
+
+def stack_embeddings(blobs: Sequence[bytes]) -> np.ndarray:
+    """
+    Build a contiguous matrix from per-row packed embeddings.
+    
+    This costs one `bytes.join` copy; prefer fetching a pre-concatenated
+    buffer (see `app.services.embeddings.fetch_embedding_matrix`) when the
+    rows come straight from the database.
+    
+    Args:
+        blobs: Packed embeddings, all of the same dimension
+        
+    Returns:
+        (len(blobs), dim) float32 array
+    """
+    if not blobs:
+        return np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+    return decode_matrix(b"".join(blobs), rows=len(blobs))
@@ -0,0 +1,159 @@
+"""
+Non-blocking ffmpeg and ffprobe runs for the API event loop.
+
+ffmpeg-python's `.run()` and `ffmpeg.probe` block the calling thread for the
+whole encode, which freezes every request served by the same event loop.
+`run_ffmpeg` and `probe` start the binary with
+`asyncio.create_subprocess_exec` instead and await its exit.
+
+Each run first takes one of FFMPEG_MAX_PROCESSES slots shared by all
+processes on the host (an `flock`ed slot file, as the media cache locks its
+entries), so API workers together never start more encodes than the host
+has cores for; the chunk encodes of a chunked render, which run in worker
+threads, take the same slots with `HostSlots.hold`. A run that exceeds
+its timeout, or whose task is cancelled (for example because the client
+went away), kills its child process before the error propagates.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+import ffmpeg
+
+from .config import settings
+
+# How often a run waiting for a slot checks again
+SLOT_POLL_SECONDS = 0.05
+
+
+class HostSlots:
+    """
+    Counting semaphore shared by every process on the host.
+
+    Slot i is held while an exclusive `flock` on `slot-i` in `directory` is
+    held; the kernel releases it if the holder dies.
+    """
+
+    def __init__(self, directory: str, slots: int):
+        self.directory = directory
+        self.slots = max(1, slots)
+
+    def _try_lock(self) -> Optional[Tuple[int, int]]:
+        """Lock a free slot without waiting; (slot, fd), or None if all are held."""
+        os.makedirs(self.directory, exist_ok=True)
+        for i in range(self.slots):
+            fd = os.open(
+                os.path.join(self.directory, f"slot-{i}"), os.O_CREAT | os.O_RDWR, 0o644
+            )
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return i, fd
+        return None
+
+    @staticmethod
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[int]:
+        """Wait for a free slot and hold it for the block."""
+        locked = self._try_lock()
+        while locked is None:
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+            locked = self._try_lock()
+        i, fd = locked
+        try:
+            yield i
+        finally:
+            self._unlock(fd)
+
+    @contextmanager
+    def hold(self) -> Iterator[int]:
+        """Blocking `acquire`, for ffmpeg runs started from worker threads."""
+        locked = self._try_lock()
+        while locked is None:
+            time.sleep(SLOT_POLL_SECONDS)
+            locked = self._try_lock()
+        i, fd = locked
+        try:
+            yield i
+        finally:
+            self._unlock(fd)
+
+
+host_slots = HostSlots(
+    settings.ffmpeg_slot_dir, settings.ffmpeg_max_processes or os.cpu_count() or 1
+)
+
+
+async def _communicate(args: Sequence[str], timeout: Optional[float]) -> Tuple[int, bytes, bytes]:
+    """Run a command in a host slot; kill it on timeout or cancellation."""
+    async with host_slots.acquire():
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout)
+        except BaseException:
+            # Timed out or cancelled: never leave the encode running
+            if proc.returncode is None:
+                proc.kill()
+            await asyncio.shield(proc.wait())
+            raise
+        return proc.returncode, out, err
+
+
+async def run_ffmpeg(stream, timeout: Optional[float] = None) -> Tuple[bytes, bytes]:
+    """
+    Run an ffmpeg-python output without blocking the event loop.
+
+    Args:
+        stream: ffmpeg-python output node
+        timeout: Seconds before the run is killed (default: FFMPEG_TIMEOUT)
+
+    Returns:
+        Tuple of (stdout, stderr)
+
+    Raises:
+        ffmpeg.Error: If ffmpeg exits with an error
+        asyncio.TimeoutError: If the run took longer than `timeout`
+    """
+    args: List[str] = stream.compile()
+    timeout = settings.ffmpeg_timeout if timeout is None else timeout
+    returncode, out, err = await _communicate(args, timeout)
+    if returncode != 0:
+        raise ffmpeg.Error("ffmpeg", out, err)
+    return out, err
+
+
+async def probe(path: str, timeout: Optional[float] = None) -> dict:
+    """
+    Async counterpart of `ffmpeg.probe`.
+
+    Args:
+        path: Path or URL of the media
+        timeout: Seconds before ffprobe is killed (default: FFPROBE_TIMEOUT)
+
+    Returns:
+        ffprobe's format and stream information as a dict
+
+    Raises:
+        ffmpeg.Error: If ffprobe exits with an error
+        asyncio.TimeoutError: If ffprobe took longer than `timeout`
+    """
+    args = ["ffprobe", "-show_format", "-show_streams", "-of", "json", path]
+    timeout = settings.ffprobe_timeout if timeout is None else timeout
+    returncode, out, err = await _communicate(args, timeout)
+    if returncode != 0:
+        raise ffmpeg.Error("ffprobe", out, err)
+    return json.loads(out.decode("utf-8"))
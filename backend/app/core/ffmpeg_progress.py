@@ -0,0 +1,186 @@
+"""
+Live progress of ffmpeg runs.
+
+`run` replaces ffmpeg-python's `.run(quiet=True)`: it asks ffmpeg for its
+machine-readable `-progress` stream and feeds the output position of every
+update to the job's `JobProgress`, if one is active. A job may be rendered
+by several ffmpeg processes (smart cut pieces, parallel chunks), so the
+tracker sums their output seconds against the job's expected output
+duration and publishes a throttled percentage. The encode speed of each
+run (in x realtime) is recorded as the `ffmpeg_encode_speed` metric.
+"""
+import contextvars
+import itertools
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional
+import ffmpeg
+
+from . import metrics
+from .config import settings
+
+# Distinguishes the runs of one job (process ids and object ids get reused)
+_run_ids = itertools.count()
+
+_current: contextvars.ContextVar[Optional["JobProgress"]] = contextvars.ContextVar(
+    "ffmpeg_job_progress", default=None
+)
+
+
+def parse_progress(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    Group ffmpeg `-progress` output into one dict per update.
+
+    Args:
+        lines: Lines of key=value pairs; every update ends with `progress=`
+
+    Yields:
+        The key/value pairs of each update
+    """
+    block: Dict[str, str] = {}
+    for line in lines:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value.strip()
+        if key == "progress":
+            yield block
+            block = {}
+
+
+def out_seconds(block: Dict[str, str]) -> Optional[float]:
+    """Output position of an update in seconds, if ffmpeg knows it yet."""
+    # out_time_ms is in microseconds too, despite its name
+    for key in ("out_time_us", "out_time_ms"):
+        try:
+            return max(0.0, int(block[key]) / 1e6)
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def encode_speed(block: Dict[str, str]) -> Optional[float]:
+    """Encode speed of an update in x realtime, if ffmpeg reports one."""
+    try:
+        return float(block.get("speed", "").rstrip("x"))
+    except ValueError:
+        return None
+
+
+class JobProgress:
+    """
+    Percent complete of one job, published at most once per `min_interval`.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[float], None],
+        total: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.publish = publish
+        self.total = total
+        self.min_interval = (
+            settings.progress_min_interval if min_interval is None else min_interval
+        )
+        self.clock = clock
+        self._done: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._last_sent: Optional[float] = None
+        self._last_percent: Optional[float] = None
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Percent complete, or None while the expected duration is unknown."""
+        if not self.total:
+            return None
+        return min(100.0, 100.0 * sum(self._done.values()) / self.total)
+
+    def update(self, run_id: int, seconds: float) -> None:
+        """
+        Record how far one ffmpeg run has got and publish if due.
+
+        Args:
+            run_id: Identifies the run within the job
+            seconds: Output seconds the run has written
+        """
+        with self._lock:
+            self._done[run_id] = seconds
+            percent = self.percent
+            now = self.clock()
+            if percent is None or percent == self._last_percent:
+                return
+            if self._last_sent is not None and now - self._last_sent < self.min_interval:
+                return
+            self._last_sent = now
+            self._last_percent = percent
+
+        try:
+            self.publish(percent)
+        except Exception:
+            # Progress is best effort; it must never fail the render
+            pass
+
+    @contextmanager
+    def activate(self) -> Iterator["JobProgress"]:
+        """Report the ffmpeg runs made inside the block to this tracker."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def expect(seconds: Optional[float]) -> None:
+    """Set the expected output duration of the active job, if not yet known."""
+    tracker = _current.get()
+    if tracker is not None and not tracker.total and seconds:
+        tracker.total = seconds
+
+
+def run(stream, progress: bool = True, encode: bool = True) -> None:
+    """
+    Run an ffmpeg-python output quietly, reporting its progress.
+
+    stdout carries the progress stream, so the output must go to a file.
+
+    Args:
+        stream: ffmpeg-python output node
+        progress: Count this run's output towards the active job's progress
+        encode: Record the run's speed as `ffmpeg_encode_speed` (off for
+                stream copies, whose speed says nothing about encoding)
+
+    Raises:
+        ffmpeg.Error: If ffmpeg exits with an error
+    """
+    args = stream.compile()
+    args = [args[0], "-progress", "pipe:1", "-nostats", *args[1:]]
+    proc = subprocess.Popen(
+        args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    # Drain stderr concurrently so a chatty ffmpeg cannot block on it
+    stderr_chunks: list = []
+    drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()))
+    drain.start()
+
+    tracker = _current.get() if progress else None
+    run_id = next(_run_ids)
+    speed = None
+    lines = (line.decode(errors="replace") for line in proc.stdout)
+    for block in parse_progress(lines):
+        seconds = out_seconds(block)
+        if tracker is not None and seconds is not None:
+            tracker.update(run_id, seconds)
+        speed = encode_speed(block) or speed
+
+    proc.wait()
+    drain.join()
+
+    if proc.returncode != 0:
+        raise ffmpeg.Error("ffmpeg", None, b"".join(stderr_chunks))
+    if encode and speed:
+        metrics.observe("ffmpeg_encode_speed", speed)
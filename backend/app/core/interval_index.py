@@ -0,0 +1,88 @@
+"""
+Static interval index over [start, end) time ranges.
+
+Built once per project snapshot from start/end columns. Intervals are kept
+sorted by start alongside a running maximum of their ends, which bounds the
+slice of candidates for point and overlap queries with two binary searches.
+For the mostly non-overlapping data we index (sentences, scenes, clips) the
+candidate slice is the answer, so queries are logarithmic.
+"""
+from typing import Optional, Sequence
+import numpy as np
+
+
+class IntervalIndex:
+    """Sorted-array interval index answering point, overlap and boundary queries."""
+
+    def __init__(self, starts: Sequence[float], ends: Sequence[float]):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        if starts.shape != ends.shape:
+            raise ValueError("starts and ends must have the same length")
+
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self.max_end = (
+            np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+        )
+        self.boundaries = np.unique(np.concatenate([starts, ends]))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _candidates(self, lo: float, hi: float, hi_side: str) -> np.ndarray:
+        """Sorted positions whose interval may intersect (lo, hi)."""
+        stop = np.searchsorted(self.starts, hi, side=hi_side)
+        first = np.searchsorted(self.max_end, lo, side="right")
+        if first >= stop:
+            return np.empty(0, dtype=np.intp)
+        positions = np.arange(first, stop)
+        return positions[self.ends[first:stop] > lo]
+
+    def containing(self, t: float) -> np.ndarray:
+        """
+        Find intervals with start <= t < end.
+
+        Args:
+            t: Time in seconds
+
+        Returns:
+            Original indices of the matching intervals, ordered by start
+        """
+        return self.order[self._candidates(t, t, "right")]
+
+    def overlapping(self, start: float, end: float) -> np.ndarray:
+        """
+        Find intervals that overlap [start, end).
+
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds
+
+        Returns:
+            Original indices of the matching intervals, ordered by start
+        """
+        return self.order[self._candidates(start, end, "left")]
+
+    def nearest_boundary(self, t: float, max_distance: Optional[float] = None) -> Optional[float]:
+        """
+        Find the interval start or end closest to t.
+
+        Args:
+            t: Time in seconds
+            max_distance: Ignore boundaries further away than this
+
+        Returns:
+            The closest boundary, or None if there is none in range
+        """
+        if not len(self.boundaries):
+            return None
+
+        pos = int(np.searchsorted(self.boundaries, t))
+        neighbours = self.boundaries[max(pos - 1, 0):pos + 1]
+        best = float(neighbours[np.argmin(np.abs(neighbours - t))])
+
+        if max_distance is not None and abs(best - t) > max_distance:
+            return None
+        return best
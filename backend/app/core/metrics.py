@@ -0,0 +1,81 @@
+"""
+Process-shared operational metrics.
+
+API processes and RQ work horses are separate processes, so counters are
+kept in one Redis hash rather than in memory. Recording a metric must never
+fail a request or a job: Redis errors are swallowed.
+"""
+from typing import Dict, Optional
+import redis
+
+from .config import settings
+
+METRICS_KEY = "cre8rflow:metrics"
+
+_redis: Optional[redis.Redis] = None
+
+
+def _conn() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(settings.redis_url)
+    return _redis
+
+
+def incr(name: str, amount: float = 1) -> None:
+    """
+    Increment a counter.
+    
+    Args:
+        name: Metric name, e.g. "media_cache_hits"
+        amount: Amount to add
+    """
+    try:
+        _conn().hincrbyfloat(METRICS_KEY, name, amount)
+    except redis.RedisError:
+        pass
+
+
+def observe(name: str, value: float) -> None:
+    """
+    Record one observation of a summary metric (kept as _sum and _count).
+    
+    Args:
+        name: Metric name, e.g. "ffmpeg_encode_speed"
+        value: Observed value
+    """
+    try:
+        pipe = _conn().pipeline(transaction=False)
+        pipe.hincrbyfloat(METRICS_KEY, f"{name}_sum", value)
+        pipe.hincrbyfloat(METRICS_KEY, f"{name}_count", 1)
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def set_gauge(name: str, value: float) -> None:
+    """
+    Set a gauge to its current value.
+    
+    Args:
+        name: Metric name
+        value: Current value
+    """
+    try:
+        _conn().hset(METRICS_KEY, name, value)
+    except redis.RedisError:
+        pass
+
+
+def snapshot() -> Dict[str, float]:
+    """
+    Read all recorded metrics.
+    
+    Returns:
+        Dictionary of metric name to value (empty if Redis is unavailable)
+    """
+    try:
+        raw = _conn().hgetall(METRICS_KEY)
+    except redis.RedisError:
+        return {}
+    return {k.decode(): float(v) for k, v in raw.items()}
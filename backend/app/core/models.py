@@ -4,7 +4,7 @@ from uuid import UUID, uuid4
 from sqlmodel import SQLModel, Field, Relationship
 from pydantic import BaseModel, ConfigDict
 import numpy as np
-from sqlalchemy import Column, Float, ForeignKey
+from sqlalchemy import Column, Float, ForeignKey, LargeBinary
 from sqlalchemy.dialects.postgresql import ARRAY
 
 class VideoBase(SQLModel):
@@ -39,6 +39,7 @@ class Transcript(SQLModel, table=True):
     start_time: float
     end_time: float
     embedding: List[float] = Field(sa_column=Column(ARRAY(Float)))
+    embedding_f32: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
     video: Video = Relationship(back_populates="transcripts")
 
     @classmethod
@@ -0,0 +1,69 @@
+"""
+Proxy media for previews.
+
+Uploads are often 4K camera files with long GOPs, which makes every
+preview, thumbnail pass and seek decode far more than it shows. At ingest a
+proxy is made next to the original: scaled down to PROXY_HEIGHT, with a
+keyframe every PROXY_GOP_SECONDS so seeks land close to their target.
+
+Proxies keep the original's timeline (same start, same frame timestamps,
+same audio), so operations planned against a proxy apply unchanged to the
+original; final exports always read the original.
+"""
+from typing import Any, Dict, Optional
+import ffmpeg
+
+from . import ffmpeg_progress
+from .config import settings
+
+
+def build_proxy(
+    source: str,
+    output_path: str,
+    height: Optional[int] = None,
+    gop_seconds: Optional[float] = None,
+    crf: Optional[int] = None,
+    input_options: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Encode a low-resolution, short-GOP proxy of a video.
+
+    Args:
+        source: Path or URL of the original
+        output_path: File to write
+        height: Maximum frame height (default: PROXY_HEIGHT); smaller
+                sources keep their size
+        gop_seconds: Keyframe interval (default: PROXY_GOP_SECONDS)
+        crf: x264 quality (default: PROXY_CRF)
+        input_options: Extra ffmpeg input options (e.g. HTTP headers)
+
+    Returns:
+        Path of the proxy
+    """
+    height = height or settings.proxy_height
+    gop_seconds = gop_seconds or settings.proxy_gop_seconds
+    crf = settings.proxy_crf if crf is None else crf
+
+    stream = ffmpeg.input(source, **(input_options or {}))
+    # -2 keeps the aspect ratio with an even width, as yuv420p needs
+    video = stream.video.filter("scale", -2, f"min(ih,{height})")
+    ffmpeg_progress.run(
+        ffmpeg
+        .output(
+            video,
+            output_path,
+            vcodec="libx264",
+            preset="veryfast",
+            crf=crf,
+            pix_fmt="yuv420p",
+            force_key_frames=f"expr:gte(t,n_forced*{gop_seconds})",
+            # Keep every frame's timestamp so proxy times are original times
+            fps_mode="passthrough",
+            acodec="aac",
+            movflags="+faststart",
+            # Optional map, so sources without audio still work
+            **{"map": "0:a?"}
+        )
+        .overwrite_output()
+    )
+    return output_path
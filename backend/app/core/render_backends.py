@@ -0,0 +1,295 @@
+"""
+Render backends for single editing actions.
+
+`video_editor.apply_command` hands the resolved action to a backend chosen
+by the RENDER_BACKEND setting. The ffmpeg backend expresses every action as
+one native filtergraph, so frames never pass through Python; the moviepy
+backend is the original implementation and is kept for comparison (it only
+supports cut and volume).
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+import ffmpeg
+
+from . import chunked_render, ffmpeg_progress
+from .config import settings
+from .render_plan import RenderPlan, build_output, compile_plan
+
+# Returns ffprobe output for a source path
+Probe = Callable[[str], Dict[str, Any]]
+
+# Zoom factor used when an action does not give one
+DEFAULT_ZOOM_FACTOR = 1.5
+
+# How long a caption stays on screen when the action gives no end
+DEFAULT_CAPTION_SECONDS = 3.0
+
+# Same codecs moviepy's write_videofile was called with
+VIDEO_ENCODE = {"vcodec": "libx264", "acodec": "aac"}
+
+
+def _has_audio(media_info: Dict[str, Any]) -> bool:
+    return any(s["codec_type"] == "audio" for s in media_info["streams"])
+
+
+def _time_window(start: Optional[float], end: Optional[float]) -> Optional[str]:
+    """Timeline `enable` expression for [start, end], or None for always."""
+    if start is None and end is None:
+        return None
+    if end is None:
+        return f"gte(t,{start})"
+    return f"between(t,{start or 0},{end})"
+
+
+class RenderBackend(ABC):
+    """Renders one resolved action from a source file to an output file."""
+
+    name = ""
+
+    @abstractmethod
+    def render(
+        self,
+        source: str,
+        action: Dict[str, Any],
+        output_path: str,
+        media_info: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Render an action.
+
+        Args:
+            source: Path of the source video
+            action: Resolved action (action, start_sec, end_sec, factor, text)
+            output_path: File to write
+            media_info: ffprobe output for the source, if already known
+
+        Returns:
+            Path of the rendered file
+
+        Raises:
+            ValueError: If the action is not supported
+        """
+
+
+class MoviePyBackend(RenderBackend):
+    """Decodes frames into Python with moviepy and re-encodes them."""
+
+    name = "moviepy"
+
+    SUPPORTED_ACTIONS = {"cut", "volume"}
+
+    def render(
+        self,
+        source: str,
+        action: Dict[str, Any],
+        output_path: str,
+        media_info: Optional[Dict[str, Any]] = None
+    ) -> str:
+        if action["action"] not in self.SUPPORTED_ACTIONS:
+            raise ValueError(
+                f"Unsupported action type for the moviepy backend: {action['action']} "
+                "(use RENDER_BACKEND=ffmpeg)"
+            )
+
+        from moviepy.editor import VideoFileClip, concatenate_videoclips
+
+        clip = VideoFileClip(source)
+
+        if action["action"] == "cut":
+            start, end = action["start_sec"], action["end_sec"]
+            processed = concatenate_videoclips([
+                clip.subclip(0, start),
+                clip.subclip(end)
+            ])
+        else:
+            processed = clip.volumex(action["factor"])
+
+        processed.write_videofile(output_path, codec="libx264", audio_codec="aac")
+        processed.close()
+        clip.close()
+
+        return output_path
+
+
+class FFmpegBackend(RenderBackend):
+    """Renders each action as a single native ffmpeg filtergraph."""
+
+    name = "ffmpeg"
+
+    def __init__(self, probe: Optional[Probe] = None):
+        """
+        Args:
+            probe: Returns ffprobe output for a source when the caller gives
+                no media_info (default: a plain `ffmpeg.probe`)
+        """
+        self.probe = probe or ffmpeg.probe
+
+    def render(
+        self,
+        source: str,
+        action: Dict[str, Any],
+        output_path: str,
+        media_info: Optional[Dict[str, Any]] = None
+    ) -> str:
+        media_info = media_info or self.probe(source)
+        if action["action"] == "cut":
+            # Full re-encode, so it may be split into parallel chunks
+            chunked_render.render(
+                source,
+                self._cut_plan(action, media_info),
+                output_path,
+                _has_audio(media_info)
+            )
+        else:
+            # Other actions keep the source's length
+            ffmpeg_progress.expect(float(media_info.get("format", {}).get("duration") or 0))
+            ffmpeg_progress.run(self.build(source, action, output_path, media_info))
+        return output_path
+
+    def build(
+        self,
+        source: str,
+        action: Dict[str, Any],
+        output_path: str,
+        media_info: Dict[str, Any]
+    ):
+        """
+        Build the ffmpeg-python output node for an action.
+
+        Args:
+            source: Path of the source video
+            action: Resolved action
+            output_path: File to write
+            media_info: ffprobe output for the source
+
+        Returns:
+            An ffmpeg-python output stream, ready for `.run()`
+
+        Raises:
+            ValueError: If the action is not supported
+        """
+        builders = {
+            "cut": self._cut,
+            "volume": self._volume,
+            "zoom": self._zoom,
+            "caption": self._caption,
+        }
+        builder = builders.get(action["action"])
+        if builder is None:
+            raise ValueError(f"Unsupported action type: {action['action']}")
+
+        video_info = next(s for s in media_info["streams"] if s["codec_type"] == "video")
+        return builder(source, action, output_path, media_info, video_info, _has_audio(media_info))
+
+    def _cut_plan(self, action, media_info) -> RenderPlan:
+        # A "cut" here removes the range, which is a trim in plan terms
+        return compile_plan([{
+            "operation_type": "trim",
+            "start_time": action["start_sec"],
+            "end_time": action["end_sec"],
+        }], float(media_info["format"]["duration"]))
+
+    def _cut(self, source, action, output_path, media_info, video_info, has_audio):
+        plan = self._cut_plan(action, media_info)
+        return build_output(source, plan, output_path, has_audio, output_options=VIDEO_ENCODE)
+
+    def _volume(self, source, action, output_path, media_info, video_info, has_audio):
+        stream = ffmpeg.input(source)
+        if not has_audio:
+            return stream.output(output_path, c="copy").overwrite_output()
+
+        window = _time_window(action.get("start_sec"), action.get("end_sec"))
+        audio = stream.audio.filter(
+            "volume", action["factor"], **({"enable": window} if window else {})
+        )
+        # Only the audio changes, so the video stream is copied
+        return (
+            ffmpeg
+            .output(stream.video, audio, output_path, vcodec="copy", acodec="aac")
+            .overwrite_output()
+        )
+
+    def _zoom(self, source, action, output_path, media_info, video_info, has_audio):
+        factor = float(action.get("factor") or DEFAULT_ZOOM_FACTOR)
+        if factor < 1:
+            raise ValueError(f"Invalid zoom factor: {factor}")
+        width, height = int(video_info["width"]), int(video_info["height"])
+
+        stream = ffmpeg.input(source)
+        window = _time_window(action.get("start_sec"), action.get("end_sec"))
+
+        def zoomed(video):
+            # Centre crop scaled back up to the source frame size
+            return (
+                video
+                .crop(f"(iw-iw/{factor})/2", f"(ih-ih/{factor})/2", f"iw/{factor}", f"ih/{factor}")
+                .filter("scale", width, height)
+            )
+
+        if window is None:
+            video = zoomed(stream.video)
+        else:
+            split = stream.video.split()
+            video = split[0].overlay(zoomed(split[1]), enable=window)
+
+        streams = [video, stream.audio] if has_audio else [video]
+        return (
+            ffmpeg
+            .output(*streams, output_path, vcodec="libx264", acodec="copy")
+            .overwrite_output()
+        )
+
+    def _caption(self, source, action, output_path, media_info, video_info, has_audio):
+        start = action.get("start_sec") or 0.0
+        end = action.get("end_sec")
+        if end is None:
+            end = start + DEFAULT_CAPTION_SECONDS
+        height = int(video_info["height"])
+
+        stream = ffmpeg.input(source)
+        video = stream.video.drawtext(
+            text=action["text"],
+            x="(w-text_w)/2",
+            y="h-text_h-h/12",
+            fontsize=max(12, height // 18),
+            fontcolor="white",
+            box=1,
+            boxcolor="black@0.5",
+            boxborderw=max(4, height // 60),
+            enable=_time_window(start, end)
+        )
+
+        streams = [video, stream.audio] if has_audio else [video]
+        return (
+            ffmpeg
+            .output(*streams, output_path, vcodec="libx264", acodec="copy")
+            .overwrite_output()
+        )
+
+
+RENDER_BACKENDS = {
+    MoviePyBackend.name: MoviePyBackend,
+    FFmpegBackend.name: FFmpegBackend,
+}
+
+
+def get_render_backend(name: Optional[str] = None, probe: Optional[Probe] = None) -> RenderBackend:
+    """
+    Get a render backend by name.
+
+    Args:
+        name: Backend name (default: the RENDER_BACKEND setting)
+        probe: ffprobe function for backends that probe their source
+
+    Returns:
+        RenderBackend instance
+
+    Raises:
+        ValueError: If no backend has that name
+    """
+    name = name or settings.render_backend
+    if name not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend: {name}")
+    if name == FFmpegBackend.name:
+        return FFmpegBackend(probe)
+    return RENDER_BACKENDS[name]()
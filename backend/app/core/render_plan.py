@@ -0,0 +1,230 @@
+"""
+Compile a command's operation list into a single ffmpeg filtergraph.
+
+Every operation of a planned edit is expressed in source-video seconds.
+Instead of rendering each operation as its own job, the list is folded into
+an ordered set of kept source segments (each with its own playback speed),
+which one ffmpeg invocation renders with trim/setpts/atempo and a final
+concat: one decode, one encode, one upload per command.
+"""
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence
+import ffmpeg
+
+# Operation types the compiler knows how to fold into a plan
+FUSABLE_OPERATIONS = {"cut", "trim", "speed"}
+
+# Operation types a multi-operation command may be fused from. A trim
+# removes its range and a speed change replays its range faster or slower,
+# both leaving the rest of the video in place (also when rendered alone),
+# so together they describe one output. A cut yields only its own range,
+# so several cuts (or a cut plus another edit) are separate clips and are
+# rendered one job per operation.
+COMMAND_FUSABLE_OPERATIONS = {"trim", "speed"}
+
+# Segments shorter than this are dropped (about one frame at 1000 fps)
+MIN_SEGMENT = 1e-3
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A kept range of the source, rendered at `speed` times real time."""
+    start: float
+    end: float
+    speed: float = 1.0
+
+    @property
+    def output_duration(self) -> float:
+        return (self.end - self.start) / self.speed
+
+
+@dataclass
+class RenderPlan:
+    """Ordered source segments that make up the rendered output."""
+    segments: List[Segment]
+
+    @property
+    def output_duration(self) -> float:
+        return sum(seg.output_duration for seg in self.segments)
+
+
+def is_fusable(operations: Sequence[Dict[str, Any]]) -> bool:
+    """
+    Return True if a command's operations can be rendered as one output.
+
+    Only trims and speed changes are fused: their combined result is the
+    whole video with every edit applied. Commands with cuts keep one
+    render per operation, as each cut produces its own clip.
+    """
+    return bool(operations) and all(
+        op.get("operation_type") in COMMAND_FUSABLE_OPERATIONS for op in operations
+    )
+
+
+def _range(op: Dict[str, Any], duration: float) -> tuple:
+    start = op.get("start_time")
+    end = op.get("end_time")
+    start = 0.0 if start is None else max(0.0, float(start))
+    end = duration if end is None else min(duration, float(end))
+    return start, end
+
+
+def _split(segments: List[Segment], at: float) -> List[Segment]:
+    """Split any segment that straddles `at` into two."""
+    result = []
+    for seg in segments:
+        if seg.start < at < seg.end:
+            result += [replace(seg, end=at), replace(seg, start=at)]
+        else:
+            result.append(seg)
+    return result
+
+
+def compile_plan(operations: Sequence[Dict[str, Any]], duration: float) -> RenderPlan:
+    """
+    Fold an operation list into the segments of the final render.
+
+    Operations are applied in order:
+    - cut keeps only [start_time, end_time]
+    - trim removes [start_time, end_time]
+    - speed multiplies the playback speed of [start_time, end_time]
+      by parameters.speed_factor
+
+    Args:
+        operations: Planned operations in the existing operation schema
+        duration: Source duration in seconds
+
+    Returns:
+        RenderPlan with the kept segments in timeline order
+
+    Raises:
+        ValueError: If an operation cannot be fused
+    """
+    segments = [Segment(0.0, float(duration))]
+
+    for op in operations:
+        op_type = op.get("operation_type")
+        start, end = _range(op, duration)
+        if end <= start:
+            continue
+
+        if op_type == "cut":
+            segments = [
+                replace(seg, start=max(seg.start, start), end=min(seg.end, end))
+                for seg in segments
+                if seg.start < end and seg.end > start
+            ]
+        elif op_type == "trim":
+            # Segments stay sorted and disjoint, so only the ones overlapping
+            # the range are touched; long trim lists (e.g. silence removal)
+            # would otherwise rebuild the whole list per operation
+            first = bisect_right(segments, start, key=lambda seg: seg.end)
+            last = bisect_left(segments, end, key=lambda seg: seg.start)
+            kept = []
+            for seg in segments[first:last]:
+                if seg.start < start:
+                    kept.append(replace(seg, end=start))
+                if seg.end > end:
+                    kept.append(replace(seg, start=end))
+            segments[first:last] = kept
+        elif op_type == "speed":
+            factor = float((op.get("parameters") or {}).get("speed_factor", 1.0))
+            if factor <= 0:
+                raise ValueError(f"Invalid speed_factor: {factor}")
+            segments = _split(_split(segments, start), end)
+            segments = [
+                replace(seg, speed=seg.speed * factor)
+                if seg.start >= start and seg.end <= end else seg
+                for seg in segments
+            ]
+        else:
+            raise ValueError(f"Operation type {op_type!r} cannot be fused")
+
+    # Re-join neighbours that splitting left at the same speed
+    merged: List[Segment] = []
+    for seg in segments:
+        if seg.end - seg.start <= MIN_SEGMENT:
+            continue
+        if merged and merged[-1].end == seg.start and merged[-1].speed == seg.speed:
+            merged[-1] = replace(merged[-1], end=seg.end)
+        else:
+            merged.append(seg)
+
+    return RenderPlan(merged)
+
+
+def _atempo_chain(stream, speed: float):
+    """atempo accepts 0.5-2.0 per instance, so chain it for larger changes."""
+    while speed > 2.0:
+        stream = stream.filter("atempo", 2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        stream = stream.filter("atempo", 0.5)
+        speed /= 0.5
+    if abs(speed - 1.0) > 1e-9:
+        stream = stream.filter("atempo", speed)
+    return stream
+
+
+def build_output(
+    source: str,
+    plan: RenderPlan,
+    output_path: str,
+    has_audio: bool = True,
+    input_options: Optional[Dict[str, Any]] = None,
+    output_options: Optional[Dict[str, Any]] = None,
+    has_video: bool = True,
+    max_height: Optional[int] = None
+):
+    """
+    Build the ffmpeg-python output node that renders a plan in one pass.
+
+    Args:
+        source: Path or URL of the source video
+        plan: Compiled render plan
+        output_path: File to write
+        has_audio: Whether the source has an audio stream
+        input_options: Extra ffmpeg input options (e.g. HTTP headers)
+        output_options: Extra ffmpeg output options (encoder settings)
+        has_video: Render the video stream (False for an audio-only pass)
+        max_height: Scale the video down to at most this height
+
+    Returns:
+        An ffmpeg-python output stream, ready for `.run()`
+
+    Raises:
+        ValueError: If the plan has no segments left to render
+    """
+    if not plan.segments:
+        raise ValueError("Render plan removes the whole video")
+
+    stream = ffmpeg.input(source, **(input_options or {}))
+    parts = []
+    for seg in plan.segments:
+        if has_video:
+            video = (
+                stream.video
+                .trim(start=seg.start, end=seg.end)
+                .setpts(f"(PTS-STARTPTS)/{seg.speed}")
+            )
+            parts.append(video)
+        if has_audio:
+            audio = (
+                stream.audio
+                .filter("atrim", start=seg.start, end=seg.end)
+                .filter("asetpts", "PTS-STARTPTS")
+            )
+            parts.append(_atempo_chain(audio, seg.speed))
+
+    streams = int(has_video) + int(has_audio)
+    joined = ffmpeg.concat(*parts, v=int(has_video), a=int(has_audio)).node
+    outputs = [joined[i] for i in range(streams)]
+    if has_video and max_height:
+        # -2 keeps the aspect ratio with an even width
+        outputs[0] = outputs[0].filter("scale", -2, f"min(ih,{max_height})")
+    if has_video:
+        # concat loses the frame rate, so keep each frame's own timestamp
+        # instead of resampling to a default rate
+        output_options = {"fps_mode": "vfr", **(output_options or {})}
+    return ffmpeg.output(*outputs, output_path, **(output_options or {})).overwrite_output()
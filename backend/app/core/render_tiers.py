@@ -0,0 +1,59 @@
+"""
+Render tiers and their encoder profiles.
+
+A chat command first gets a `preview` render: read from the proxy when
+there is one, scaled down, fast preset, higher CRF, so it is back in
+seconds. The `final` tier renders the original at full quality and is
+normally queued behind the preview at lower priority.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+PREVIEW = "preview"
+FINAL = "final"
+
+RENDER_TIERS = (PREVIEW, FINAL)
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """x264 settings and output size limit of one render tier."""
+    tier: str
+    max_height: Optional[int]
+    preset: str
+    crf: int
+
+    @property
+    def video_options(self) -> Dict[str, Any]:
+        """ffmpeg output options for the video encoder."""
+        return {"preset": self.preset, "crf": self.crf}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def encoder_profile(tier: str = FINAL) -> EncoderProfile:
+    """
+    Get the Settings-driven encoder profile of a render tier.
+
+    Args:
+        tier: "preview" or "final"
+
+    Returns:
+        EncoderProfile for the tier
+
+    Raises:
+        ValueError: If the tier is unknown
+    """
+    if tier not in RENDER_TIERS:
+        raise ValueError(f"Unknown render tier: {tier}")
+
+    max_height = getattr(settings, f"render_{tier}_max_height")
+    return EncoderProfile(
+        tier=tier,
+        max_height=max_height or None,
+        preset=getattr(settings, f"render_{tier}_preset"),
+        crf=getattr(settings, f"render_{tier}_crf")
+    )
@@ -0,0 +1,180 @@
+"""
+Deterministic planner for "remove the silences" and "cut the ums" commands.
+
+The ranges to remove are read off the project's columns instead of being
+guessed by the LLM:
+
+- silences: runs of audio_features frames whose RMS level is below the
+  threshold, found by run-length encoding the frame mask;
+- fillers: transcript segments that say nothing but filler words.
+
+Silences shorter than `min_duration` are kept (they are the rhythm of
+speech), longer ones are shrunk by `padding` on each side so cuts do not
+clip the surrounding words, and all ranges are merged where they overlap
+or touch. Everything is whole-array NumPy work, so thousands of pauses
+plan in milliseconds. The result is one `trim` operation per merged range.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from .config import settings
+from .timeline import ProjectTimeline
+
+FILLER_WORDS = frozenset({
+    "ah", "eh", "er", "erm", "hm", "hmm", "mhm", "mm", "uh", "uhh", "uhm", "um", "umm",
+})
+
+_WORD = re.compile(r"[a-z']+")
+
+Ranges = Tuple[np.ndarray, np.ndarray]
+
+
+def _empty() -> Ranges:
+    return np.empty(0), np.empty(0)
+
+
+def runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run-length encode a boolean mask.
+
+    Returns:
+        Tuple of (first, stop): index of the first element of every run of
+        True values and the index just past its last element
+    """
+    edges = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def merge_ranges(starts: np.ndarray, ends: np.ndarray) -> Ranges:
+    """
+    Merge overlapping or touching [start, end] ranges.
+
+    Returns:
+        Sorted, disjoint (starts, ends)
+    """
+    if not len(starts):
+        return _empty()
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+
+    # A merged range begins wherever a range starts after all earlier ones end
+    begins = np.concatenate(([True], starts[1:] > reach[:-1]))
+    first = np.flatnonzero(begins)
+    last = np.concatenate((first[1:] - 1, [len(starts) - 1]))
+    return starts[first], reach[last]
+
+
+def silence_ranges(
+    timeline: ProjectTimeline,
+    threshold_db: float,
+    min_duration: float,
+    padding: float
+) -> Ranges:
+    """
+    Pauses worth removing, from the timeline's audio feature columns.
+
+    Args:
+        timeline: Timeline with audio_features loaded
+        threshold_db: RMS level (dBFS) below which a frame is silent
+        min_duration: Shortest pause to remove, in seconds
+        padding: Room kept on each side of a removed pause, in seconds
+
+    Returns:
+        (starts, ends) of the ranges to remove, in time order
+    """
+    timestamp = timeline.audio_timestamp
+    if not len(timestamp):
+        return _empty()
+    if "rms_db" in timeline.audio:
+        mask = timeline.audio_mask("rms_db", below=threshold_db)
+    elif "is_silent" in timeline.audio:
+        mask = timeline.audio["is_silent"]
+    else:
+        return _empty()
+
+    duration = timeline.audio.get("duration")
+    if duration is None:
+        # Older rows have no duration; frames are evenly spaced
+        step = float(np.median(np.diff(timestamp))) if len(timestamp) > 1 else settings.audio_frame_seconds
+        duration = np.full(len(timestamp), step)
+
+    first, stop = runs(mask)
+    starts = timestamp[first]
+    ends = timestamp[stop - 1] + duration[stop - 1]
+
+    long_enough = (ends - starts) >= min_duration
+    starts = starts[long_enough] + padding
+    ends = ends[long_enough] - padding
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+def is_filler(text: str) -> bool:
+    """True if a transcript segment says nothing but filler words."""
+    words = _WORD.findall(text.lower())
+    return bool(words) and all(word in FILLER_WORDS for word in words)
+
+
+def filler_ranges(timeline: ProjectTimeline) -> Ranges:
+    """Transcript segments made only of filler words, as (starts, ends)."""
+    # Texts are interned, so each distinct one is checked once
+    verdicts = {text: is_filler(text) for text in set(timeline.transcript_text)}
+    mask = np.fromiter(
+        (verdicts[text] for text in timeline.transcript_text), dtype=bool, count=len(timeline)
+    )
+    return timeline.transcript_start[mask], timeline.transcript_end[mask]
+
+
+def plan_silence_removal(
+    timeline: ProjectTimeline,
+    silences: bool = True,
+    fillers: bool = False,
+    threshold_db: Optional[float] = None,
+    min_duration: Optional[float] = None,
+    padding: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Plan the trims that remove a project's pauses and/or filler segments.
+
+    Args:
+        timeline: Timeline with transcript and audio_features loaded
+        silences: Remove pauses found in the audio features
+        fillers: Remove filler-only transcript segments
+        threshold_db: Silence level (default: AUDIO_SILENCE_DB)
+        min_duration: Shortest pause to remove (default: SILENCE_MIN_DURATION)
+        padding: Room kept around speech (default: SILENCE_PADDING)
+
+    Returns:
+        `trim` operations in the existing operation schema, one per merged
+        range, in time order
+    """
+    threshold_db = settings.audio_silence_db if threshold_db is None else threshold_db
+    min_duration = settings.silence_min_duration if min_duration is None else min_duration
+    padding = settings.silence_padding if padding is None else padding
+
+    found = []
+    if silences:
+        found.append(silence_ranges(timeline, threshold_db, min_duration, padding))
+    if fillers:
+        found.append(filler_ranges(timeline))
+    if not found:
+        return []
+
+    starts, ends = merge_ranges(
+        np.concatenate([s for s, _ in found]), np.concatenate([e for _, e in found])
+    )
+    if timeline.duration:
+        ends = np.minimum(ends, timeline.duration)
+    keep = ends > starts
+
+    return [
+        {
+            "operation_type": "trim",
+            "start_time": start,
+            "end_time": end,
+            "parameters": {"reason": "silence_removal"}
+        }
+        for start, end in zip(starts[keep].tolist(), ends[keep].tolist())
+    ]
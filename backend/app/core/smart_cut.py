@@ -0,0 +1,418 @@
+"""
+Frame-accurate cuts at close to stream-copy speed.
+
+A stream copy can only start on a keyframe, so `c="copy"` cuts snap to the
+GOP and show frames the user asked to remove, while a full re-encode is
+accurate but decodes and encodes every frame. A smart cut does both: the
+GOP-aligned interior of each kept segment is stream-copied and only the
+partial GOPs at its edges are re-encoded. The video pieces are joined with
+the concat demuxer (no re-encode) and the audio, which is cheap to encode,
+is rendered in one pass and muxed alongside.
+
+The boundary pieces are encoded with the source's profile, level, pixel
+format and track timescale, so decoders see one stream across the joins.
+When those cannot be matched, every segment is re-encoded instead.
+"""
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import ffmpeg
+
+from . import ffmpeg_progress
+
+# Encoders able to produce boundary pieces that join a copied stream
+ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+}
+
+# Encoder settings for the re-encoded boundary pieces
+BOUNDARY_ENCODE = {"preset": "veryfast", "crf": 18}
+
+# Encoder names of the profiles ffprobe reports, per codec; other profiles
+# cannot be produced to match and fall back to a full re-encode
+PROFILES = {
+    "h264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 10": "high10",
+        "High 4:2:2": "high422",
+        "High 4:4:4 Predictive": "high444",
+    },
+    "hevc": {
+        "Main": "main",
+        "Main 10": "main10",
+    },
+}
+
+# ffprobe stream fields the boundary pieces have to match
+VIDEO_FORMAT_FIELDS = ("profile", "level", "pix_fmt", "time_base")
+
+# Nudge applied to seek targets so float rounding never lands on the
+# neighbouring keyframe
+SEEK_EPSILON = 1e-3
+
+
+@dataclass
+class KeyframeScan:
+    """Keyframe positions and stream layout of a media file."""
+    codec: Optional[str] = None
+    time_base: Fraction = Fraction(1, 1)
+    keyframes: List[float] = field(default_factory=list)
+    has_audio: bool = False
+    # End of the last video packet read, in seconds
+    end: float = 0.0
+    # Shortest video frame duration seen, in seconds (0 if unknown)
+    frame_duration: float = 0.0
+    # ffprobe's profile, level, pix_fmt and time_base of the video stream;
+    # empty when the scan did not come with a probe
+    video_format: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Piece:
+    """A range of one kept segment, either stream-copied or re-encoded."""
+    start: float
+    end: Optional[float]
+    copy: bool
+
+
+def keyframe_scan_output(
+    source: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    input_options: Optional[Dict[str, Any]] = None
+):
+    """ffmpeg-python output that lists a file's packets for `parse_keyframe_scan`."""
+    options = dict(input_options or {})
+    if start is not None:
+        options["ss"] = start
+    if end is not None:
+        options["to"] = end
+    return (
+        ffmpeg
+        .input(source, copyts=None, start_at_zero=None, **options)
+        .output("pipe:", map="0", c="copy", f="framecrc")
+    )
+
+
+def scan_keyframes(
+    source: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    input_options: Optional[Dict[str, Any]] = None
+) -> KeyframeScan:
+    """
+    Find the video keyframes of a file (or of a window of it).
+
+    Packets are listed with ffmpeg's framecrc muxer over a stream copy, so
+    nothing is decoded and only the ffmpeg binary is needed. When a window
+    is given, only that range is read (plus the GOP leading into it),
+    which keeps range-fetched sources cheap.
+
+    Args:
+        source: Path or URL of the media
+        start: Window start in seconds
+        end: Window end in seconds
+        input_options: Extra ffmpeg input options (e.g. HTTP headers)
+
+    Returns:
+        KeyframeScan with keyframe times in seconds from the file start
+    """
+    out, _ = (
+        keyframe_scan_output(source, start, end, input_options)
+        .run(capture_stdout=True, quiet=True)
+    )
+    return parse_keyframe_scan(out)
+
+
+def parse_keyframe_scan(out: bytes) -> KeyframeScan:
+    """Read keyframe times and stream layout from framecrc output."""
+    scan = KeyframeScan()
+    video_index = None
+    time_bases: Dict[str, Fraction] = {}
+    last_end = 0
+    frame_duration = 0
+
+    for line in out.decode().splitlines():
+        if line.startswith("#"):
+            key, _, value = line[1:].partition(":")
+            name, _, index = key.partition(" ")
+            value = value.strip()
+            if name == "tb":
+                time_bases[index] = Fraction(value)
+            elif name == "media_type" and value == "video" and video_index is None:
+                video_index = index
+            elif name == "media_type" and value == "audio":
+                scan.has_audio = True
+            elif name == "codec_id" and index == video_index:
+                scan.codec = value
+            continue
+
+        fields = [part.strip() for part in line.split(",")]
+        if fields[0] != video_index:
+            continue
+        packet_end = int(fields[2]) + int(fields[3])
+        last_end = max(last_end, packet_end)
+        if int(fields[3]) > 0:
+            frame_duration = min(frame_duration or int(fields[3]), int(fields[3]))
+        flags = next((int(f[2:], 16) for f in fields[6:] if f.startswith("F=")), 1)
+        if flags & 1:
+            scan.keyframes.append(float(int(fields[2]) * time_bases[video_index]))
+
+    if video_index is not None:
+        scan.time_base = time_bases[video_index]
+        scan.end = float(last_end * scan.time_base)
+        scan.frame_duration = float(frame_duration * scan.time_base)
+    scan.keyframes.sort()
+    return scan
+
+
+def probe_video_format(
+    source: str,
+    input_options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Read the encoding parameters of a file's first video stream.
+
+    Args:
+        source: Path or URL of the media
+        input_options: Extra ffprobe input options (e.g. HTTP headers)
+
+    Returns:
+        The VIDEO_FORMAT_FIELDS of the stream; empty if it cannot be probed
+    """
+    try:
+        probed = ffmpeg.probe(source, select_streams="v:0", **(input_options or {}))
+    except (ffmpeg.Error, OSError):
+        return {}
+    streams = probed.get("streams") or [{}]
+    return {name: streams[0].get(name) for name in VIDEO_FORMAT_FIELDS}
+
+
+def boundary_options(
+    codec: Optional[str],
+    video_format: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Encoder options that make boundary pieces match the source stream.
+
+    Args:
+        codec: Codec name of the source video
+        video_format: ffprobe's VIDEO_FORMAT_FIELDS of the source video
+
+    Returns:
+        ffmpeg output options, or None if the source cannot be matched
+    """
+    profile = PROFILES.get(codec, {}).get(video_format.get("profile"))
+    level = video_format.get("level")
+    pix_fmt = video_format.get("pix_fmt")
+    try:
+        time_base = Fraction(str(video_format.get("time_base")))
+    except (ValueError, ZeroDivisionError):
+        return None
+    if profile is None or not level or level < 0 or not pix_fmt or time_base.numerator != 1:
+        return None
+
+    options = {
+        "profile:v": profile,
+        "pix_fmt": pix_fmt,
+        # The copied pieces keep the source's timescale
+        "video_track_timescale": time_base.denominator,
+    }
+    if codec == "hevc":
+        # ffprobe reports HEVC levels times 30
+        options["x265-params"] = f"level-idc={level / 30:g}"
+    else:
+        options["level"] = f"{level / 10:g}"
+    return options
+
+
+def plan_pieces(
+    start: float,
+    end: Optional[float],
+    keyframes: Sequence[float]
+) -> List[Piece]:
+    """
+    Split a kept segment into copied and re-encoded pieces.
+
+    Args:
+        start: Segment start in seconds
+        end: Segment end in seconds, or None for the end of the file
+        keyframes: Sorted keyframe times
+
+    Returns:
+        Pieces in order; the middle one is copied when the segment spans at
+        least one whole GOP
+    """
+    inside = [
+        k for k in keyframes
+        if k >= start - SEEK_EPSILON and (end is None or k <= end + SEEK_EPSILON)
+    ]
+    if not inside:
+        return [Piece(start, end, copy=False)]
+
+    first = inside[0]
+    # Without an end, everything from the first keyframe on is copied
+    last = inside[-1] if end is not None else None
+    if last is not None and last - first <= SEEK_EPSILON:
+        return [Piece(start, end, copy=False)]
+
+    pieces = []
+    if first - start > SEEK_EPSILON:
+        pieces.append(Piece(start, first, copy=False))
+    pieces.append(Piece(first, last, copy=True))
+    if last is not None and end - last > SEEK_EPSILON:
+        pieces.append(Piece(last, end, copy=False))
+    return pieces
+
+
+def _floor_us(t: float) -> float:
+    """Round a time down to ffmpeg's microsecond resolution."""
+    return math.floor(t * 1e6) / 1e6
+
+
+def _write_piece(
+    source: str,
+    piece: Piece,
+    path: str,
+    encoder: str,
+    input_options: Dict[str, Any],
+    encode: Dict[str, Any]
+) -> None:
+    """Write one video-only piece for the concat demuxer."""
+    if piece.copy:
+        # Packets before `ss` are flagged for discard, so the seek must not
+        # land past the keyframe; rounding down also keeps the closing
+        # keyframe out of `to`
+        options = dict(input_options, ss=_floor_us(piece.start))
+        if piece.end is not None:
+            options["to"] = _floor_us(piece.end)
+        stream = ffmpeg.input(source, **options)
+        output = stream.video.output(path, c="copy", f="mp4")
+    else:
+        # Trim on absolute timestamps so the piece holds exactly the frames
+        # presented in [start, end); `to` would be measured from the first
+        # decoded frame instead
+        stream = ffmpeg.input(
+            source, ss=piece.start, copyts=None, start_at_zero=None, **input_options
+        )
+        video = stream.video.trim(
+            start=piece.start, **({} if piece.end is None else {"end": piece.end})
+        ).setpts("PTS-STARTPTS")
+        output = video.output(
+            path, vcodec=encoder, f="mp4", fps_mode="passthrough", **encode
+        )
+    ffmpeg_progress.run(output.overwrite_output(), encode=not piece.copy)
+
+
+def smart_cut(
+    source: str,
+    segments: Sequence[Tuple[float, Optional[float]]],
+    output_path: str,
+    input_options: Optional[Dict[str, Any]] = None,
+    work_dir: Optional[str] = None,
+    encode: Optional[Dict[str, Any]] = None,
+    scan: Optional[KeyframeScan] = None
+) -> List[Piece]:
+    """
+    Render the kept segments of a source, frame-accurately.
+
+    Args:
+        source: Path or URL of the source video
+        segments: Kept (start, end) ranges in seconds, in output order; an
+                  end of None means the end of the file
+        output_path: File to write
+        input_options: Extra ffmpeg input options (e.g. HTTP headers)
+        work_dir: Directory for intermediate pieces (default: a temp dir)
+        encode: Encoder settings of the re-encoded pieces
+                (default: BOUNDARY_ENCODE)
+        scan: Keyframes of the whole source, if already known; otherwise
+              the window of each segment is scanned
+
+    Returns:
+        The pieces that were written, in order
+
+    Raises:
+        ValueError: If there is nothing to render
+    """
+    if not segments:
+        raise ValueError("Smart cut needs at least one segment")
+
+    input_options = dict(input_options or {})
+    encode = encode or BOUNDARY_ENCODE
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as temp_dir:
+        scans = [
+            scan or scan_keyframes(source, start, end, input_options)
+            for start, end in segments
+        ]
+        has_audio = any(scan.has_audio for scan in scans)
+        ffmpeg_progress.expect(sum(
+            (scan.end if end is None else end) - start
+            for (start, end), scan in zip(segments, scans)
+        ))
+        encoder = ENCODERS.get(scans[0].codec)
+        if encoder is not None:
+            # Boundary pieces are only joinable when they match the source
+            match = (
+                boundary_options(scans[0].codec, scans[0].video_format)
+                or boundary_options(scans[0].codec, probe_video_format(source, input_options))
+            )
+            if match is None:
+                encoder = None
+            else:
+                encode = {**encode, **match}
+
+        pieces: List[Piece] = []
+        for (start, end), scan in zip(segments, scans):
+            if encoder is None:
+                # Boundary pieces could not be joined to this stream,
+                # so the segment is encoded throughout
+                pieces.append(Piece(start, end, copy=False))
+            else:
+                pieces.extend(plan_pieces(start, end, scan.keyframes))
+        encoder = encoder or ENCODERS["h264"]
+
+        concat_file = os.path.join(temp_dir, "pieces.txt")
+        with open(concat_file, "w") as f:
+            for i, piece in enumerate(pieces):
+                path = os.path.join(temp_dir, f"piece_{i}.mp4")
+                _write_piece(source, piece, path, encoder, input_options, encode)
+                f.write(f"file '{path}'\n")
+
+        video = ffmpeg.input(concat_file, format="concat", safe=0).video
+        streams = [video]
+
+        if has_audio:
+            audio_parts = []
+            for start, end in segments:
+                options = dict(input_options, ss=start)
+                if end is not None:
+                    options["to"] = end
+                audio_parts.append(ffmpeg.input(source, **options).audio)
+            audio_path = os.path.join(temp_dir, "audio.m4a")
+            audio = (
+                ffmpeg.concat(*audio_parts, v=0, a=1)
+                if len(audio_parts) > 1 else audio_parts[0]
+            )
+            ffmpeg_progress.run(
+                audio.output(audio_path, acodec="aac").overwrite_output(),
+                progress=False
+            )
+            streams.append(ffmpeg.input(audio_path).audio)
+
+        ffmpeg_progress.run(
+            ffmpeg
+            .output(*streams, output_path, c="copy", movflags="+faststart")
+            .overwrite_output(),
+            progress=False,
+            encode=False
+        )
+
+    return pieces
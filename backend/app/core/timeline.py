@@ -0,0 +1,346 @@
+"""
+Columnar in-memory representation of a project's timeline data.
+
+`fetch_project_data` returns lists of dicts and the SQLModel layer returns
+one `Transcript` object per row. `ProjectTimeline` keeps the same data as
+NumPy columns (one array per field, one contiguous embedding matrix) so the
+resolver, planner and silence detection can work on whole columns at once.
+Row views with `__slots__` keep attribute access working for code that
+still iterates row by row.
+"""
+from __future__ import annotations
+import sys
+from functools import cached_property
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+
+from .embedding_codec import EMBEDDING_DTYPE, stack_embeddings
+from .interval_index import IntervalIndex
+
+_TIME_DTYPE = np.float64
+
+
+def _column(rows: Sequence[Mapping[str, Any]], key: str) -> np.ndarray:
+    """Extract one numeric field of every row as a float64 array."""
+    return np.fromiter((row[key] for row in rows), dtype=_TIME_DTYPE, count=len(rows))
+
+
+def _intern(text: Optional[str]) -> str:
+    return sys.intern(text or "")
+
+
+class TranscriptRow:
+    """Read-only view of one transcript segment inside a `ProjectTimeline`."""
+    __slots__ = ("_timeline", "_index")
+
+    def __init__(self, timeline: "ProjectTimeline", index: int):
+        self._timeline = timeline
+        self._index = index
+
+    @property
+    def start(self) -> float:
+        return float(self._timeline.transcript_start[self._index])
+
+    @property
+    def end(self) -> float:
+        return float(self._timeline.transcript_end[self._index])
+
+    @property
+    def sentence(self) -> str:
+        return self._timeline.transcript_text[self._index]
+
+    @property
+    def embedding(self) -> Optional[np.ndarray]:
+        matrix = self._timeline.embeddings
+        return matrix[self._index] if matrix is not None else None
+
+    # Aliases matching the dict keys used by `fetch_project_data`
+    start_time = start
+    end_time = end
+    text = sentence
+
+    def __repr__(self) -> str:
+        return f"TranscriptRow({self.start:.2f}-{self.end:.2f}s: {self.sentence!r})"
+
+
+class SceneRow:
+    """Read-only view of one scene inside a `ProjectTimeline`."""
+    __slots__ = ("_timeline", "_index")
+
+    def __init__(self, timeline: "ProjectTimeline", index: int):
+        self._timeline = timeline
+        self._index = index
+
+    @property
+    def start_time(self) -> float:
+        return float(self._timeline.scene_start[self._index])
+
+    @property
+    def end_time(self) -> float:
+        return float(self._timeline.scene_end[self._index])
+
+    @property
+    def description(self) -> str:
+        return self._timeline.scene_text[self._index]
+
+    def __repr__(self) -> str:
+        return f"SceneRow({self.start_time:.2f}-{self.end_time:.2f}s: {self.description!r})"
+
+
+class ProjectTimeline:
+    """
+    Column-oriented snapshot of a project's transcript, scenes, clips and
+    audio features.
+
+    All time columns are float64 seconds, sorted by start time (or by
+    timestamp for audio features). Text is interned so repeated strings
+    share storage. Embeddings, when available, form one contiguous
+    float32 matrix aligned with the transcript columns.
+    """
+
+    def __init__(
+        self,
+        transcript_start: np.ndarray,
+        transcript_end: np.ndarray,
+        transcript_text: List[str],
+        embeddings: Optional[np.ndarray] = None,
+        scene_start: Optional[np.ndarray] = None,
+        scene_end: Optional[np.ndarray] = None,
+        scene_text: Optional[List[str]] = None,
+        clip_start: Optional[np.ndarray] = None,
+        clip_end: Optional[np.ndarray] = None,
+        audio_timestamp: Optional[np.ndarray] = None,
+        audio: Optional[Dict[str, np.ndarray]] = None,
+        duration: Optional[float] = None
+    ):
+        empty = np.empty(0, dtype=_TIME_DTYPE)
+        self.transcript_start = transcript_start
+        self.transcript_end = transcript_end
+        self.transcript_text = transcript_text
+        self.embeddings = embeddings
+        self.scene_start = empty if scene_start is None else scene_start
+        self.scene_end = empty if scene_end is None else scene_end
+        self.scene_text = scene_text or []
+        self.clip_start = empty if clip_start is None else clip_start
+        self.clip_end = empty if clip_end is None else clip_end
+        self.audio_timestamp = empty if audio_timestamp is None else audio_timestamp
+        self.audio = audio or {}
+        self.duration = duration
+
+    @classmethod
+    def from_project_data(cls, project_data: Mapping[str, Any]) -> "ProjectTimeline":
+        """
+        Build a timeline from the dictionary returned by `fetch_project_data`.
+
+        Args:
+            project_data: Dictionary with project, transcript, scenes,
+                clips and (optionally) audio_features lists
+
+        Returns:
+            ProjectTimeline snapshot of the project
+        """
+        transcript = project_data.get("transcript", [])
+        scenes = project_data.get("scenes", [])
+        clips = project_data.get("clips", [])
+        audio_features = project_data.get("audio_features", [])
+
+        stored = [t.get("embedding_f32") for t in transcript]
+        embeddings = stack_embeddings(stored) if stored and all(stored) else None
+
+        return cls(
+            transcript_start=_column(transcript, "start_time"),
+            transcript_end=_column(transcript, "end_time"),
+            transcript_text=[_intern(t.get("text")) for t in transcript],
+            embeddings=embeddings,
+            scene_start=_column(scenes, "start_time"),
+            scene_end=_column(scenes, "end_time"),
+            scene_text=[_intern(s.get("description")) for s in scenes],
+            clip_start=_column(clips, "start_time"),
+            clip_end=_column(clips, "end_time"),
+            audio_timestamp=_column(audio_features, "timestamp"),
+            audio=cls._audio_columns(audio_features),
+            duration=project_data.get("project", {}).get("duration")
+        )
+
+    @staticmethod
+    def _audio_columns(audio_features: Sequence[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Turn every numeric audio feature field into its own column.
+
+        Fields are collected from all rows, so a feature missing or NULL in
+        some of them (e.g. rows written before it was analysed) still gets
+        a column, with NaN in those rows. Boolean fields stay boolean only
+        when every row has a value.
+        """
+        kinds: Dict[str, Optional[type]] = {}
+        for row in audio_features:
+            for key, value in row.items():
+                if key == "timestamp" or value is None:
+                    continue
+                if isinstance(value, (bool, np.bool_)):
+                    kind = bool
+                elif isinstance(value, (int, float, np.number)):
+                    kind = float
+                else:
+                    kind = None
+                seen = kinds.get(key, kind)
+                if kind is None or seen is None:
+                    # Text fields (ids, project_id) are not features
+                    kinds[key] = None
+                else:
+                    kinds[key] = bool if kind is bool and seen is bool else float
+
+        columns = {}
+        for key, kind in kinds.items():
+            if kind is None:
+                continue
+            values = [row.get(key) for row in audio_features]
+            if kind is bool and all(v is not None for v in values):
+                columns[key] = np.fromiter(values, dtype=bool, count=len(values))
+            else:
+                columns[key] = np.fromiter(
+                    (np.nan if v is None else v for v in values),
+                    dtype=_TIME_DTYPE,
+                    count=len(values)
+                )
+        return columns
+
+    @classmethod
+    def audio_batch(
+        cls,
+        audio_features: Sequence[Mapping[str, Any]]
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Columns of one batch of audio_features rows, for `set_audio`.
+
+        Args:
+            audio_features: Rows ordered by timestamp
+
+        Returns:
+            Tuple of (timestamp column, feature columns)
+        """
+        return _column(audio_features, "timestamp"), cls._audio_columns(audio_features)
+
+    def set_audio(self, batches: Sequence[Tuple[np.ndarray, Dict[str, np.ndarray]]]) -> None:
+        """
+        Replace the audio feature columns with consecutive batches.
+
+        Building columns batch by batch keeps only one batch of row dicts
+        alive while a long project's audio features are streamed in.
+
+        Args:
+            batches: Results of `audio_batch`, in timestamp order
+        """
+        batches = [(ts, cols) for ts, cols in batches if len(ts)]
+        if not batches:
+            self.audio_timestamp = np.empty(0, dtype=_TIME_DTYPE)
+            self.audio = {}
+            return
+        self.audio_timestamp = np.concatenate([ts for ts, _ in batches])
+        # A feature missing from a batch is NaN over that batch's rows
+        keys = dict.fromkeys(key for _, cols in batches for key in cols)
+        self.audio = {
+            key: np.concatenate([
+                cols[key] if key in cols else np.full(len(ts), np.nan, dtype=_TIME_DTYPE)
+                for ts, cols in batches
+            ])
+            for key in keys
+        }
+
+    def __len__(self) -> int:
+        return len(self.transcript_text)
+
+    @property
+    def transcript(self) -> List[TranscriptRow]:
+        """Row views over the transcript columns."""
+        return [TranscriptRow(self, i) for i in range(len(self))]
+
+    @property
+    def scenes(self) -> List[SceneRow]:
+        """Row views over the scene columns."""
+        return [SceneRow(self, i) for i in range(len(self.scene_text))]
+
+    @cached_property
+    def transcript_index(self) -> IntervalIndex:
+        """Interval index over transcript segments."""
+        return IntervalIndex(self.transcript_start, self.transcript_end)
+
+    @cached_property
+    def scene_index(self) -> IntervalIndex:
+        """Interval index over scenes."""
+        return IntervalIndex(self.scene_start, self.scene_end)
+
+    @cached_property
+    def clip_index(self) -> IntervalIndex:
+        """Interval index over the current clips."""
+        return IntervalIndex(self.clip_start, self.clip_end)
+
+    def sentence_at(self, t: float) -> Optional[TranscriptRow]:
+        """Return the transcript segment playing at time t, if any."""
+        hits = self.transcript_index.containing(t)
+        return TranscriptRow(self, int(hits[0])) if len(hits) else None
+
+    def scene_at(self, t: float) -> Optional[SceneRow]:
+        """Return the scene playing at time t, if any."""
+        hits = self.scene_index.containing(t)
+        return SceneRow(self, int(hits[0])) if len(hits) else None
+
+    def snap(self, t: float, tolerance: float) -> float:
+        """
+        Snap a cut point to the nearest sentence or scene boundary.
+
+        Args:
+            t: Time in seconds
+            tolerance: Maximum distance a cut point may move
+
+        Returns:
+            The closest boundary within `tolerance`, or t unchanged
+        """
+        candidates = [
+            boundary for boundary in (
+                self.transcript_index.nearest_boundary(t, tolerance),
+                self.scene_index.nearest_boundary(t, tolerance),
+            )
+            if boundary is not None
+        ]
+        return min(candidates, key=lambda b: abs(b - t)) if candidates else t
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of `query` against every transcript embedding.
+
+        Args:
+            query: 1-D query embedding
+
+        Returns:
+            Array with one similarity per transcript segment
+
+        Raises:
+            ValueError: If the timeline has no embeddings
+        """
+        if self.embeddings is None:
+            raise ValueError("Timeline has no transcript embeddings")
+        matrix = self.embeddings
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        norms[norms == 0] = 1.0
+        return (matrix @ np.asarray(query, dtype=matrix.dtype)) / norms
+
+    def clips_summary(self) -> str:
+        """Render the current clips as the planner's numbered context lines."""
+        return "".join(
+            f"{i + 1}. {start:.2f}s - {end:.2f}s\n"
+            for i, (start, end) in enumerate(zip(self.clip_start.tolist(), self.clip_end.tolist()))
+        )
+
+    def audio_mask(self, column: str, below: float) -> np.ndarray:
+        """
+        Boolean mask of audio frames whose `column` value is below a threshold.
+
+        Args:
+            column: Name of an audio feature column (e.g. "rms_db")
+            below: Threshold value
+
+        Returns:
+            Boolean array aligned with `audio_timestamp`
+        """
+        return self.audio[column] < below
@@ -1,23 +1,31 @@
 import os
 import tempfile
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, Sequence
 from uuid import UUID
-from moviepy.editor import VideoFileClip, concatenate_videoclips, vfx
 from .models import Video, Effect
 from .command_resolver import resolve
+from .render_backends import Probe, get_render_backend
 
-def _save_tmp(clip: VideoFileClip, video_id: UUID) -> str:
-    """Save the processed clip to a temporary file and return its path."""
+# Renders through a cache of earlier renders:
+# (source_path, operations, encoder, render, output_path) -> output_path
+CachedRender = Callable[
+    [str, Sequence[Dict[str, Any]], Dict[str, Any], Callable[[str], Any], str],
+    str
+]
+
+def _output_path(video_id: UUID) -> str:
+    """Temporary file path for a processed version of a video."""
     temp_dir = os.path.join(tempfile.gettempdir(), "cre8rflow")
     os.makedirs(temp_dir, exist_ok=True)
     
-    output_path = os.path.join(temp_dir, f"{video_id}_processed.mp4")
-    clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
-    clip.close()
-    
-    return output_path
+    return os.path.join(temp_dir, f"{video_id}_processed.mp4")
 
-def apply_command(video: Video, command: str) -> Video:
+def apply_command(
+    video: Video,
+    command: str,
+    probe: Optional[Probe] = None,
+    cached_render: Optional[CachedRender] = None
+) -> Video:
     """
     Parse a natural-language command and return a NEW Video object whose
     file contains the rendered change. Also write an Effect row so we
@@ -26,6 +34,11 @@ def apply_command(video: Video, command: str) -> Video:
     Args:
         video: The original Video object
         command: The natural language command to process
+        probe: ffprobe function for the render backend (default: the
+               backend's own)
+        cached_render: Render cache to reuse identical earlier renders
+                       through (undo/redo, repeated commands); without
+                       one every command is rendered
         
     Returns:
         A new Video object with the processed video file
@@ -33,29 +46,23 @@ def apply_command(video: Video, command: str) -> Video:
     # Use the command resolver to parse the command
     action = resolve(str(video.id), command)
     
-    # Load the video clip
-    clip = VideoFileClip(video.file_path)
+    # Render the change with the configured backend
+    backend = get_render_backend(probe=probe)
+    out_path = _output_path(video.id)
     
-    # Apply the appropriate transformation based on the command type
-    if action["action"] == "cut":
-        start, end = action["start_sec"], action["end_sec"]
-        processed = concatenate_videoclips([
-            clip.subclip(0, start),
-            clip.subclip(end)
-        ])
-    elif action["action"] == "volume":
-        processed = clip.volumex(action["factor"])
-    elif action["action"] == "zoom":
-        # TODO: Implement zoom functionality
-        processed = clip  # Placeholder
-    elif action["action"] == "caption":
-        # TODO: Implement caption functionality
-        processed = clip  # Placeholder
-    else:
-        raise ValueError(f"Unsupported action type: {action['action']}")
+    def render(dest: str) -> None:
+        backend.render(video.file_path, action, dest)
     
-    # Save the processed video
-    out_path = _save_tmp(processed, video.id)
+    if cached_render is None:
+        render(out_path)
+    else:
+        out_path = cached_render(
+            video.file_path,
+            [action],
+            {"backend": backend.name},
+            render,
+            out_path
+        )
     
     # Create a new video entry
     new_video = Video.create_from_parent(video, out_path)
@@ -1,44 +1,176 @@
+import time
+import itertools
 import asyncpg
-from typing import Optional
+from typing import Optional, List, Dict, Tuple
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from app.core.config import settings
 
 
+# Monotonic time of the last primary connection released by the current
+# request/job. asyncio copies the context per task, so this is naturally
+# scoped to one request in FastAPI and to one job in the worker.
+_last_write_at: ContextVar[Optional[float]] = ContextVar("db_last_write_at", default=None)
+
+# Replication lag in seconds; a caught-up or non-replicating server reports 0
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
 class Database:
-    """Database connection manager for asyncpg pool."""
-    
-    def __init__(self):
+    """Database connection manager for asyncpg pools.
+
+    Writes always go to the primary pool. Reads issued through
+    `read_connection` are routed to an optional set of read replicas,
+    except right after a write from the same request, or when a replica
+    lags behind the primary by more than `max_replica_lag` seconds.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        replica_dsns: Optional[List[str]] = None,
+        read_after_write_window: Optional[float] = None,
+        max_replica_lag: Optional[float] = None,
+        lag_check_interval: Optional[float] = None
+    ):
+        self.dsn = dsn
+        self.replica_dsns = list(
+            settings.postgres_replica_dsns if replica_dsns is None else replica_dsns
+        )
+        self.read_after_write_window = (
+            settings.replica_read_after_write_window
+            if read_after_write_window is None else read_after_write_window
+        )
+        self.max_replica_lag = (
+            settings.replica_max_lag if max_replica_lag is None else max_replica_lag
+        )
+        self.lag_check_interval = (
+            settings.replica_lag_check_interval
+            if lag_check_interval is None else lag_check_interval
+        )
         self.pool: Optional[asyncpg.Pool] = None
-        
+        self.replica_pools: List[asyncpg.Pool] = []
+        self._replica_cycle = itertools.cycle([])
+        # Replica index -> (checked_at, lag_seconds)
+        self._replica_lag: Dict[int, Tuple[float, float]] = {}
+
     async def connect(self):
-        """Create database connection pool."""
+        """Create the primary and replica connection pools."""
         if self.pool is None:
-            self.pool = await asyncpg.create_pool(
-                user=settings.postgres_user,
-                password=settings.postgres_password,
-                host=settings.postgres_host,
-                port=settings.postgres_port,
-                database=settings.postgres_db,
-                min_size=5,
-                max_size=20
-            )
-    
+            if self.dsn:
+                self.pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=5,
+                    max_size=20
+                )
+            else:
+                self.pool = await asyncpg.create_pool(
+                    user=settings.postgres_user,
+                    password=settings.postgres_password,
+                    host=settings.postgres_host,
+                    port=settings.postgres_port,
+                    database=settings.postgres_db,
+                    min_size=5,
+                    max_size=20
+                )
+
+        if not self.replica_pools and self.replica_dsns:
+            for dsn in self.replica_dsns:
+                self.replica_pools.append(
+                    await asyncpg.create_pool(dsn, min_size=1, max_size=20)
+                )
+            self._replica_cycle = itertools.cycle(range(len(self.replica_pools)))
+
     async def disconnect(self):
-        """Close database connection pool."""
+        """Close all database connection pools."""
         if self.pool:
             await self.pool.close()
             self.pool = None
-    
+
+        for pool in self.replica_pools:
+            await pool.close()
+        self.replica_pools = []
+        self._replica_cycle = itertools.cycle([])
+        self._replica_lag.clear()
+
     @asynccontextmanager
     async def connection(self):
-        """Get a connection from the pool as a context manager."""
+        """Get a primary connection from the pool as a context manager.
+
+        Any use of the primary is treated as a write, so reads from the
+        same request stay on the primary for `read_after_write_window`.
+        """
+        if not self.pool:
+            await self.connect()
+
+        try:
+            async with self.pool.acquire() as conn:
+                yield conn
+        finally:
+            mark_write()
+
+    @asynccontextmanager
+    async def read_connection(self):
+        """Get a connection inside a read-only transaction.
+
+        The connection comes from a replica when one is configured and
+        fresh enough, otherwise from the primary.
+        """
         if not self.pool:
             await self.connect()
-        
-        async with self.pool.acquire() as conn:
-            yield conn
+
+        pool = await self._read_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                yield conn
+
+    async def _read_pool(self) -> asyncpg.Pool:
+        """Pick the pool that should serve the next read."""
+        if not self.replica_pools or recently_wrote(self.read_after_write_window):
+            return self.pool
+
+        for _ in range(len(self.replica_pools)):
+            index = next(self._replica_cycle)
+            if await self._replica_lag_seconds(index) <= self.max_replica_lag:
+                return self.replica_pools[index]
+
+        # Every replica is lagging
+        return self.pool
+
+    async def _replica_lag_seconds(self, index: int) -> float:
+        """Return the replica's lag, sampled at most once per check interval."""
+        now = time.monotonic()
+        checked = self._replica_lag.get(index)
+        if checked and now - checked[0] < self.lag_check_interval:
+            return checked[1]
+
+        try:
+            async with self.replica_pools[index].acquire() as conn:
+                lag = float(await conn.fetchval(REPLICA_LAG_QUERY))
+        except (asyncpg.PostgresError, OSError):
+            lag = float("inf")
+
+        self._replica_lag[index] = (now, lag)
+        return lag
+
+
+def mark_write() -> None:
+    """Record that the current request has just written to the primary."""
+    _last_write_at.set(time.monotonic())
+
+
+def recently_wrote(window: float) -> bool:
+    """Return True if the current request wrote within the last `window` seconds."""
+    last_write = _last_write_at.get()
+    return last_write is not None and time.monotonic() - last_write < window
 
 
 # Create a global instance
-db = Database() 
\ No newline at end of file
+db = Database()
@@ -4,6 +4,7 @@ Main FastAPI application
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import nlp_edit
+from app.routers import queues, waveforms
 
 # Create FastAPI application
 app = FastAPI(
@@ -23,6 +24,8 @@ app.add_middleware(
 
 # Include routers
 app.include_router(nlp_edit.router, prefix="/nlp")
+app.include_router(queues.router)
+app.include_router(waveforms.router)
 
 # Expose app at module level
 __all__ = ["app"] 
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""audio_features rows written by the audio analysis stage
+
+Revision ID: add_audio_features_columns
+Revises: add_media_info_table
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_audio_features_columns'
+down_revision = 'add_media_info_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # The table predates the migrations in some deployments, so create it
+    # only where missing and add the analysis columns to an existing one
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS audio_features (
+            id BIGSERIAL PRIMARY KEY,
+            project_id UUID NOT NULL,
+            timestamp DOUBLE PRECISION NOT NULL
+        )
+    """)
+    op.execute("""
+        ALTER TABLE audio_features
+            ADD COLUMN IF NOT EXISTS duration DOUBLE PRECISION,
+            ADD COLUMN IF NOT EXISTS rms_db REAL,
+            ADD COLUMN IF NOT EXISTS peak_db REAL,
+            ADD COLUMN IF NOT EXISTS is_silent BOOLEAN
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_audio_features_project_timestamp
+            ON audio_features (project_id, timestamp)
+    """)
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_audio_features_project_timestamp")
+    op.execute("""
+        ALTER TABLE audio_features
+            DROP COLUMN IF EXISTS is_silent,
+            DROP COLUMN IF EXISTS peak_db,
+            DROP COLUMN IF EXISTS rms_db,
+            DROP COLUMN IF EXISTS duration
+    """)
@@ -0,0 +1,28 @@
+"""cache probed media info by content hash
+
+Revision ID: add_media_info_table
+Revises: add_transcript_embedding_bytea
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_info_table'
+down_revision = 'add_transcript_embedding_bytea'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'media_info',
+        sa.Column('content_hash', sa.String(), nullable=False),
+        sa.Column('info', JSONB(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+
+def downgrade():
+    op.drop_table('media_info')
@@ -0,0 +1,32 @@
+"""store transcript embeddings as packed float32 bytea
+
+Revision ID: add_transcript_embedding_bytea
+Revises: add_transcripts_table
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY, FLOAT
+
+# revision identifiers, used by Alembic.
+revision = 'add_transcript_embedding_bytea'
+down_revision = 'add_transcripts_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('transcript', sa.Column('embedding_f32', sa.LargeBinary(), nullable=True))
+    op.alter_column('transcript', 'embedding', existing_type=ARRAY(FLOAT), nullable=True)
+    # The project transcripts read by the command resolver; the table
+    # predates the migrations, and existing rows are embedded by the
+    # `backfill_embeddings` worker task
+    op.execute("""
+        ALTER TABLE IF EXISTS transcripts
+            ADD COLUMN IF NOT EXISTS embedding_f32 BYTEA
+    """)
+
+def downgrade():
+    op.execute("ALTER TABLE IF EXISTS transcripts DROP COLUMN IF EXISTS embedding_f32")
+    op.alter_column('transcript', 'embedding', existing_type=ARRAY(FLOAT), nullable=False)
+    op.drop_column('transcript', 'embedding_f32')
@@ -0,0 +1,33 @@
+"""store waveform peak pyramids per video
+
+Revision ID: add_waveform_peaks_table
+Revises: add_audio_features_columns
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_waveform_peaks_table'
+down_revision = 'add_audio_features_columns'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'waveform_peaks',
+        sa.Column('video_id', sa.String(), nullable=False),
+        sa.Column('samples_per_bucket', sa.Integer(), nullable=False),
+        sa.Column('sample_rate', sa.Integer(), nullable=False),
+        sa.Column('bits', sa.SmallInteger(), nullable=False),
+        sa.Column('bucket_count', sa.Integer(), nullable=False),
+        sa.Column('peaks', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('video_id', 'samples_per_bucket')
+    )
+    # Uncompressed out-of-line storage lets substring() read only the
+    # pages of the requested range
+    op.execute("ALTER TABLE waveform_peaks ALTER COLUMN peaks SET STORAGE EXTERNAL")
+
+def downgrade():
+    op.drop_table('waveform_peaks')
@@ -12,6 +12,9 @@ router = APIRouter(tags=["auth"])
 # Security scheme
 security = HTTPBearer()
 
+# Role claim of tokens signed for the Supabase service key
+SERVICE_ROLE = "service_role"
+
 
 async def validate_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -86,6 +89,30 @@ async def get_current_user(
     return token["sub"]
 
 
+async def require_service_role(
+    token: Dict[str, Any] = Depends(validate_token)
+) -> Dict[str, Any]:
+    """
+    Only let service-role tokens through (internal callers such as autoscalers).
+    
+    Args:
+        token: Decoded JWT token
+        
+    Returns:
+        Decoded token payload
+        
+    Raises:
+        HTTPException: If the token is not a service-role token
+    """
+    if token.get("role") != SERVICE_ROLE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Service role required"
+        )
+    
+    return token
+
+
 @router.get("/verify-token", response_model=Dict[str, Any])
 async def verify_token(
     user_id: str = Depends(get_current_user)
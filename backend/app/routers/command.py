@@ -1,10 +1,15 @@
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Body, status
+import json
+from typing import Dict, Any, List, Tuple
+from uuid import NAMESPACE_URL, uuid5
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, status
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.routers.auth import get_current_user
-from app.services.nlp import process_command
+from app.core.render_plan import is_fusable
+from app.core.render_tiers import FINAL, PREVIEW
+from app.services.nlp import load_operations, process_command
+from app.services.job_queues import EXPORT
 from app.services.worker import enqueue_task
 from app.core.config import settings
 
@@ -18,9 +23,96 @@ router = APIRouter(
 )
 
 
+def _render_key(job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The fields of a job payload that decide what gets rendered.
+    
+    Every command stores fresh clip rows, so the operation ids (and the
+    plan id derived from them) would make a retried command a new job.
+    """
+    key = {k: v for k, v in job_data.items() if k not in ("operation_id", "plan_id")}
+    if "operations" in key:
+        key["operations"] = [_render_key(op) for op in key["operations"]]
+    return key
+
+
+def _render_jobs(
+    project_id: str,
+    operations: List[Dict[str, Any]],
+    operation_ids: List[str]
+) -> List[Tuple[str, Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    The jobs that render a command's operations.
+    
+    Returns:
+        (task type, job data, operations the job renders) per job: one
+        fused plan when the operations can share a render, else one job
+        per operation
+    """
+    payloads = [
+        {
+            "operation_id": operation_ids[i],
+            "project_id": project_id,
+            "operation_type": operation["operation_type"],
+            "start_time": operation.get("start_time"),
+            "end_time": operation.get("end_time"),
+            "parameters": operation.get("parameters", {})
+        }
+        for i, operation in enumerate(operations)
+    ]
+    
+    if len(payloads) > 1 and is_fusable(payloads):
+        # Render the whole command in a single fused pass
+        # Derived from the edit, so a retried command renders to the
+        # same output
+        plan_key = _render_key({"project_id": project_id, "operations": payloads})
+        plan_id = uuid5(NAMESPACE_URL, json.dumps(plan_key, sort_keys=True, default=str))
+        return [("process_plan", {
+            "plan_id": str(plan_id),
+            "project_id": project_id,
+            "operations": payloads
+        }, operations)]
+    
+    # Enqueue each operation for background processing
+    return [
+        ("process_clip", payload, [operation])
+        for operation, payload in zip(operations, payloads)
+    ]
+
+
+async def _enqueue_render(
+    task_type: str,
+    job_data: Dict[str, Any],
+    tier: str,
+    user_id: str
+) -> str:
+    """
+    Enqueue one render job at a tier.
+    
+    Previews go to the task's interactive queue. Final renders go to the
+    export queue and leave the clips' status to the preview they follow.
+    A retried command attaches to the job already rendering the same
+    edit, which then writes its result to the retry's clip rows too.
+    """
+    operation_ids = [str(op["operation_id"]) for op in job_data.get("operations", [job_data])]
+    if tier == PREVIEW:
+        data, queue_name = {**job_data, "render_tier": PREVIEW}, None
+    else:
+        data, queue_name = {**job_data, "render_tier": FINAL, "follows_preview": True}, EXPORT
+    return await enqueue_task(
+        task_type,
+        data,
+        queue_name=queue_name,
+        user_id=user_id,
+        key=_render_key(data),
+        operation_ids=operation_ids
+    )
+
+
 @router.post("/", response_model=Dict[str, Any])
 @limiter.limit(f"{settings.command_rate_limit}/minute")
 async def execute_command(
+    request: Request,
     request_data: Dict[str, Any] = Body(
         ...,
         example={
@@ -43,6 +135,7 @@ async def execute_command(
     6. Returns the planned operations
     
     Args:
+        request: The HTTP request (the rate limiter keys on its client)
         request_data: Dictionary with command details
         user_id: ID of the authenticated user
         
@@ -67,20 +160,19 @@ async def execute_command(
             user_id=user_id
         )
         
-        # Enqueue each operation for background processing
-        for i, operation in enumerate(result["operations"]):
-            # Enqueue task
-            job_id = await enqueue_task("process_clip", {
-                "operation_id": result["operation_ids"][i],
-                "project_id": project_id,
-                "operation_type": operation["operation_type"],
-                "start_time": operation.get("start_time"),
-                "end_time": operation.get("end_time"),
-                "parameters": operation.get("parameters", {})
-            })
-            
-            # Add job ID to result
-            operation["job_id"] = job_id
+        # Each job renders a quick preview first; with RENDER_FINAL_AUTO a
+        # full-quality final render of the same job follows at lower
+        # priority, otherwise the client asks for it through /export
+        jobs = _render_jobs(project_id, result["operations"], result["operation_ids"])
+        for task_type, job_data, operations in jobs:
+            job_id = await _enqueue_render(task_type, job_data, PREVIEW, user_id)
+            final_job_id = None
+            if settings.render_final_auto:
+                final_job_id = await _enqueue_render(task_type, job_data, FINAL, user_id)
+            for operation in operations:
+                operation["job_id"] = job_id
+                if final_job_id:
+                    operation["final_job_id"] = final_job_id
         
         return {
             "success": True,
@@ -99,4 +191,72 @@ async def execute_command(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process command: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+
+@router.post("/export", response_model=Dict[str, Any])
+@limiter.limit(f"{settings.command_rate_limit}/minute")
+async def export_command(
+    request: Request,
+    request_data: Dict[str, Any] = Body(
+        ...,
+        example={
+            "project_id": "123e4567-e89b-12d3-a456-426614174000",
+            "operation_ids": ["0f8fad5b-d9cb-469f-a165-70867728950e"]
+        }
+    ),
+    user_id: str = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Render a processed command at full quality.
+    
+    Enqueues the final tier of the command's operations on the export
+    queue, fused into one render exactly like their preview was. The
+    clips keep showing the preview until the final result replaces it.
+    
+    Args:
+        request: The HTTP request (the rate limiter keys on its client)
+        request_data: Dictionary with project_id and the operation_ids
+                      returned by the command
+        user_id: ID of the authenticated user
+        
+    Returns:
+        Dictionary with the operations and their final_job_id
+        
+    Raises:
+        HTTPException: If the operations are not found or enqueueing fails
+    """
+    try:
+        project_id = request_data.get("project_id")
+        operation_ids = [str(op_id) for op_id in request_data.get("operation_ids") or []]
+        
+        if not project_id or not operation_ids:
+            raise ValueError("Missing required fields: project_id, operation_ids")
+        
+        operations = await load_operations(project_id, operation_ids, user_id)
+        if len(operations) != len(operation_ids):
+            raise ValueError("Some operations were not found in this project")
+        
+        for task_type, job_data, job_operations in _render_jobs(project_id, operations, operation_ids):
+            final_job_id = await _enqueue_render(task_type, job_data, FINAL, user_id)
+            for operation in job_operations:
+                operation["final_job_id"] = final_job_id
+        
+        return {
+            "success": True,
+            "operations": operations,
+            "operation_ids": operation_ids,
+            "message": "Export queued"
+        }
+    
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue export: {str(e)}"
+        )
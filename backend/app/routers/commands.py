@@ -4,6 +4,8 @@ from sqlmodel import Session
 from ..core.video_editor import apply_command
 from ..core.models import Video, CommandRequest
 from ..db import get_db
+from ..services.media_info import probe_media
+from ..services.render_cache import render_to_disk_cache
 
 router = APIRouter()
 
@@ -25,7 +27,7 @@ async def run_command(
         The updated video object
     """
     video = Video.get(db, video_id)
-    new_video = apply_command(video, req.command)
+    new_video = _apply_command(video, req.command)
     
     # Broadcast the update to connected clients
     await _broadcast("video-updated", {
@@ -53,7 +55,7 @@ async def nlp_edit(
         The updated video and the action that was taken
     """
     video = Video.get(db, video_id)
-    new_video = apply_command(video, req.command)
+    new_video = _apply_command(video, req.command)
     
     # Broadcast the update to connected clients
     await _broadcast("video-updated", {
@@ -66,6 +68,15 @@ async def nlp_edit(
         "action": new_video.effects[-1].as_dict()  # Get the most recent effect
     }
 
+def _apply_command(video: Video, command: str) -> Video:
+    """Apply a command with the shared probe cache and render cache."""
+    return apply_command(
+        video,
+        command,
+        probe=lambda path: probe_media(path, keyframes=False).probe,
+        cached_render=render_to_disk_cache
+    )
+
 async def _broadcast(event: str, data: dict):
     """Broadcast an event to all connected WebSocket clients."""
     # TODO: Implement WebSocket broadcasting
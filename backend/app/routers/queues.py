@@ -0,0 +1,30 @@
+from typing import Dict, Any
+from fastapi import APIRouter, Depends
+
+from app.routers.auth import require_service_role
+from app.services.job_queues import queue_stats
+
+
+router = APIRouter(
+    prefix="/queues",
+    tags=["queues"]
+)
+
+
+@router.get("/stats", response_model=Dict[str, Any])
+async def get_queue_stats(
+    token: Dict[str, Any] = Depends(require_service_role)
+) -> Dict[str, Any]:
+    """
+    Report the depth and head-of-line wait of every worker queue.
+    
+    Autoscalers poll this with a service-role token to size the worker
+    pool per queue; user tokens are refused.
+    
+    Args:
+        token: Decoded service-role token
+    
+    Returns:
+        Per queue name: depth and oldest_wait_seconds
+    """
+    return queue_stats()
@@ -1,8 +1,15 @@
+import logging
 from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
+from ..core.config import settings
 from ..core.models import Video
 from ..core.transcript_generator import generate_transcripts
 from ..db import get_db
+from ..services.storage_transfer import storage_transfer
+from ..services.worker import enqueue_task
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -12,7 +19,10 @@ async def upload_video(
     db: Session = Depends(get_db)
 ):
     """
-    Upload a video and generate transcripts.
+    Upload a video, queue its preview proxy and generate transcripts.
+    
+    The original is stored where the workers read it; the proxy is
+    encoded by a background job rather than during the request.
     
     Args:
         file: The video file to upload
@@ -37,6 +47,22 @@ async def upload_video(
     db.commit()
     db.refresh(video)
     
+    # Store the original and queue the low-resolution proxy that previews read
+    await run_in_threadpool(
+        storage_transfer.upload_file,
+        "videos",
+        f"{video.id}.mp4",
+        video_path,
+        file.content_type or "video/mp4",
+        True
+    )
+    if settings.proxy_enabled:
+        try:
+            await enqueue_task("generate_proxy", {"video_id": str(video.id)})
+        except Exception:
+            # Previews fall back to the original
+            logger.exception("Could not queue proxy generation for %s", video.id)
+    
     # Generate transcripts
     transcripts = generate_transcripts(video)
     for transcript in transcripts:
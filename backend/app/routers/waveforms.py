@@ -0,0 +1,68 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+
+from app.routers.auth import get_current_user
+from app.services.waveforms import load_waveform_range
+
+
+router = APIRouter(
+    prefix="/waveforms",
+    tags=["waveforms"]
+)
+
+
+@router.get("/{video_id}")
+async def get_waveform(
+    video_id: str = Path(..., description="ID of the video"),
+    samples_per_bucket: int = Query(..., description="Pyramid level, e.g. 256, 1024 or 4096"),
+    start: float = Query(0.0, ge=0, description="Start of the range in seconds"),
+    end: Optional[float] = Query(None, ge=0, description="End of the range in seconds"),
+    user_id: str = Depends(get_current_user)
+) -> Response:
+    """
+    Waveform peaks of one pyramid level for a time range.
+    
+    The body is the packed (min, max) pairs of the buckets in range
+    (little-endian int8 or int16, see X-Waveform-Bits), so the timeline
+    only downloads what it draws at the current zoom.
+    
+    Args:
+        video_id: ID of the video
+        samples_per_bucket: Level to read
+        start: Start of the range in seconds
+        end: End of the range in seconds (default: the end of the audio)
+        user_id: ID of the authenticated user
+        
+    Returns:
+        application/octet-stream response with the level's metadata in
+        X-Waveform-* headers
+    
+    Raises:
+        HTTPException: If the video has no waveform at that level
+    """
+    if end is not None and end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must not be before start"
+        )
+    
+    found = await load_waveform_range(video_id, samples_per_bucket, start, end)
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No waveform at {samples_per_bucket} samples per bucket for video {video_id}"
+        )
+    
+    meta, peaks = found
+    return Response(
+        content=peaks,
+        media_type="application/octet-stream",
+        headers={
+            "X-Waveform-Sample-Rate": str(meta["sample_rate"]),
+            "X-Waveform-Samples-Per-Bucket": str(meta["samples_per_bucket"]),
+            "X-Waveform-Bits": str(meta["bits"]),
+            "X-Waveform-Bucket-Count": str(meta["bucket_count"]),
+            "X-Waveform-First-Bucket": str(meta["first_bucket"]),
+            "Cache-Control": "private, max-age=3600",
+        }
+    )
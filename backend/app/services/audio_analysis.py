@@ -0,0 +1,57 @@
+"""
+Populate the `audio_features` table of a project.
+
+Features are extracted block by block (see `app.core.audio_features`) and
+each block is bulk-loaded with COPY before the next one is read, so a long
+file never has all of its frames in memory at once. A re-analysis
+replaces the project's rows in one transaction.
+"""
+from typing import Any, Iterable, Iterator, Tuple
+
+from app.core.audio_features import FeatureBlock
+from app.db import db
+
+AUDIO_FEATURE_COLUMNS = ("project_id", "timestamp", "duration", "rms_db", "peak_db", "is_silent")
+
+
+def feature_records(project_id: Any, block: FeatureBlock) -> Iterator[Tuple]:
+    """Rows of one block in AUDIO_FEATURE_COLUMNS order."""
+    columns = (
+        block.timestamp.tolist(),
+        block.duration.tolist(),
+        block.rms_db.tolist(),
+        block.peak_db.tolist(),
+        block.is_silent.tolist(),
+    )
+    for values in zip(*columns):
+        yield (project_id, *values)
+
+
+async def store_audio_features(project_id: Any, blocks: Iterable[FeatureBlock]) -> int:
+    """
+    Replace a project's audio features with freshly extracted ones.
+
+    Args:
+        project_id: ID of the project
+        blocks: Feature blocks in time order (typically `extract_features`)
+
+    Returns:
+        Number of frames stored
+    """
+    total = 0
+    async with db.connection() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                """
+                DELETE FROM audio_features WHERE project_id = $1
+                """,
+                project_id
+            )
+            for block in blocks:
+                await conn.copy_records_to_table(
+                    "audio_features",
+                    records=feature_records(project_id, block),
+                    columns=AUDIO_FEATURE_COLUMNS
+                )
+                total += len(block)
+    return total
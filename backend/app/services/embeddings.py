@@ -0,0 +1,97 @@
+from typing import Callable, List, Tuple, Any, Optional, Sequence
+from uuid import UUID
+import numpy as np
+
+from app.core.embedding_codec import EMBEDDING_DTYPE, decode_matrix, encode_embedding
+from app.db import db
+
+
+async def fetch_embedding_matrix(project_id: Any) -> Tuple[List[Any], np.ndarray]:
+    """
+    Fetch all packed transcript embeddings of a project as one matrix.
+    
+    Postgres concatenates the `bytea` values in transcript order, so the
+    whole matrix arrives as a single buffer that NumPy views in place.
+    Segments without a stored embedding are skipped.
+    
+    Args:
+        project_id: ID of the project whose transcript to load
+        
+    Returns:
+        Tuple of (transcript_ids, embedding_matrix) in start_time order
+    """
+    async with db.read_connection() as conn:
+        row = await conn.fetchrow(
+            """
+            SELECT
+                array_agg(id ORDER BY start_time, id) AS ids,
+                string_agg(embedding_f32, ''::bytea ORDER BY start_time, id) AS matrix
+            FROM transcripts
+            WHERE project_id = $1 AND embedding_f32 IS NOT NULL
+            """,
+            project_id
+        )
+    
+    if not row or not row["ids"]:
+        return [], np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+    
+    ids = list(row["ids"])
+    return ids, decode_matrix(row["matrix"], rows=len(ids))
+
+
+async def backfill_embedding_column(
+    encode: Callable[[Sequence[str]], np.ndarray],
+    project_id: Optional[Any] = None,
+    batch_size: int = 500
+) -> int:
+    """
+    Populate `embedding_f32` for transcript segments that have none.
+    
+    Rows are walked in primary-key order with keyset pagination, one
+    short transaction per batch, so the job can be stopped and resumed.
+    
+    Args:
+        encode: Embeds a batch of sentences, one row per sentence
+        project_id: Only backfill this project (default: every project)
+        batch_size: Number of rows embedded per batch
+        
+    Returns:
+        Number of rows backfilled
+    """
+    total = 0
+    last_id: Optional[UUID] = None
+    
+    while True:
+        async with db.connection() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id, text FROM transcripts
+                WHERE embedding_f32 IS NULL
+                  AND ($1::uuid IS NULL OR project_id = $1)
+                  AND ($2::uuid IS NULL OR id > $2)
+                ORDER BY id
+                LIMIT $3
+                """,
+                project_id,
+                last_id,
+                batch_size
+            )
+            
+            if not rows:
+                break
+            
+            vectors = encode([r["text"] or "" for r in rows])
+            async with conn.transaction():
+                await conn.executemany(
+                    """
+                    UPDATE transcripts
+                    SET embedding_f32 = $2
+                    WHERE id = $1
+                    """,
+                    [(r["id"], encode_embedding(v)) for r, v in zip(rows, vectors)]
+                )
+        
+        last_id = rows[-1]["id"]
+        total += len(rows)
+    
+    return total
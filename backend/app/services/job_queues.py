@@ -0,0 +1,375 @@
+"""
+Priority queues and fair-share scheduling for worker jobs.
+
+Jobs go to one of four RQ queues by kind: interactive edits, ingest media
+work (thumbnails, proxies, audio analysis), exports (final renders) and
+backfills. A worker listens on all of them; before every dequeue it
+reorders them by a weighted draw, so interactive work is usually served
+first but long exports and backfills still make progress instead of
+starving.
+
+Each job carries the id of the user it was enqueued for. A user may only
+have FAIR_SHARE_MAX_RUNNING jobs running across all workers; a job over
+the limit goes back to the end of its queue, so one tenant's batch cannot
+occupy every worker while other users wait.
+
+Job ids are derived from the canonicalized payload (or from a key the
+caller picks), so a retried enqueue of the same work attaches to the job
+that is already queued or running. The clip rows of every enqueue that
+attached are recorded with the job, which writes its result to all of them.
+"""
+import json
+import random
+import time
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import uuid4
+import redis
+from rq import Queue, Worker
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+from rq.utils import utcnow
+
+from app.core.config import settings
+from app.core import metrics
+
+INTERACTIVE = "interactive"
+THUMBNAILS = "thumbnails"
+EXPORT = "export"
+BACKFILL = "backfill"
+
+# In order of importance; also the tie-break order of the weighted draw
+QUEUE_NAMES = (INTERACTIVE, THUMBNAILS, EXPORT, BACKFILL)
+
+# Queue each task type goes to unless the caller picks one
+TASK_QUEUES = {
+    "process_clip": INTERACTIVE,
+    "process_plan": INTERACTIVE,
+    "generate_proxy": THUMBNAILS,
+    "analyze_audio": THUMBNAILS,
+    "backfill_embeddings": BACKFILL,
+}
+
+FAIR_SHARE_PREFIX = "cre8rflow:fair_share"
+DEDUP_PREFIX = "cre8rflow:job_dedup"
+OPERATIONS_PREFIX = "cre8rflow:job_operations"
+
+# RQ's default result TTL; kept at least as long as the dedup window so an
+# attached job id can still be polled
+RESULT_TTL = 500
+
+# A job in one of these states is picked up by an identical enqueue
+ACTIVE_STATUSES = {
+    JobStatus.QUEUED,
+    JobStatus.STARTED,
+    JobStatus.DEFERRED,
+    JobStatus.SCHEDULED,
+}
+
+# Initialize Redis connection
+redis_conn = redis.from_url(settings.redis_url)
+
+queues: Dict[str, Queue] = {
+    name: Queue(name, connection=redis_conn) for name in QUEUE_NAMES
+}
+
+
+def queue_for(task_type: str) -> str:
+    """Name of the queue a task type goes to by default."""
+    return TASK_QUEUES.get(task_type, INTERACTIVE)
+
+
+def job_timeout(queue_name: str) -> int:
+    """Job timeout of a queue in seconds."""
+    return settings.queue_job_timeouts.get(queue_name, 3600)
+
+
+def job_id_for(task_type: str, data: Dict[str, Any], queue_name: str) -> str:
+    """
+    Deterministic job id of a task payload.
+
+    Args:
+        task_type: Task function name
+        data: Task payload
+        queue_name: Queue the job goes to
+
+    Returns:
+        Hex digest of the canonicalized (task, queue, payload)
+    """
+    payload = json.dumps(
+        {"task": task_type, "queue": queue_name, "data": data},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _fetch_job(job_id: str) -> Optional[Job]:
+    try:
+        return Job.fetch(job_id, connection=redis_conn)
+    except NoSuchJobError:
+        return None
+
+
+def _attach_operations(job_id: str, operation_ids: Sequence[str], ttl: int) -> bool:
+    """
+    Record clip rows that an existing job's result must be written to.
+
+    Returns False if the job has already collected its rows (see
+    `close_operations`), as rows added after that would never get it.
+    """
+    if not operation_ids:
+        return True
+    key = f"{OPERATIONS_PREFIX}:{job_id}"
+    pipe = redis_conn.pipeline()
+    pipe.sadd(key, *operation_ids)
+    pipe.expire(key, ttl)
+    pipe.exists(f"{key}:closed")
+    return not pipe.execute()[-1]
+
+
+def _reset_operations(job_id: str, operation_ids: Sequence[str], ttl: int) -> None:
+    """Start a (re)run's record of clip rows with its own rows."""
+    key = f"{OPERATIONS_PREFIX}:{job_id}"
+    pipe = redis_conn.pipeline()
+    pipe.delete(key, f"{key}:closed")
+    pipe.sadd(key, *operation_ids)
+    pipe.expire(key, ttl)
+    pipe.execute()
+
+
+def close_operations(job_id: str, operation_ids: Sequence[str]) -> List[str]:
+    """
+    Every clip row attached to a job, closing it to further attaches.
+
+    A job calls this when it writes its result. Later identical enqueues
+    no longer attach to it but run it again, which the render cache keeps
+    cheap.
+
+    Args:
+        job_id: ID of the running job
+        operation_ids: The job's own clip rows
+
+    Returns:
+        The job's rows plus those of every enqueue that attached to it
+    """
+    key = f"{OPERATIONS_PREFIX}:{job_id}"
+    pipe = redis_conn.pipeline()
+    pipe.set(f"{key}:closed", 1, ex=max(RESULT_TTL, settings.job_dedup_window))
+    pipe.smembers(key)
+    attached = pipe.execute()[-1]
+    return sorted({str(op) for op in operation_ids} | {
+        member.decode() if isinstance(member, bytes) else member for member in attached
+    })
+
+
+def enqueue_job(
+    queue_name: str,
+    task_type: str,
+    func: str,
+    data: Dict[str, Any],
+    user_id: Optional[str] = None,
+    key: Optional[Dict[str, Any]] = None,
+    operation_ids: Optional[Sequence[str]] = None
+) -> str:
+    """
+    Enqueue a job, attaching to an identical one when there is one.
+
+    The job id is derived from `key` (default: the payload). An identical
+    key attaches to the existing job while it is queued or running, and to
+    its result for JOB_DEDUP_WINDOW seconds after it was enqueued. A failed
+    job, or a finished one outside the window, is run again under the same
+    id, so any id handed out stays valid for polling.
+
+    Enqueues that carry clip rows attach only while the job can still
+    write its result to them; otherwise the job is run again for them.
+
+    Args:
+        queue_name: Priority queue
+        task_type: Task function name
+        func: Import path of the task function
+        data: Task payload
+        user_id: User the job runs for, for fair-share scheduling
+        key: The fields that identify the work (default: the payload)
+        operation_ids: Clip rows that get the job's result
+
+    Returns:
+        Job ID
+    """
+    window = settings.job_dedup_window
+    ttl = job_timeout(queue_name) + window
+    if window <= 0:
+        job_id = str(uuid4())
+    else:
+        job_id = job_id_for(task_type, data if key is None else key, queue_name)
+        # The claim marks the window and serializes concurrent enqueues
+        claimed = redis_conn.set(f"{DEDUP_PREFIX}:{job_id}", 1, nx=True, ex=window)
+        job = _fetch_job(job_id)
+        if job is not None:
+            status = job.get_status()
+            if status in ACTIVE_STATUSES or (status == JobStatus.FINISHED and not claimed):
+                if _attach_operations(job_id, operation_ids or [], ttl):
+                    metrics.incr("job_dedup_hits")
+                    return job_id
+        elif not claimed:
+            # A concurrent enqueue holds the claim and is creating the job
+            if _attach_operations(job_id, operation_ids or [], ttl):
+                metrics.incr("job_dedup_hits")
+                return job_id
+        if operation_ids:
+            _reset_operations(job_id, operation_ids, ttl)
+
+    queues[queue_name].enqueue(
+        func,
+        data,
+        job_id=job_id,
+        job_timeout=job_timeout(queue_name),
+        result_ttl=max(RESULT_TTL, window),
+        meta={"user_id": user_id}
+    )
+    return job_id
+
+
+def weighted_order(
+    names: Sequence[str],
+    weights: Dict[str, float],
+    rng: Optional[random.Random] = None
+) -> List[str]:
+    """
+    Draw an order of queue names, each position weighted by queue weight.
+
+    Weighted sampling without replacement (Efraimidis-Spirakis): a queue
+    with twice the weight is twice as likely to come first, and every
+    queue with a positive weight can come first.
+
+    Args:
+        names: Queue names
+        weights: Weight per queue name (missing or <= 0 sorts last)
+        rng: Random source (default: the module's)
+
+    Returns:
+        The names in dequeue order
+    """
+    rng = rng or random
+    keys = {}
+    for name in names:
+        weight = weights.get(name, 0)
+        keys[name] = rng.random() ** (1.0 / weight) if weight > 0 else -1.0
+    return sorted(names, key=lambda name: keys[name], reverse=True)
+
+
+class FairShare:
+    """
+    Per-user limit on concurrently running jobs, shared by all workers.
+
+    Counters live in Redis and expire, so a crashed work horse cannot hold
+    a slot for longer than a job could run.
+    """
+
+    def __init__(self, redis_conn: redis.Redis, max_running: int):
+        self.redis = redis_conn
+        self.max_running = max_running
+
+    def _key(self, user_id: str) -> str:
+        return f"{FAIR_SHARE_PREFIX}:{user_id}"
+
+    def acquire(self, user_id: Optional[str], ttl: int) -> bool:
+        """
+        Take a running slot for a user.
+
+        Args:
+            user_id: User the job runs for (None is never limited)
+            ttl: Seconds after which the slot frees itself
+
+        Returns:
+            True if the job may run now
+        """
+        if not user_id or self.max_running <= 0:
+            return True
+        try:
+            pipe = self.redis.pipeline()
+            pipe.incr(self._key(user_id))
+            pipe.expire(self._key(user_id), ttl)
+            running, _ = pipe.execute()
+            if running > self.max_running:
+                self.redis.decr(self._key(user_id))
+                return False
+        except redis.RedisError:
+            # Never stop work because the limiter is unavailable
+            pass
+        return True
+
+    def release(self, user_id: Optional[str]) -> None:
+        """Give back a running slot taken with `acquire`."""
+        if not user_id or self.max_running <= 0:
+            return
+        try:
+            self.redis.decr(self._key(user_id))
+        except redis.RedisError:
+            pass
+
+
+def record_queue_depths() -> None:
+    """Publish the number of waiting jobs per queue as gauges."""
+    for name, queue in queues.items():
+        try:
+            metrics.set_gauge(f"queue_depth_{name}", queue.count)
+        except redis.RedisError:
+            pass
+
+
+def queue_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Current depth and head-of-line wait of every queue, for autoscaling.
+
+    Returns:
+        Per queue name: depth (waiting jobs) and oldest_wait_seconds (how
+        long the next job to run has been waiting, 0 when empty)
+    """
+    stats = {}
+    now = utcnow()
+    for name, queue in queues.items():
+        oldest_wait = 0.0
+        head = queue.get_job_ids(0, 1)
+        if head:
+            job = queue.fetch_job(head[0])
+            if job is not None and job.enqueued_at is not None:
+                oldest_wait = max(0.0, (now - job.enqueued_at).total_seconds())
+        stats[name] = {"depth": queue.count, "oldest_wait_seconds": oldest_wait}
+    return stats
+
+
+class WeightedWorker(Worker):
+    """
+    RQ worker that serves the priority queues in weighted order and
+    enforces per-user fair share.
+    """
+
+    fair_share = FairShare(redis_conn, settings.fair_share_max_running)
+
+    def reorder_queues(self, reference_queue):
+        by_name = {queue.name: queue for queue in self.queues}
+        order = weighted_order(list(by_name), settings.queue_weights)
+        self._ordered_queues = [by_name[name] for name in order]
+
+    def execute_job(self, job: Job, queue: Queue):
+        user_id = job.meta.get("user_id")
+        if not self.fair_share.acquire(user_id, job_timeout(queue.name)):
+            # Over the user's share: back to the end of the line
+            queue.push_job_id(job.id)
+            metrics.incr(f"fair_share_deferrals_{queue.name}")
+            time.sleep(settings.fair_share_retry_delay)
+            return
+
+        if job.enqueued_at is not None:
+            metrics.observe(
+                f"queue_wait_seconds_{queue.name}",
+                (utcnow() - job.enqueued_at).total_seconds()
+            )
+        record_queue_depths()
+
+        try:
+            super().execute_job(job, queue)
+        finally:
+            self.fair_share.release(user_id)
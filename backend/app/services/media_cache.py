@@ -0,0 +1,281 @@
+import os
+import re
+import fcntl
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Any
+
+from app.core.config import settings
+from app.core import metrics
+from app.services.storage_transfer import storage_transfer
+
+
+class MediaCache:
+    """
+    Per-host, disk-budgeted LRU cache of source media.
+    
+    Entries are keyed by video id plus a content hash, so a re-uploaded
+    video never serves stale bytes. Every entry has a sidecar lock file:
+    users hold a shared `flock` while reading, fills hold it exclusively,
+    so concurrent jobs (threads or processes) share a single download and
+    eviction never removes a file that is in use. Eviction removes the
+    lock file too; a job that locked the removed file starts over.
+    """
+    
+    def __init__(self, root: str, max_bytes: int, metric_prefix: str = "media_cache"):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.metric_prefix = metric_prefix
+    
+    def _entry_path(self, video_id: str, content_hash: str, suffix: str) -> str:
+        key = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{video_id}-{content_hash}")
+        return os.path.join(self.root, f"{key}{suffix}")
+    
+    @staticmethod
+    def _lock_is_current(lock_fd: int, lock_path: str) -> bool:
+        """True if `lock_fd` is still the entry's lock file (not evicted)."""
+        try:
+            return os.fstat(lock_fd).st_ino == os.stat(lock_path).st_ino
+        except FileNotFoundError:
+            return False
+    
+    @contextmanager
+    def open(
+        self,
+        video_id: str,
+        content_hash: str,
+        fetch: Callable[[str], None],
+        suffix: str = ".mp4"
+    ) -> Iterator[str]:
+        """
+        Yield a local path to the media, fetching it on a miss.
+        
+        Args:
+            video_id: ID of the video
+            content_hash: Hash or ETag identifying the stored bytes
+            fetch: Callable that writes the media to the path it is given
+            suffix: File extension of the cached entry
+            
+        Yields:
+            Path to the cached file, valid until the context exits
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = self._entry_path(video_id, content_hash, suffix)
+        lock_path = f"{path}.lock"
+        lock_fd: Optional[int] = None
+        filled = False
+        
+        try:
+            while True:
+                if lock_fd is None:
+                    lock_fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+                
+                fcntl.flock(lock_fd, fcntl.LOCK_SH)
+                if not self._lock_is_current(lock_fd, lock_path):
+                    os.close(lock_fd)
+                    lock_fd = None
+                    continue
+                if os.path.exists(path):
+                    break
+                
+                # Upgrade to an exclusive lock and re-check: another job may
+                # have filled (or evicted) the entry while we waited
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+                if not self._lock_is_current(lock_fd, lock_path):
+                    os.close(lock_fd)
+                    lock_fd = None
+                    continue
+                if not os.path.exists(path):
+                    self._fill(path, fetch, suffix)
+                    filled = True
+            
+            size = os.path.getsize(path)
+            if filled:
+                metrics.incr(f"{self.metric_prefix}_misses")
+                metrics.incr(f"{self.metric_prefix}_bytes_fetched", size)
+                self.evict(keep=path)
+            else:
+                os.utime(path)
+                metrics.incr(f"{self.metric_prefix}_hits")
+                metrics.incr(f"{self.metric_prefix}_bytes_saved", size)
+            
+            yield path
+        finally:
+            if lock_fd is not None:
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                os.close(lock_fd)
+    
+    def _fill(self, path: str, fetch: Callable[[str], None], suffix: str) -> None:
+        """Fetch into a temporary file and atomically move it into place."""
+        # Keep the entry's extension so writers that infer the format from
+        # it (ffmpeg) can fill the temporary file directly
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".part-", suffix=suffix)
+        os.close(fd)
+        try:
+            fetch(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits its budget.
+        
+        Entries that are currently locked by another job are skipped.
+        
+        Args:
+            keep: Path that must not be evicted
+            
+        Returns:
+            Number of bytes freed
+        """
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        
+        entries = []
+        for name in names:
+            if name.endswith(".lock") or name.startswith(".part-"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            
+            lock_path = f"{path}.lock"
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(lock_fd)
+                continue
+            
+            try:
+                if not self._lock_is_current(lock_fd, lock_path):
+                    continue
+                os.remove(path)
+                total -= size
+                freed += size
+                metrics.incr(f"{self.metric_prefix}_evictions")
+            except FileNotFoundError:
+                pass
+            finally:
+                # Unlinked while still held, so waiters see a stale lock
+                if self._lock_is_current(lock_fd, lock_path) and not os.path.exists(path):
+                    os.remove(lock_path)
+                fcntl.flock(lock_fd, fcntl.LOCK_UN)
+                os.close(lock_fd)
+        
+        return freed
+
+
+def source_fingerprint(supabase: Any, bucket: str, object_path: str) -> Optional[str]:
+    """
+    Identify the stored bytes of an object from its storage metadata.
+    
+    Args:
+        supabase: Supabase client
+        bucket: Storage bucket name
+        object_path: Path of the object inside the bucket
+        
+    Returns:
+        The object's ETag (or size/mtime pair), or None if unavailable
+    """
+    folder, _, name = object_path.rpartition("/")
+    try:
+        entries = supabase.storage.from_(bucket).list(folder or None, {"search": name})
+    except Exception:
+        return None
+    
+    for entry in entries or []:
+        if entry.get("name") != name:
+            continue
+        meta = entry.get("metadata") or {}
+        if meta.get("eTag"):
+            return meta["eTag"].strip('"')
+        if meta.get("size") and meta.get("lastModified"):
+            return f"{meta['size']}-{meta['lastModified']}"
+    return None
+
+
+@contextmanager
+def cached_source(
+    supabase: Any,
+    video_id: str,
+    bucket: str = "videos",
+    object_path: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Yield a local path to a source video, served from the media cache.
+    
+    Falls back to a private temporary download when the object's content
+    hash cannot be determined.
+    
+    Args:
+        supabase: Supabase client
+        video_id: ID of the video in storage
+        bucket: Storage bucket holding the video
+        object_path: Object to read (default: the original, `<video_id>.mp4`)
+        
+    Yields:
+        Path to a local copy of the video
+    """
+    object_path = object_path or f"{video_id}.mp4"
+    
+    def fetch(path: str) -> None:
+        storage_transfer.download_to_file(bucket, object_path, path)
+    
+    content_hash = source_fingerprint(supabase, bucket, object_path)
+    if content_hash is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, os.path.basename(object_path))
+            fetch(path)
+            yield path
+        return
+    
+    with media_cache.open(video_id, content_hash, fetch) as path:
+        yield path
+
+
+def proxy_object_path(video_id: str) -> str:
+    """Storage path of a video's proxy, in the videos bucket."""
+    return f"proxies/{video_id}.mp4"
+
+
+@contextmanager
+def cached_preview_source(supabase: Any, video_id: str) -> Iterator[str]:
+    """
+    Yield a local path to the media previews should read.
+    
+    That is the video's proxy when one has been generated, else the
+    original. Either way it comes from the media cache.
+    
+    Args:
+        supabase: Supabase client
+        video_id: ID of the video in storage
+        
+    Yields:
+        Path to a local copy of the proxy or the original
+    """
+    object_path = proxy_object_path(video_id)
+    if source_fingerprint(supabase, "videos", object_path) is None:
+        object_path = None
+    
+    with cached_source(supabase, video_id, object_path=object_path) as path:
+        yield path
+
+
+# Create a global instance
+media_cache = MediaCache(settings.media_cache_dir, settings.media_cache_max_bytes)
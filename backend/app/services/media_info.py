@@ -0,0 +1,295 @@
+"""
+Probed media information, shared by every ffmpeg code path.
+
+Probing a file means an ffprobe run (and, for the keyframe index, a read of
+every packet), so results are kept:
+
+- in memory, per process, keyed by the file's identity (path, size and
+  mtime), in an LRU of MEDIA_INFO_CACHE_SIZE entries;
+- in the `media_info` table, keyed by the content hash of the stored
+  object, when the caller knows it, so other hosts and later jobs reuse it.
+
+Frame rates are parsed as fractions (ffprobe reports e.g. "30000/1001" or
+"0/0"), never evaluated.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Tuple
+import ffmpeg
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.ffmpeg_async import probe as probe_async
+from app.core.ffmpeg_async import run_ffmpeg
+from app.core.smart_cut import (
+    VIDEO_FORMAT_FIELDS,
+    KeyframeScan,
+    keyframe_scan_output,
+    parse_keyframe_scan,
+    scan_keyframes,
+)
+from app.db import db
+
+
+def parse_frame_rate(value: Optional[str]) -> Optional[float]:
+    """
+    Frames per second from an ffprobe rate such as "30000/1001" or "25".
+
+    Returns:
+        The rate, or None if it is missing, malformed or zero ("0/0")
+    """
+    try:
+        rate = Fraction(str(value))
+    except (ValueError, ZeroDivisionError):
+        return None
+    return float(rate) if rate > 0 else None
+
+
+@dataclass
+class MediaInfo:
+    """Duration, stream layout and keyframe index of a media file."""
+    duration: float
+    format_name: Optional[str] = None
+    # One entry per stream: index, codec_type, codec_name and, for video,
+    # width/height/fps and profile/level/pix_fmt/time_base, for audio,
+    # sample_rate/channels
+    streams: List[Dict[str, Any]] = field(default_factory=list)
+    # Keyframe times in seconds; None until the file has been scanned
+    keyframes: Optional[List[float]] = None
+    # Raw ffprobe output, for code that takes it as `media_info`
+    probe: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def video(self) -> Optional[Dict[str, Any]]:
+        """The first video stream, if any."""
+        return next((s for s in self.streams if s["codec_type"] == "video"), None)
+
+    @property
+    def has_audio(self) -> bool:
+        return any(s["codec_type"] == "audio" for s in self.streams)
+
+    @property
+    def fps(self) -> Optional[float]:
+        return self.video["fps"] if self.video else None
+
+    def keyframe_scan(self) -> Optional[KeyframeScan]:
+        """The keyframe index in the form `smart_cut` takes, if scanned."""
+        if self.keyframes is None or self.video is None:
+            return None
+        return KeyframeScan(
+            codec=self.video["codec_name"],
+            keyframes=list(self.keyframes),
+            has_audio=self.has_audio,
+            end=self.duration,
+            video_format={name: self.video.get(name) for name in VIDEO_FORMAT_FIELDS}
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MediaInfo":
+        return cls(**data)
+
+
+def media_info_from_probe(
+    probed: Dict[str, Any],
+    keyframes: Optional[List[float]] = None
+) -> MediaInfo:
+    """
+    Summarize ffprobe output.
+
+    Args:
+        probed: Output of `ffmpeg.probe` (format and streams)
+        keyframes: Keyframe times, if scanned
+
+    Returns:
+        MediaInfo of the file
+    """
+    streams = []
+    for stream in probed.get("streams", []):
+        entry = {
+            "index": stream.get("index"),
+            "codec_type": stream.get("codec_type"),
+            "codec_name": stream.get("codec_name"),
+        }
+        if stream.get("codec_type") == "video":
+            entry.update(
+                width=stream.get("width"),
+                height=stream.get("height"),
+                fps=(
+                    parse_frame_rate(stream.get("r_frame_rate"))
+                    or parse_frame_rate(stream.get("avg_frame_rate"))
+                ),
+                **{name: stream.get(name) for name in VIDEO_FORMAT_FIELDS}
+            )
+        elif stream.get("codec_type") == "audio":
+            entry.update(
+                sample_rate=int(stream.get("sample_rate") or 0) or None,
+                channels=stream.get("channels")
+            )
+        streams.append(entry)
+
+    fmt = probed.get("format", {})
+    return MediaInfo(
+        duration=float(fmt.get("duration") or 0.0),
+        format_name=fmt.get("format_name"),
+        streams=streams,
+        keyframes=keyframes,
+        probe=probed
+    )
+
+
+class MediaInfoCache:
+    """Bounded LRU of media info, keyed by file identity."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, MediaInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[MediaInfo]:
+        with self._lock:
+            info = self._entries.get(key)
+            if info is not None:
+                self._entries.move_to_end(key)
+            return info
+
+    def put(self, key: Tuple, info: MediaInfo) -> None:
+        with self._lock:
+            self._entries[key] = info
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+media_info_cache = MediaInfoCache(settings.media_info_cache_size)
+
+
+def file_identity(path: str) -> Optional[Tuple[str, int, int]]:
+    """(path, size, mtime) of a local file, or None for URLs and missing files."""
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def _cached(identity: Optional[Tuple], keyframes: bool) -> Optional[MediaInfo]:
+    info = media_info_cache.get(identity) if identity else None
+    if info is not None and (info.keyframes is not None or not keyframes):
+        metrics.incr("media_info_memory_hits")
+        return info
+    return None
+
+
+def probe_media(path: str, keyframes: bool = True) -> MediaInfo:
+    """
+    Media info of a file, probing it only on a cache miss.
+
+    Blocking; async code uses `load_media_info`.
+
+    Args:
+        path: Path (or URL, which is not cached) of the media
+        keyframes: Also build the keyframe index
+
+    Returns:
+        MediaInfo of the file
+    """
+    identity = file_identity(path)
+    info = _cached(identity, keyframes)
+    if info is not None:
+        return info
+
+    metrics.incr("media_info_probes")
+    info = media_info_from_probe(
+        ffmpeg.probe(path), scan_keyframes(path).keyframes if keyframes else None
+    )
+    if identity:
+        media_info_cache.put(identity, info)
+    return info
+
+
+async def _load_stored(content_hash: str) -> Optional[MediaInfo]:
+    try:
+        async with db.read_connection() as conn:
+            row = await conn.fetchrow(
+                "SELECT info FROM media_info WHERE content_hash = $1",
+                content_hash
+            )
+    except Exception:
+        # The table is a cache; probing still works without it
+        return None
+    if row is None:
+        return None
+    info = row["info"]
+    return MediaInfo.from_dict(json.loads(info) if isinstance(info, str) else info)
+
+
+async def _store(content_hash: str, info: MediaInfo) -> None:
+    try:
+        async with db.connection() as conn:
+            await conn.execute(
+                """
+                INSERT INTO media_info (content_hash, info)
+                VALUES ($1, $2)
+                ON CONFLICT (content_hash) DO UPDATE
+                SET info = $2, updated_at = now()
+                """,
+                content_hash,
+                json.dumps(info.to_dict())
+            )
+    except Exception:
+        pass
+
+
+async def load_media_info(
+    path: str,
+    content_hash: Optional[str] = None,
+    keyframes: bool = True
+) -> MediaInfo:
+    """
+    Media info of a file, from memory, the database or a fresh probe.
+
+    ffprobe and the keyframe scan run as async subprocesses under the host's
+    ffmpeg process limit.
+
+    Args:
+        path: Path (or URL) of the media
+        content_hash: Hash or ETag of the stored bytes; enables the
+                      `media_info` table as a shared cache
+        keyframes: Also build the keyframe index
+
+    Returns:
+        MediaInfo of the file
+    """
+    identity = file_identity(path)
+    info = _cached(identity, keyframes)
+    if info is not None:
+        return info
+
+    if content_hash:
+        info = await _load_stored(content_hash)
+        if info is not None and (info.keyframes is not None or not keyframes):
+            metrics.incr("media_info_db_hits")
+            if identity:
+                media_info_cache.put(identity, info)
+            return info
+
+    metrics.incr("media_info_probes")
+    probed = await probe_async(path)
+    keyframe_times = None
+    if keyframes:
+        out, _ = await run_ffmpeg(keyframe_scan_output(path))
+        keyframe_times = parse_keyframe_scan(out).keyframes
+    info = media_info_from_probe(probed, keyframe_times)
+    if identity:
+        media_info_cache.put(identity, info)
+    if content_hash:
+        await _store(content_hash, info)
+    return info
+
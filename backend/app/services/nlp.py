@@ -4,8 +4,14 @@ from openai import AsyncOpenAI
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from app.core.command_patterns import match_silence_removal
 from app.core.config import settings
+from app.core.silence_planner import plan_silence_removal
+from app.core.timeline import ProjectTimeline
 from app.db import db
+from app.services.embeddings import fetch_embedding_matrix
+from app.services.job_queues import enqueue_job, queue_for
+from app.services.project_stream import load_audio_columns
 
 
 # Initialize OpenAI client
@@ -31,22 +37,42 @@ async def process_command(
     Returns:
         Dictionary with processing results and operations
     """
-    # Fetch project data
+    # Audio features are streamed only where they are needed (see
+    # app.services.project_stream) rather than loaded with the project
     project_data = await fetch_project_data(project_id)
+    timeline = ProjectTimeline.from_project_data(project_data)
+    
+    # Silence and filler removal is planned from the audio features and
+    # transcript directly; its cut points are measured, so not snapped
+    if cleanup := match_silence_removal(command_text):
+        if cleanup["silences"]:
+            await load_audio_columns(timeline, project_id)
+        operations = plan_silence_removal(timeline, **cleanup)
+        operation_ids = await save_operations(operations, project_id, user_id)
+        return {
+            "success": True,
+            "operations": operations,
+            "operation_ids": operation_ids
+        }
     
     # Resolve references to timestamps in command
     resolved_command, timestamps = await resolve_timestamp_references(
         command_text, 
-        project_data
+        project_data,
+        timeline
     )
     
     # Call GPT-4o to plan the edit
     operations = await plan_edit_with_gpt(
         resolved_command, 
         project_data, 
-        timestamps
+        timestamps,
+        timeline
     )
     
+    # Align cut points with sentence and scene boundaries
+    operations = snap_operations(operations, timeline, settings.cut_snap_tolerance)
+    
     # Save operations to database
     operation_ids = await save_operations(operations, project_id, user_id)
     
@@ -59,7 +85,10 @@ async def process_command(
 
 async def fetch_project_data(project_id: str) -> Dict[str, Any]:
     """
-    Fetch project data including transcript, scenes and audio features.
+    Fetch project data including transcript, scenes and clips.
+    
+    Audio features are not loaded; stream them with
+    `project_stream.stream_audio_features` or `load_audio_columns`.
     
     Args:
         project_id: ID of the project
@@ -67,7 +96,7 @@ async def fetch_project_data(project_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with project data
     """
-    async with db.connection() as conn:
+    async with db.read_connection() as conn:
         # Fetch project metadata
         project = await conn.fetchrow(
             """
@@ -79,12 +108,13 @@ async def fetch_project_data(project_id: str) -> Dict[str, Any]:
         if not project:
             raise ValueError(f"Project with ID {project_id} not found")
         
-        # Fetch transcript
+        # Fetch transcript; stored embeddings are loaded separately as
+        # one matrix (see `attach_embeddings`)
         transcript = await conn.fetch(
             """
-            SELECT * FROM transcripts 
+            SELECT id, project_id, start_time, end_time, text FROM transcripts
             WHERE project_id = $1
-            ORDER BY start_time
+            ORDER BY start_time, id
             """,
             project_id
         )
@@ -99,16 +129,6 @@ async def fetch_project_data(project_id: str) -> Dict[str, Any]:
             project_id
         )
         
-        # Fetch audio features
-        audio_features = await conn.fetch(
-            """
-            SELECT * FROM audio_features
-            WHERE project_id = $1
-            ORDER BY timestamp
-            """,
-            project_id
-        )
-        
         # Fetch current clips
         clips = await conn.fetch(
             """
@@ -123,14 +143,49 @@ async def fetch_project_data(project_id: str) -> Dict[str, Any]:
         "project": dict(project),
         "transcript": [dict(t) for t in transcript],
         "scenes": [dict(s) for s in scenes],
-        "audio_features": [dict(a) for a in audio_features],
         "clips": [dict(c) for c in clips]
     }
 
 
+async def attach_embeddings(timeline: ProjectTimeline, project_id: str) -> None:
+    """
+    Give the timeline's transcript an embedding matrix.
+    
+    The stored packed embeddings are used when every segment has one.
+    Otherwise the transcript is embedded here and a backfill is queued,
+    so the next command finds the stored matrix.
+    
+    Args:
+        timeline: Columnar project snapshot
+        project_id: ID of the project
+    """
+    if timeline.embeddings is not None or not len(timeline):
+        return
+    
+    ids, matrix = await fetch_embedding_matrix(project_id)
+    if len(ids) == len(timeline):
+        timeline.embeddings = matrix
+        return
+    
+    timeline.embeddings = np.asarray(
+        embedding_model.encode(timeline.transcript_text),
+        dtype=np.float32
+    )
+    # Every command on the project lands here until the backfill has run;
+    # the job's deterministic id (JOB_DEDUP_WINDOW) attaches those repeats
+    # to the one queued or running backfill instead of queueing more
+    enqueue_job(
+        queue_for("backfill_embeddings"),
+        "backfill_embeddings",
+        "app.services.worker.backfill_embeddings",
+        {"project_id": project_id}
+    )
+
+
 async def resolve_timestamp_references(
     command_text: str, 
-    project_data: Dict[str, Any]
+    project_data: Dict[str, Any],
+    timeline: Optional[ProjectTimeline] = None
 ) -> Tuple[str, Dict[str, float]]:
     """
     Resolve natural language references to timestamps.
@@ -138,17 +193,15 @@ async def resolve_timestamp_references(
     Args:
         command_text: Natural language command text
         project_data: Project data including transcript
+        timeline: Columnar view of `project_data`; built if not given
         
     Returns:
         Tuple of (resolved_command, timestamp_dict)
     """
-    # Create embeddings for transcript segments
-    transcript = project_data["transcript"]
-    sentences = [t["text"] for t in transcript]
-    timestamps = [t["start_time"] for t in transcript]
+    if timeline is None:
+        timeline = ProjectTimeline.from_project_data(project_data)
     
-    # Create embeddings for all transcript segments
-    sentence_embeddings = embedding_model.encode(sentences)
+    await attach_embeddings(timeline, project_data["project"]["id"])
     
     # Extract potential references from command text
     # This is a simplified approach - in production we would use more sophisticated NER
@@ -172,23 +225,21 @@ async def resolve_timestamp_references(
     timestamp_dict = {}
     for ref in potential_references:
         if ref:
+            if not len(timeline):
+                break
+            
             ref_embedding = embedding_model.encode([ref])[0]
             
-            # Calculate cosine similarity
-            similarities = []
-            for sent_emb in sentence_embeddings:
-                similarity = np.dot(ref_embedding, sent_emb) / (
-                    np.linalg.norm(ref_embedding) * np.linalg.norm(sent_emb)
-                )
-                similarities.append(similarity)
+            # Calculate cosine similarity against all segments at once
+            similarities = timeline.similarities(ref_embedding)
             
             # Find best match
-            best_match_idx = np.argmax(similarities)
+            best_match_idx = int(np.argmax(similarities))
             best_similarity = similarities[best_match_idx]
             
             # Only use matches above a threshold
             if best_similarity > 0.6:
-                timestamp_dict[ref] = timestamps[best_match_idx]
+                timestamp_dict[ref] = float(timeline.transcript_start[best_match_idx])
     
     # Create a resolved command with timestamp markers
     resolved_command = command_text
@@ -208,7 +259,8 @@ async def resolve_timestamp_references(
 async def plan_edit_with_gpt(
     command: str, 
     project_data: Dict[str, Any],
-    timestamps: Dict[str, float]
+    timestamps: Dict[str, float],
+    timeline: Optional[ProjectTimeline] = None
 ) -> List[Dict[str, Any]]:
     """
     Use GPT-4o to plan edits based on the command.
@@ -217,6 +269,7 @@ async def plan_edit_with_gpt(
         command: Resolved command text
         project_data: Project data
         timestamps: Dictionary mapping references to timestamps
+        timeline: Columnar view of `project_data`; built if not given
         
     Returns:
         List of edit operations
@@ -271,12 +324,12 @@ async def plan_edit_with_gpt(
     ]
     
     # Prepare context for GPT
+    if timeline is None:
+        timeline = ProjectTimeline.from_project_data(project_data)
+    
     clips_context = ""
-    if project_data["clips"]:
-        clips = project_data["clips"]
-        clips_context = "Current clips in timeline:\n"
-        for i, clip in enumerate(clips):
-            clips_context += f"{i+1}. {clip['start_time']:.2f}s - {clip['end_time']:.2f}s\n"
+    if len(timeline.clip_start):
+        clips_context = "Current clips in timeline:\n" + timeline.clips_summary()
     
     # Create prompt
     prompt = f"""
@@ -312,6 +365,37 @@ Respond with a plan for editing operations.
     return []
 
 
+def snap_operations(
+    operations: List[Dict[str, Any]],
+    timeline: ProjectTimeline,
+    tolerance: float
+) -> List[Dict[str, Any]]:
+    """
+    Move planned cut points onto nearby sentence or scene boundaries.
+    
+    Args:
+        operations: Planned edit operations
+        timeline: Columnar project snapshot with interval indexes
+        tolerance: Maximum distance in seconds a cut point may move
+        
+    Returns:
+        The operations with snapped start_time/end_time values
+    """
+    for op in operations:
+        snapped = {
+            key: timeline.snap(op[key], tolerance)
+            for key in ("start_time", "end_time")
+            if op.get(key) is not None
+        }
+        
+        # Keep the planned range if snapping would collapse it
+        if len(snapped) == 2 and snapped["end_time"] <= snapped["start_time"]:
+            continue
+        op.update(snapped)
+    
+    return operations
+
+
 async def save_operations(
     operations: List[Dict[str, Any]],
     project_id: str,
@@ -364,6 +448,51 @@ async def save_operations(
     return operation_ids
 
 
+async def load_operations(
+    project_id: str,
+    operation_ids: List[str],
+    user_id: str
+) -> List[Dict[str, Any]]:
+    """
+    Load saved edit operations in the order of their IDs.
+    
+    Args:
+        project_id: ID of the project
+        operation_ids: IDs returned by `save_operations`
+        user_id: ID of the user who owns them
+        
+    Returns:
+        Operations found, in the order of `operation_ids`
+    """
+    async with db.connection() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT id, operation_type, start_time, end_time, target_index, parameters
+            FROM clips
+            WHERE project_id = $1 AND user_id = $2 AND id::text = ANY($3::text[])
+            """,
+            project_id,
+            user_id,
+            operation_ids
+        )
+    
+    by_id = {str(row["id"]): row for row in rows}
+    operations = []
+    for op_id in operation_ids:
+        row = by_id.get(op_id)
+        if row is None:
+            continue
+        parameters = row["parameters"]
+        operations.append({
+            "operation_type": row["operation_type"],
+            "start_time": row["start_time"],
+            "end_time": row["end_time"],
+            "target_index": row["target_index"],
+            "parameters": json.loads(parameters) if isinstance(parameters, str) else (parameters or {})
+        })
+    return operations
+
+
 async def create_embedding(text: str) -> List[float]:
     """
     Create embedding for a text string.
@@ -0,0 +1,209 @@
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+
+from app.core.timeline import ProjectTimeline
+from app.db import db
+
+
+# Time-window filters shared by the cursor and keyset queries ($2 = start,
+# $3 = end). Transcript segments match a window when they overlap it; audio
+# features are point samples and match when their timestamp is inside it.
+_TRANSCRIPT_WINDOW = "($2::float8 IS NULL OR end_time > $2) AND ($3::float8 IS NULL OR start_time < $3)"
+_AUDIO_WINDOW = "($2::float8 IS NULL OR timestamp >= $2) AND ($3::float8 IS NULL OR timestamp < $3)"
+
+
+async def stream_transcripts(
+    project_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream transcript segments through a server-side cursor.
+    
+    Rows are read in `batch_size` chunks from one read-only snapshot, so
+    memory stays constant regardless of transcript length.
+    
+    Args:
+        project_id: ID of the project
+        start: Only segments ending after this time (seconds)
+        end: Only segments starting before this time (seconds)
+        batch_size: Rows prefetched per round trip
+        
+    Yields:
+        Transcript rows as dictionaries, ordered by start_time
+    """
+    query = f"""
+        SELECT * FROM transcripts
+        WHERE project_id = $1 AND {_TRANSCRIPT_WINDOW}
+        ORDER BY start_time, id
+    """
+    async for row in _stream(query, project_id, start, end, batch_size):
+        yield row
+
+
+async def stream_audio_features(
+    project_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    batch_size: int = 2000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream audio analysis frames through a server-side cursor.
+    
+    Args:
+        project_id: ID of the project
+        start: Only frames at or after this time (seconds)
+        end: Only frames before this time (seconds)
+        batch_size: Rows prefetched per round trip
+        
+    Yields:
+        Audio feature rows as dictionaries, ordered by timestamp
+    """
+    query = f"""
+        SELECT * FROM audio_features
+        WHERE project_id = $1 AND {_AUDIO_WINDOW}
+        ORDER BY timestamp, id
+    """
+    async for row in _stream(query, project_id, start, end, batch_size):
+        yield row
+
+
+async def load_audio_columns(
+    timeline: ProjectTimeline,
+    project_id: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    batch_size: int = 2000
+) -> ProjectTimeline:
+    """
+    Fill a timeline's audio feature columns from the streaming cursor.
+    
+    Rows are turned into columns one batch at a time, so only
+    `batch_size` row dicts are held at once.
+    
+    Args:
+        timeline: Timeline to fill
+        project_id: ID of the project
+        start: Only frames at or after this time (seconds)
+        end: Only frames before this time (seconds)
+        batch_size: Rows per batch
+        
+    Returns:
+        The same timeline
+    """
+    batches = []
+    rows: List[Dict[str, Any]] = []
+    async for row in stream_audio_features(project_id, start, end, batch_size):
+        rows.append(row)
+        if len(rows) == batch_size:
+            batches.append(ProjectTimeline.audio_batch(rows))
+            rows = []
+    if rows:
+        batches.append(ProjectTimeline.audio_batch(rows))
+    
+    timeline.set_audio(batches)
+    return timeline
+
+
+async def fetch_transcript_page(
+    project_id: str,
+    after: Optional[Tuple[float, Any]] = None,
+    limit: int = 500,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, Any]]]:
+    """
+    Fetch one page of transcript segments using keyset pagination.
+    
+    Args:
+        project_id: ID of the project
+        after: Cursor returned by the previous page, or None for the first
+        limit: Maximum number of rows in the page
+        start: Only segments ending after this time (seconds)
+        end: Only segments starting before this time (seconds)
+        
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    after_time, after_id = after if after else (None, None)
+    
+    async with db.read_connection() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT * FROM transcripts
+            WHERE project_id = $1
+              AND {_TRANSCRIPT_WINDOW}
+              AND ($5::float8 IS NULL OR (start_time, id) > ($5, $6))
+            ORDER BY start_time, id
+            LIMIT $4
+            """,
+            project_id,
+            start,
+            end,
+            limit,
+            after_time,
+            after_id
+        )
+    
+    page = [dict(r) for r in rows]
+    next_cursor = (page[-1]["start_time"], page[-1]["id"]) if len(page) == limit else None
+    return page, next_cursor
+
+
+async def fetch_audio_features_page(
+    project_id: str,
+    after: Optional[Tuple[float, Any]] = None,
+    limit: int = 2000,
+    start: Optional[float] = None,
+    end: Optional[float] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, Any]]]:
+    """
+    Fetch one page of audio analysis frames using keyset pagination.
+    
+    Args:
+        project_id: ID of the project
+        after: Cursor returned by the previous page, or None for the first
+        limit: Maximum number of rows in the page
+        start: Only frames at or after this time (seconds)
+        end: Only frames before this time (seconds)
+        
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    after_time, after_id = after if after else (None, None)
+    
+    async with db.read_connection() as conn:
+        rows = await conn.fetch(
+            f"""
+            SELECT * FROM audio_features
+            WHERE project_id = $1
+              AND {_AUDIO_WINDOW}
+              AND ($5::float8 IS NULL OR (timestamp, id) > ($5, $6))
+            ORDER BY timestamp, id
+            LIMIT $4
+            """,
+            project_id,
+            start,
+            end,
+            limit,
+            after_time,
+            after_id
+        )
+    
+    page = [dict(r) for r in rows]
+    next_cursor = (page[-1]["timestamp"], page[-1]["id"]) if len(page) == limit else None
+    return page, next_cursor
+
+
+async def _stream(
+    query: str,
+    project_id: str,
+    start: Optional[float],
+    end: Optional[float],
+    batch_size: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Iterate a windowed query through a server-side cursor."""
+    async with db.read_connection() as conn:
+        cursor = conn.cursor(query, project_id, start, end, prefetch=batch_size)
+        async for row in cursor:
+            yield dict(row)
@@ -0,0 +1,186 @@
+"""
+Batched publishing of realtime events.
+
+Jobs used to insert every status change into `realtime_events` with its own
+synchronous request, on the job's critical path. Events are now handed to a
+background sender: `publish` only appends to a bounded buffer, and the
+sender collects whatever arrives within REALTIME_BATCH_WINDOW and inserts
+it as one batch, grouped by project.
+
+A pending event may carry a coalesce key; a newer event with the same key
+replaces it, so a burst of progress updates for one operation costs one
+row. When the buffer is full, coalescable (progress) events are dropped
+first; a final status is only dropped if the buffer holds nothing else.
+Publishing never blocks and never raises.
+
+The sender is a thread rather than an asyncio task: worker jobs run on a
+fresh event loop per job, which is closed as soon as the job returns.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.supabase_clients import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimePublisher:
+    """
+    Bounded, coalescing buffer of realtime events with a batching sender.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Dict[str, Any]]], None],
+        window: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+        max_batch: Optional[int] = None
+    ):
+        self.send = send
+        self.window = settings.realtime_batch_window if window is None else window
+        self.max_buffer = max_buffer or settings.realtime_buffer_size
+        self.max_batch = max_batch or settings.realtime_max_batch
+        # Pending rows in arrival order, keyed by coalesce key (or a sequence
+        # number for events that must not be merged)
+        self._pending: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._coalescable: set = set()
+        self._seq = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    def publish(
+        self,
+        project_id: Optional[str],
+        payload: Dict[str, Any],
+        event: str = "timeline_update",
+        coalesce_key: Optional[Hashable] = None
+    ) -> bool:
+        """
+        Queue an event for the next batch.
+
+        Args:
+            project_id: Project the event belongs to
+            payload: Event payload
+            event: Event name
+            coalesce_key: Events with the same key replace each other while
+                          pending; they are also the first to be dropped
+
+        Returns:
+            False if the event was dropped because the buffer is full
+        """
+        row = {"event": event, "project_id": project_id, "payload": payload}
+        with self._cond:
+            self._ensure_sender()
+            if coalesce_key is not None:
+                key = ("coalesce", project_id, event, coalesce_key)
+                if key in self._pending:
+                    self._pending[key] = row
+                    metrics.incr("realtime_events_coalesced")
+                    return True
+            else:
+                self._seq += 1
+                key = ("event", self._seq)
+
+            if len(self._pending) >= self.max_buffer and not self._make_room(coalesce_key is None):
+                metrics.incr("realtime_events_dropped")
+                return False
+
+            self._pending[key] = row
+            if coalesce_key is not None:
+                self._coalescable.add(key)
+            self._cond.notify()
+            return True
+
+    def _make_room(self, important: bool) -> bool:
+        """Drop one pending event to admit a new one, if the policy allows."""
+        victim = next((k for k in self._pending if k in self._coalescable), None)
+        if victim is None and important:
+            # Only final statuses are pending: the oldest is likely stale
+            victim = next(iter(self._pending))
+        if victim is None:
+            return False
+        del self._pending[victim]
+        self._coalescable.discard(victim)
+        metrics.incr("realtime_events_dropped")
+        return True
+
+    def _ensure_sender(self) -> None:
+        # A forked process does not inherit the parent's thread
+        if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._in_flight = 0
+            self._thread = threading.Thread(
+                target=self._run, name="realtime-publisher", daemon=True
+            )
+            self._thread.start()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while self._pending and len(batch) < self.max_batch:
+            key, row = self._pending.popitem(last=False)
+            self._coalescable.discard(key)
+            batch.append(row)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let the rest of a burst arrive before sending
+            time.sleep(self.window)
+            with self._cond:
+                batch = self._take_batch()
+                self._in_flight = len(batch)
+
+            # Group by project, keeping each project's events in order
+            batch.sort(key=lambda row: str(row["project_id"]))
+            try:
+                self.send(batch)
+                metrics.incr("realtime_events_published", len(batch))
+                metrics.observe("realtime_batch_size", len(batch))
+            except Exception:
+                logger.exception("Failed to publish %d realtime events", len(batch))
+                metrics.incr("realtime_publish_errors")
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued event has been sent (or given up on).
+
+        Args:
+            timeout: Seconds to wait at most (default: REALTIME_FLUSH_TIMEOUT)
+
+        Returns:
+            True if the buffer drained in time
+        """
+        timeout = settings.realtime_flush_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                if self._thread is None or self._pid != os.getpid():
+                    return not self._pending
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+
+def _insert_events(rows: List[Dict[str, Any]]) -> None:
+    get_supabase().table("realtime_events").insert(rows).execute()
+
+
+# Create a global instance
+realtime_publisher = RealtimePublisher(_insert_events)
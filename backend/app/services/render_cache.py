@@ -0,0 +1,311 @@
+import os
+import shutil
+import json
+import time
+import hashlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Sequence
+import redis
+
+from app.core.config import settings
+from app.core import metrics
+from app.services.media_cache import MediaCache
+
+# Bump when a change to the render code alters outputs for the same inputs
+RENDER_CACHE_VERSION = 1
+
+# Times are compared at millisecond precision
+TIME_PRECISION = 3
+
+KEY_PREFIX = "cre8rflow:render_cache"
+
+
+def canonical_operations(operations: Sequence[Dict[str, Any]]) -> list:
+    """
+    Reduce operations to the fields that affect the rendered output.
+
+    Row ids, job ids and the like are dropped, times are rounded and
+    parameters are key-sorted, so the same edit always serializes the same.
+    Both the worker operation schema (operation_type/start_time/end_time/
+    parameters) and video_editor actions (action/start_sec/end_sec/...) are
+    accepted.
+
+    Args:
+        operations: Operations in application order
+
+    Returns:
+        List of canonical operation dicts
+    """
+    canonical = []
+    for op in operations:
+        if "operation_type" in op:
+            kind = op["operation_type"]
+            start, end = op.get("start_time"), op.get("end_time")
+            parameters = dict(op.get("parameters") or {})
+        else:
+            kind = op["action"]
+            start, end = op.get("start_sec"), op.get("end_sec")
+            parameters = {
+                k: v for k, v in op.items()
+                if k not in ("action", "start_sec", "end_sec", "reason") and v is not None
+            }
+        canonical.append({
+            "type": kind,
+            "start": None if start is None else round(float(start), TIME_PRECISION),
+            "end": None if end is None else round(float(end), TIME_PRECISION),
+            "parameters": {k: parameters[k] for k in sorted(parameters)},
+        })
+    return canonical
+
+
+def render_cache_key(
+    source_hash: str,
+    operations: Sequence[Dict[str, Any]],
+    encoder: Dict[str, Any]
+) -> str:
+    """
+    Key a render by its source content, edits and encoder settings.
+
+    Args:
+        source_hash: Content hash (or ETag) of the source media
+        operations: Operations in application order
+        encoder: Settings that change the encoded output
+
+    Returns:
+        Hex digest identifying the rendered output
+    """
+    payload = json.dumps(
+        {
+            "version": RENDER_CACHE_VERSION,
+            "source": source_hash,
+            "operations": canonical_operations(operations),
+            "encoder": encoder,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def _file_digest(path: str, size: int, mtime_ns: int) -> str:
+    """SHA-256 of a file; size and mtime only key the memo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """
+    SHA-256 of a local file's contents, memoized per (path, size, mtime).
+
+    The memo keeps the most recently used 1024 files.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest of the file contents
+    """
+    stat = os.stat(path)
+    return _file_digest(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def hit_rate(snapshot: Optional[Dict[str, float]] = None) -> Optional[float]:
+    """
+    Fraction of render cache lookups served without rendering.
+
+    Args:
+        snapshot: Metrics snapshot (read from Redis when omitted)
+
+    Returns:
+        Hit rate in [0, 1], or None before the first lookup
+    """
+    snapshot = metrics.snapshot() if snapshot is None else snapshot
+    hits = snapshot.get("render_cache_hits", 0)
+    lookups = hits + snapshot.get("render_cache_misses", 0)
+    return hits / lookups if lookups else None
+
+
+class RenderCache:
+    """
+    Storage tier of the render cache.
+
+    Rendered outputs are copied in the assets bucket to
+    `<prefix>/<key>.mp4` and indexed in Redis: a hash per entry holding the
+    job result, a sorted set ordered by last use and a running byte total.
+    When the total passes `max_bytes`, the least recently used objects are
+    removed from storage. These are cache copies only: every job result
+    has its own object, which eviction never touches. Redis errors only
+    ever turn into cache misses.
+    """
+
+    def __init__(
+        self,
+        redis_conn: redis.Redis,
+        max_bytes: int,
+        bucket: str = "assets",
+        prefix: str = "renders"
+    ):
+        self.redis = redis_conn
+        self.max_bytes = max_bytes
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _entry_key(self, key: str) -> str:
+        return f"{KEY_PREFIX}:entry:{key}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{KEY_PREFIX}:lru"
+
+    @property
+    def _bytes_key(self) -> str:
+        return f"{KEY_PREFIX}:bytes"
+
+    def object_path(self, key: str) -> str:
+        """Storage path of a cached render."""
+        return f"{self.prefix}/{key}.mp4"
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored result of a render, if it is cached.
+
+        Args:
+            key: Render cache key
+
+        Returns:
+            The job result stored with the render, or None on a miss
+        """
+        try:
+            raw = self.redis.hget(self._entry_key(key), "result")
+            if raw is not None:
+                self.redis.zadd(self._lru_key, {key: time.time()})
+        except redis.RedisError:
+            raw = None
+
+        if raw is None:
+            metrics.incr("render_cache_misses")
+            return None
+
+        metrics.incr("render_cache_hits")
+        return json.loads(raw)
+
+    def store(
+        self,
+        supabase: Any,
+        key: str,
+        size: int,
+        result: Dict[str, Any]
+    ) -> None:
+        """
+        Record a render that was copied to `object_path(key)`.
+
+        Args:
+            supabase: Supabase client (used to delete evicted objects)
+            key: Render cache key
+            size: Size of the rendered file in bytes
+            result: Job result to return on later hits
+        """
+        entry = self._entry_key(key)
+        try:
+            # Only the first writer of a key counts its bytes
+            if self.redis.hsetnx(entry, "size", size):
+                self.redis.incrby(self._bytes_key, size)
+            self.redis.hset(entry, "result", json.dumps(result))
+            self.redis.zadd(self._lru_key, {key: time.time()})
+        except redis.RedisError:
+            return
+
+        self.evict(supabase, keep=key)
+
+    def evict(self, supabase: Any, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used renders until the tier fits its budget.
+
+        Args:
+            supabase: Supabase client
+            keep: Key that must not be evicted
+
+        Returns:
+            Number of bytes freed
+        """
+        freed = 0
+        try:
+            while int(self.redis.get(self._bytes_key) or 0) > self.max_bytes:
+                oldest = [
+                    k.decode() if isinstance(k, bytes) else k
+                    for k in self.redis.zrange(self._lru_key, 0, 1)
+                ]
+                victims = [k for k in oldest if k != keep]
+                if not victims:
+                    break
+                key = victims[0]
+
+                # Whoever removes the key from the LRU set owns the eviction
+                if not self.redis.zrem(self._lru_key, key):
+                    continue
+                size = int(self.redis.hget(self._entry_key(key), "size") or 0)
+                self.redis.delete(self._entry_key(key))
+                self.redis.incrby(self._bytes_key, -size)
+
+                try:
+                    supabase.storage.from_(self.bucket).remove([self.object_path(key)])
+                except Exception:
+                    # The index no longer points at it; an orphaned object
+                    # only costs storage
+                    pass
+
+                freed += size
+                metrics.incr("render_cache_evictions")
+        except redis.RedisError:
+            pass
+
+        return freed
+
+
+def render_to_disk_cache(
+    source_path: str,
+    operations: Sequence[Dict[str, Any]],
+    encoder: Dict[str, Any],
+    render: Callable[[str], Any],
+    output_path: str
+) -> str:
+    """
+    Render through the local disk tier, reusing an identical earlier render.
+
+    Args:
+        source_path: Local source file
+        operations: Operations applied by the render
+        encoder: Settings that change the encoded output
+        render: Callable that writes the output to the path it is given
+        output_path: Where the render should appear
+
+    Returns:
+        `output_path`
+    """
+    key = render_cache_key(file_fingerprint(source_path), operations, encoder)
+    with render_disk_cache.open("render", key, render) as cached_path:
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        try:
+            # A hard link is free and outlives the entry's eviction
+            os.link(cached_path, output_path)
+        except OSError:
+            shutil.copyfile(cached_path, output_path)
+    return output_path
+
+
+# Create global instances
+render_cache = RenderCache(
+    redis.from_url(settings.redis_url),
+    settings.render_cache_storage_max_bytes
+)
+render_disk_cache = MediaCache(
+    settings.render_cache_dir,
+    settings.render_cache_disk_max_bytes,
+    metric_prefix="render_disk_cache"
+)
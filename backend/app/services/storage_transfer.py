@@ -0,0 +1,329 @@
+import os
+import base64
+from typing import Any, Dict, Iterator, Optional, BinaryIO, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.services.supabase_clients import http_client
+
+
+class StorageTransferError(Exception):
+    """Raised when a storage transfer fails."""
+
+
+class StorageTransfer:
+    """
+    Streaming transfers against the Supabase Storage REST API.
+
+    Downloads are streamed to disk in `chunk_size` pieces and uploads are
+    streamed from disk, so peak memory per transfer is one chunk rather
+    than the whole file. Files of at least `multipart_threshold` bytes are
+    uploaded with the resumable (TUS) protocol in `part_size` parts; an
+    interrupted part is resumed from the offset the server reports.
+    """
+
+    TUS_VERSION = "1.0.0"
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        client: Optional[httpx.Client] = None,
+        chunk_size: int = 1024 * 1024,
+        multipart_threshold: int = 50 * 1024 * 1024,
+        part_size: int = 6 * 1024 * 1024,
+        max_retries: int = 3
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self._client = client
+        self.chunk_size = chunk_size
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.max_retries = max_retries
+
+    @property
+    def client(self) -> httpx.Client:
+        # The process-wide pool unless a client was given
+        return self._client if self._client is not None else http_client()
+
+    def _headers(self, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "apikey": self.api_key,
+        }
+        headers.update(extra or {})
+        return headers
+
+    def object_url(self, bucket: str, path: str) -> str:
+        """Authenticated REST URL of a stored object."""
+        return f"{self.base_url}/storage/v1/object/{bucket}/{path.lstrip('/')}"
+
+    def signed_url(self, bucket: str, path: str, expires_in: int) -> str:
+        """
+        Create a short-lived URL that reads one object without credentials.
+
+        Args:
+            bucket: Storage bucket name
+            path: Object path inside the bucket
+            expires_in: Lifetime of the URL in seconds
+
+        Returns:
+            Absolute signed URL
+
+        Raises:
+            StorageTransferError: If the URL cannot be created
+        """
+        response = self.client.post(
+            f"{self.base_url}/storage/v1/object/sign/{bucket}/{path.lstrip('/')}",
+            json={"expiresIn": expires_in},
+            headers=self._headers()
+        )
+        signed = response.json().get("signedURL") if response.status_code == 200 else None
+        if not signed:
+            raise StorageTransferError(
+                f"Could not sign {bucket}/{path} (status {response.status_code})"
+            )
+        return f"{self.base_url}/storage/v1{signed}"
+
+    def copy_object(self, bucket: str, source: str, destination: str) -> None:
+        """
+        Copy an object inside a bucket on the storage server.
+
+        Args:
+            bucket: Storage bucket name
+            source: Path of the object to copy
+            destination: Path of the new object (must not exist yet)
+
+        Raises:
+            StorageTransferError: If the copy fails
+        """
+        response = self.client.post(
+            f"{self.base_url}/storage/v1/object/copy",
+            json={"bucketId": bucket, "sourceKey": source, "destinationKey": destination},
+            headers=self._headers()
+        )
+        if response.status_code != 200:
+            raise StorageTransferError(
+                f"Copy of {bucket}/{source} to {destination} failed "
+                f"with status {response.status_code}"
+            )
+
+    def ffmpeg_input(
+        self,
+        bucket: str,
+        path: str,
+        expires_in: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Describe an object as an ffmpeg HTTP input.
+        
+        ffmpeg issues HTTP range requests for the container index and for
+        every seek, so reading a short segment transfers roughly that
+        segment instead of the whole file. It reads a signed URL, so the
+        service key never appears in its command line or error output.
+        
+        Args:
+            bucket: Storage bucket name
+            path: Object path inside the bucket
+            expires_in: Lifetime of the URL (default: RANGE_FETCH_URL_TTL)
+            
+        Returns:
+            Tuple of (url, input_options) for `ffmpeg.input(url, **input_options)`
+        """
+        url = self.signed_url(bucket, path, expires_in or settings.range_fetch_url_ttl)
+        return url, {"seekable": 1}
+
+    def download_to_file(self, bucket: str, path: str, dest: str) -> int:
+        """
+        Stream an object from storage to a local file.
+
+        Args:
+            bucket: Storage bucket name
+            path: Object path inside the bucket
+            dest: Local file to write
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            StorageTransferError: If the object cannot be downloaded
+        """
+        written = 0
+        with self.client.stream("GET", self.object_url(bucket, path), headers=self._headers()) as response:
+            if response.status_code != 200:
+                raise StorageTransferError(
+                    f"Download of {bucket}/{path} failed with status {response.status_code}"
+                )
+            with open(dest, "wb") as f:
+                for chunk in response.iter_bytes(self.chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+        return written
+
+    def upload_file(
+        self,
+        bucket: str,
+        path: str,
+        src: str,
+        content_type: str,
+        upsert: bool = False
+    ) -> None:
+        """
+        Stream a local file to storage.
+
+        Args:
+            bucket: Storage bucket name
+            path: Object path inside the bucket
+            src: Local file to upload
+            content_type: MIME type of the object
+            upsert: Overwrite an existing object
+
+        Raises:
+            StorageTransferError: If the upload fails
+        """
+        size = os.path.getsize(src)
+        if size >= self.multipart_threshold:
+            self.resumable_upload(bucket, path, src, content_type, upsert)
+            return
+
+        with open(src, "rb") as f:
+            response = self.client.post(
+                self.object_url(bucket, path),
+                content=self._iter_file(f),
+                headers=self._headers({
+                    "Content-Type": content_type,
+                    "Content-Length": str(size),
+                    "x-upsert": "true" if upsert else "false",
+                })
+            )
+        if response.status_code not in (200, 201):
+            raise StorageTransferError(
+                f"Upload of {bucket}/{path} failed with status {response.status_code}"
+            )
+
+    def resumable_upload(
+        self,
+        bucket: str,
+        path: str,
+        src: str,
+        content_type: str,
+        upsert: bool = False
+    ) -> None:
+        """
+        Upload a large file in parts using the TUS resumable protocol.
+
+        Args:
+            bucket: Storage bucket name
+            path: Object path inside the bucket
+            src: Local file to upload
+            content_type: MIME type of the object
+            upsert: Overwrite an existing object
+
+        Raises:
+            StorageTransferError: If the upload cannot be completed
+        """
+        size = os.path.getsize(src)
+        metadata = ",".join(
+            f"{key} {base64.b64encode(value.encode()).decode()}"
+            for key, value in (
+                ("bucketName", bucket),
+                ("objectName", path),
+                ("contentType", content_type),
+            )
+        )
+        response = self.client.post(
+            f"{self.base_url}/storage/v1/upload/resumable",
+            headers=self._headers({
+                "Tus-Resumable": self.TUS_VERSION,
+                "Upload-Length": str(size),
+                "Upload-Metadata": metadata,
+                "x-upsert": "true" if upsert else "false",
+            })
+        )
+        if response.status_code != 201 or "location" not in response.headers:
+            raise StorageTransferError(
+                f"Could not create resumable upload for {bucket}/{path} "
+                f"(status {response.status_code})"
+            )
+        upload_url = httpx.URL(self.base_url).join(response.headers["location"])
+
+        offset = 0
+        retries = 0
+        resume = False
+        with open(src, "rb") as f:
+            while offset < size:
+                try:
+                    if resume:
+                        # Continue from what the server kept of the failed part
+                        offset = self._server_offset(upload_url)
+                        resume = False
+                        continue
+                    
+                    f.seek(offset)
+                    part_length = min(self.part_size, size - offset)
+                    response = self.client.patch(
+                        upload_url,
+                        content=self._iter_file(f, part_length),
+                        headers=self._headers({
+                            "Tus-Resumable": self.TUS_VERSION,
+                            "Upload-Offset": str(offset),
+                            "Content-Type": "application/offset+octet-stream",
+                            "Content-Length": str(part_length),
+                        })
+                    )
+                    if response.status_code != 204:
+                        raise StorageTransferError(
+                            f"Part at offset {offset} rejected with status {response.status_code}"
+                        )
+                    offset = self._upload_offset(response)
+                    retries = 0
+                except (httpx.TransportError, StorageTransferError) as e:
+                    retries += 1
+                    if retries > self.max_retries:
+                        if isinstance(e, StorageTransferError):
+                            raise
+                        raise StorageTransferError(
+                            f"Resumable upload of {bucket}/{path} failed at offset {offset}: {e}"
+                        ) from e
+                    resume = True
+
+    def _server_offset(self, upload_url: httpx.URL) -> int:
+        """Ask the server how many bytes of a resumable upload it has."""
+        response = self.client.head(
+            upload_url,
+            headers=self._headers({"Tus-Resumable": self.TUS_VERSION})
+        )
+        if response.status_code != 200:
+            raise StorageTransferError(
+                f"Could not resume upload (status {response.status_code})"
+            )
+        return self._upload_offset(response)
+
+    @staticmethod
+    def _upload_offset(response: httpx.Response) -> int:
+        """The Upload-Offset a TUS response reports."""
+        try:
+            return int(response.headers["upload-offset"])
+        except (KeyError, ValueError):
+            raise StorageTransferError(
+                f"Resumable upload response (status {response.status_code}) "
+                "has no valid Upload-Offset header"
+            )
+
+    def _iter_file(self, f: BinaryIO, length: Optional[int] = None) -> Iterator[bytes]:
+        """Yield up to `length` bytes (default: the rest) of f in chunks."""
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+            chunk = f.read(size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+# Create a global instance
+storage_transfer = StorageTransfer(settings.supabase_url, settings.supabase_key)
@@ -0,0 +1,80 @@
+"""
+Process-wide Supabase and HTTP clients.
+
+Creating a Supabase client per job or per request means fresh connections
+(and TLS handshakes) for every table, storage and realtime call. Workers
+and services get their clients from here instead: one Supabase client and
+one pooled httpx client per process, whose connections stay alive between
+calls.
+
+A forked process (such as an RQ work horse) must not reuse sockets opened
+by its parent, so each process builds its own clients on first use.
+"""
+import os
+import threading
+from typing import Optional
+import httpx
+from supabase import Client, create_client
+
+from app.core.config import settings
+
+_lock = threading.Lock()
+_pid: Optional[int] = None
+_supabase: Optional[Client] = None
+_http: Optional[httpx.Client] = None
+
+
+def _check_fork() -> None:
+    """Forget clients inherited from a parent process."""
+    global _pid, _supabase, _http
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _supabase = None
+        _http = None
+
+
+def get_supabase() -> Client:
+    """
+    Shared Supabase client of this process.
+
+    Its PostgREST and Storage sessions are created once and reuse their
+    connections for every later call.
+    """
+    global _supabase
+    with _lock:
+        _check_fork()
+        if _supabase is None:
+            _supabase = create_client(settings.supabase_url, settings.supabase_key)
+        return _supabase
+
+
+def http_client() -> httpx.Client:
+    """
+    Shared, keep-alive httpx client of this process.
+
+    Pool size and idle timeout come from HTTP_MAX_CONNECTIONS and
+    HTTP_KEEPALIVE_EXPIRY.
+    """
+    global _http
+    with _lock:
+        _check_fork()
+        if _http is None:
+            _http = httpx.Client(
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry
+                )
+            )
+        return _http
+
+
+def close_clients() -> None:
+    """Close this process's pooled connections (e.g. at shutdown)."""
+    global _supabase, _http
+    with _lock:
+        if _http is not None and _pid == os.getpid():
+            _http.close()
+        _supabase = None
+        _http = None
@@ -1,14 +1,17 @@
 import os
 import tempfile
 import shutil
+from contextlib import ExitStack
 from typing import Dict, Any, Tuple
 import asyncio
-from supabase import create_client, Client
+from supabase import Client
 
-from app.core.config import settings
 from app.utils.ffmpeg_helpers import create_thumbnail_sprite, get_video_info
 from app.utils.vtt_generator import generate_vtt
 from app.db import db
+from app.services.media_cache import cached_preview_source
+from app.services.storage_transfer import storage_transfer
+from app.services.supabase_clients import get_supabase
 
 
 async def generate_thumbnails(video_id: str) -> Dict[str, Any]:
@@ -21,23 +24,17 @@ async def generate_thumbnails(video_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with sprite_url, vtt_url, and fps
     """
-    # Initialize Supabase client
-    supabase: Client = create_client(
-        settings.supabase_url, 
-        settings.supabase_key
-    )
+    # Shared, keep-alive client of this process
+    supabase: Client = get_supabase()
     
-    # Create temporary directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Download video from Supabase Storage
-        video_path = os.path.join(temp_dir, f"{video_id}.mp4")
-        
-        # Get file from storage
-        res = supabase.storage.from_("videos").download(f"{video_id}.mp4")
-        
-        # Save to temporary file
-        with open(video_path, "wb") as f:
-            f.write(res)
+    # Create temporary directory for processing; thumbnails are read from
+    # the video's proxy (or the original), via the per-host media cache.
+    # A cache miss may wait on another job's lock or download the video,
+    # so the entry is opened in a worker thread; releasing it never blocks.
+    with tempfile.TemporaryDirectory() as temp_dir, ExitStack() as source:
+        video_path = await asyncio.to_thread(
+            source.enter_context, cached_preview_source(supabase, video_id)
+        )
         
         # Get video information
         video_info = await get_video_info(video_path)
@@ -68,19 +65,8 @@ async def generate_thumbnails(video_id: str) -> Dict[str, Any]:
         sprite_storage_path = f"thumbnails/{video_id}/sprite.jpg"
         vtt_storage_path = f"thumbnails/{video_id}/thumbnails.vtt"
         
-        with open(sprite_path, "rb") as f:
-            supabase.storage.from_("assets").upload(
-                sprite_storage_path,
-                f.read(),
-                {"content-type": "image/jpeg"}
-            )
-        
-        with open(vtt_path, "rb") as f:
-            supabase.storage.from_("assets").upload(
-                vtt_storage_path,
-                f.read(),
-                {"content-type": "text/vtt"}
-            )
+        storage_transfer.upload_file("assets", sprite_storage_path, sprite_path, "image/jpeg")
+        storage_transfer.upload_file("assets", vtt_storage_path, vtt_path, "text/vtt")
         
         # Generate public URLs
         sprite_url = supabase.storage.from_("assets").get_public_url(sprite_storage_path)
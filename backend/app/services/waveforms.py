@@ -0,0 +1,114 @@
+"""
+Stored waveform peak pyramids.
+
+Each level of a video's pyramid (see `app.core.waveform`) is one row of
+`waveform_peaks` holding the packed (min, max) pairs. The column is stored
+uncompressed out of line, so reading a range with `substring` fetches only
+the pages that hold it: the timeline asks for the buckets on screen at its
+zoom level and gets just those bytes.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.waveform import bucket_range, bytes_per_bucket
+from app.db import db
+
+
+async def store_waveform(
+    video_id: Any,
+    pyramid: Dict[int, np.ndarray],
+    sample_rate: int,
+    bits: int
+) -> None:
+    """
+    Replace the stored peak pyramid of a video.
+
+    Args:
+        video_id: ID of the video
+        pyramid: samples_per_bucket -> (buckets, 2) peaks, from
+                 `PeakPyramidBuilder.finish`
+        sample_rate: Sample rate of the analysed audio
+        bits: Bits per stored peak
+    """
+    async with db.connection() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                """
+                DELETE FROM waveform_peaks WHERE video_id = $1
+                """,
+                video_id
+            )
+            await conn.executemany(
+                """
+                INSERT INTO waveform_peaks (
+                    video_id,
+                    samples_per_bucket,
+                    sample_rate,
+                    bits,
+                    bucket_count,
+                    peaks
+                ) VALUES ($1, $2, $3, $4, $5, $6)
+                """,
+                [
+                    (video_id, level, sample_rate, bits, len(peaks), peaks.tobytes())
+                    for level, peaks in pyramid.items()
+                ]
+            )
+
+
+async def load_waveform_range(
+    video_id: Any,
+    samples_per_bucket: int,
+    start: float = 0.0,
+    end: Optional[float] = None
+) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Read the peaks of one level covering [start, end) seconds.
+
+    Args:
+        video_id: ID of the video
+        samples_per_bucket: Level to read
+        start: Start of the range in seconds
+        end: End of the range in seconds (default: the end of the audio)
+
+    Returns:
+        Tuple of (metadata, packed peaks) or None if the level is not
+        stored; metadata has sample_rate, samples_per_bucket, bits,
+        bucket_count, first_bucket and buckets (in the returned bytes)
+    """
+    async with db.read_connection() as conn:
+        meta = await conn.fetchrow(
+            """
+            SELECT sample_rate, bits, bucket_count FROM waveform_peaks
+            WHERE video_id = $1 AND samples_per_bucket = $2
+            """,
+            video_id,
+            samples_per_bucket
+        )
+        if meta is None:
+            return None
+        
+        first, count = bucket_range(
+            start, end, meta["sample_rate"], samples_per_bucket, meta["bucket_count"]
+        )
+        size = bytes_per_bucket(meta["bits"])
+        peaks = await conn.fetchval(
+            """
+            SELECT substring(peaks FROM $3 FOR $4) FROM waveform_peaks
+            WHERE video_id = $1 AND samples_per_bucket = $2
+            """,
+            video_id,
+            samples_per_bucket,
+            first * size + 1,
+            count * size
+        )
+    
+    return {
+        "sample_rate": meta["sample_rate"],
+        "samples_per_bucket": samples_per_bucket,
+        "bits": meta["bits"],
+        "bucket_count": meta["bucket_count"],
+        "first_bucket": first,
+        "buckets": count,
+    }, bytes(peaks or b"")
@@ -1,40 +1,211 @@
 import os
 import json
 import asyncio
-from typing import Dict, Any, List, Optional
-import redis
-from rq import Queue, Worker, Connection
-from supabase import create_client, Client
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from rq import Connection, SimpleWorker, get_current_job
+from supabase import Client
 
 from app.core.config import settings
+from app.core import chunked_render
+from app.core.ffmpeg_progress import JobProgress
+from app.core.proxy import build_proxy
+from app.core.render_plan import compile_plan
+from app.core.render_tiers import FINAL, PREVIEW, EncoderProfile, encoder_profile
+from app.core.smart_cut import smart_cut
 from app.db import db
+from app.services.job_queues import (
+    WeightedWorker,
+    close_operations,
+    enqueue_job,
+    queue_for,
+    queues,
+    redis_conn,
+)
+from app.services.media_cache import (
+    cached_preview_source,
+    cached_source,
+    proxy_object_path,
+    source_fingerprint,
+)
+from app.services.media_info import load_media_info
+from app.services.render_cache import render_cache, render_cache_key
+from app.services.storage_transfer import StorageTransferError, storage_transfer
+from app.services.realtime_publisher import realtime_publisher
+from app.services.supabase_clients import get_supabase
 
 
-# Initialize Redis connection
-redis_conn = redis.from_url(settings.redis_url)
+# Operations that read a short segment and can stream it via range requests
+RANGE_FETCH_OPERATIONS = {"cut"}
 
-# Create RQ queue
-queue = Queue(connection=redis_conn)
 
-
-async def enqueue_task(task_type: str, data: Dict[str, Any]) -> str:
+async def enqueue_task(
+    task_type: str,
+    data: Dict[str, Any],
+    queue_name: Optional[str] = None,
+    user_id: Optional[str] = None,
+    key: Optional[Dict[str, Any]] = None,
+    operation_ids: Optional[List[str]] = None
+) -> str:
     """
     Enqueue a background task in Redis RQ.
     
+    Retries of identical work attach to the existing job (see
+    `job_queues.enqueue_job`).
+    
     Args:
         task_type: Type of task (e.g., "process_clip")
         data: Data needed for the task
+        queue_name: Priority queue (default: the task type's queue)
+        user_id: User the job runs for, for fair-share scheduling
+        key: The fields that identify the work (default: the payload)
+        operation_ids: Clip rows that get the job's result
         
     Returns:
         Job ID
     """
-    job = queue.enqueue(
+    return enqueue_job(
+        queue_name or queue_for(task_type),
+        task_type,
         f"app.services.worker.{task_type}",
         data,
-        job_timeout=3600  # 1 hour timeout
+        user_id,
+        key,
+        operation_ids
     )
+
+
+def _attached_operations(operation_ids: List[str]) -> List[str]:
+    """The running job's clip rows plus those of retries attached to it."""
+    job = get_current_job()
+    if job is None:
+        return operation_ids
+    return close_operations(job.id, operation_ids)
+
+
+# Event loop of this process's jobs, and the process it was made in
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+
+
+def _job_loop() -> asyncio.AbstractEventLoop:
+    """
+    The event loop every job of this process runs on.
+    
+    An in-process worker runs many jobs in one process, and loop-bound
+    clients such as the asyncpg pools of `db` are created in the first
+    job's loop, so the loop lives as long as the process. A forked work
+    horse makes its own.
+    """
+    global _loop, _loop_pid
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        _loop = asyncio.new_event_loop()
+        _loop_pid = os.getpid()
+    asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def _run_async(coro):
+    """Run a coroutine to completion on the process's job loop."""
+    return _job_loop().run_until_complete(coro)
+
+
+async def _set_clip_status(
+    operation_ids: List[str],
+    status: str,
+    result: Optional[Dict[str, Any]] = None,
+    tier: str = FINAL
+) -> None:
+    """
+    Update the status (and optionally the result) of clip rows.
+    
+    A preview job never touches rows that already hold a final result,
+    whichever job finishes last.
+    """
+    guard = ""
+    if tier == PREVIEW:
+        guard = "AND (result IS NULL OR result::jsonb ->> 'tier' IS DISTINCT FROM 'final')"
     
-    return job.id
+    async with db.connection() as conn:
+        if result is None:
+            await conn.execute(
+                f"""
+                UPDATE clips
+                SET status = $1
+                WHERE id = ANY($2)
+                {guard}
+                """,
+                status,
+                operation_ids
+            )
+        else:
+            await conn.execute(
+                f"""
+                UPDATE clips
+                SET status = $1, result = $2
+                WHERE id = ANY($3)
+                {guard}
+                """,
+                status,
+                json.dumps(result),
+                operation_ids
+            )
+
+
+async def _get_project_video_id(project_id: str) -> str:
+    """Look up the source video of a project."""
+    async with db.read_connection() as conn:
+        project = await conn.fetchrow(
+            """
+            SELECT * FROM projects WHERE id = $1
+            """,
+            project_id
+        )
+    
+    if not project:
+        raise ValueError(f"Project with ID {project_id} not found")
+    
+    return project["video_id"]
+
+
+def _emit_timeline_update(
+    project_id: Optional[str],
+    payload: Dict[str, Any],
+    coalesce: bool = False
+) -> None:
+    """
+    Queue a realtime timeline event; it is sent in the next batch.
+    
+    Coalesced events (progress) replace the operation's pending one.
+    """
+    coalesce_key = (payload.get("operation_id"), payload.get("tier")) if coalesce else None
+    realtime_publisher.publish(project_id, payload, coalesce_key=coalesce_key)
+
+
+def _job_progress(
+    project_id: Optional[str],
+    operation_ids: List[str],
+    tier: str
+) -> JobProgress:
+    """
+    Progress tracker that publishes a render's percent complete.
+    
+    Updates are throttled to PROGRESS_MIN_INTERVAL and only go out as
+    coalesced realtime events: the clip rows are written when the job
+    starts and ends, never per tick, so a tick costs no database round
+    trip and cannot overwrite a stored result.
+    """
+    def publish(percent: float) -> None:
+        percent = round(percent, 1)
+        for operation_id in operation_ids:
+            _emit_timeline_update(project_id, {
+                "operation_id": operation_id,
+                "status": "processing",
+                "tier": tier,
+                "progress": percent
+            }, coalesce=True)
+    
+    return JobProgress(publish)
 
 
 def process_clip(data: Dict[str, Any]) -> Dict[str, Any]:
@@ -49,75 +220,51 @@ def process_clip(data: Dict[str, Any]) -> Dict[str, Any]:
               - start_time: Start time in seconds
               - end_time: End time in seconds
               - parameters: Additional parameters
+              - render_tier: "preview" or "final" (default: final)
+              - follows_preview: True for a final render queued behind
+                a preview, which leaves the clip's status alone
     
     Returns:
         Processing results
     """
+    tier = data.get("render_tier", FINAL)
+    follows_preview = data.get("follows_preview", False)
+    
     # Convert to async function and run in event loop
     async def _process_clip_async() -> Dict[str, Any]:
+        # Shared, keep-alive client of this worker process
+        supabase: Client = get_supabase()
+        
         try:
-            # Initialize Supabase client
-            supabase: Client = create_client(
-                settings.supabase_url,
-                settings.supabase_key
-            )
-            
             # Get operation details
             operation_id = data["operation_id"]
             project_id = data["project_id"]
             
-            # Update status to "processing"
-            async with db.connection() as conn:
-                await conn.execute(
-                    """
-                    UPDATE clips
-                    SET status = $1
-                    WHERE id = $2
-                    """,
-                    "processing",
-                    operation_id
-                )
+            # Update status to "processing" (the preview already shows)
+            if not follows_preview:
+                await _set_clip_status([operation_id], "processing", tier=tier)
             
             # Get project details including source video
-            async with db.connection() as conn:
-                project = await conn.fetchrow(
-                    """
-                    SELECT * FROM projects WHERE id = $1
-                    """,
-                    project_id
-                )
-                
-                if not project:
-                    raise ValueError(f"Project with ID {project_id} not found")
-                
-                video_id = project["video_id"]
+            video_id = await _get_project_video_id(project_id)
             
             # Process the clip based on operation type
-            result = await process_operation(data, video_id, supabase)
+            progress = _job_progress(project_id, [operation_id], tier)
+            with progress.activate():
+                result = await process_operation(data, video_id, supabase)
             
-            # Update status to "completed"
-            async with db.connection() as conn:
-                await conn.execute(
-                    """
-                    UPDATE clips
-                    SET status = $1, result = $2
-                    WHERE id = $3
-                    """,
-                    "completed",
-                    json.dumps(result),
-                    operation_id
-                )
+            # Update status to "completed", also on the rows of retries
+            # that attached to this job
+            operation_ids = _attached_operations([operation_id])
+            await _set_clip_status(operation_ids, "completed", result, tier)
             
             # Emit realtime event via Supabase
-            supabase.table("realtime_events").insert({
-                "event": "timeline_update",
-                "project_id": project_id,
-                "payload": {
-                    "operation_id": operation_id,
+            for attached_id in operation_ids:
+                _emit_timeline_update(project_id, {
+                    "operation_id": attached_id,
                     "status": "completed",
+                    "tier": tier,
                     "result": result
-                }
-            }).execute()
+                })
             
             return {
                 "success": True,
@@ -126,47 +273,248 @@ def process_clip(data: Dict[str, Any]) -> Dict[str, Any]:
             }
             
         except Exception as e:
-            # Update status to "failed"
-            async with db.connection() as conn:
-                await conn.execute(
-                    """
-                    UPDATE clips
-                    SET status = $1, result = $2
-                    WHERE id = $3
-                    """,
-                    "failed",
-                    json.dumps({"error": str(e)}),
-                    data.get("operation_id")
-                )
+            # Update status to "failed" (a failed final render keeps the
+            # preview it follows)
+            operation_ids = _attached_operations([data.get("operation_id")])
+            if not follows_preview:
+                await _set_clip_status(operation_ids, "failed", {"error": str(e)}, tier)
             
             # Emit realtime event via Supabase
-            supabase = create_client(
-                settings.supabase_url,
-                settings.supabase_key
-            )
+            for attached_id in operation_ids:
+                _emit_timeline_update(data.get("project_id"), {
+                    "operation_id": attached_id,
+                    "status": "failed",
+                    "tier": tier,
+                    "error": str(e)
+                })
+            
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    try:
+        return _run_async(_process_clip_async())
+    finally:
+        # Bounded: the job's status is already stored
+        realtime_publisher.flush()
+
+
+def process_plan(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render every operation of one command in a single ffmpeg pass.
+    
+    Args:
+        data: Dictionary with plan data including:
+              - plan_id: ID used for the rendered output
+              - project_id: ID of the project
+              - operations: List of operations, each with operation_id,
+                operation_type, start_time, end_time and parameters
+              - render_tier: "preview" or "final" (default: final)
+              - follows_preview: True for a final render queued behind
+                a preview, which leaves the clips' status alone
+    
+    Returns:
+        Processing results
+    """
+    tier = data.get("render_tier", FINAL)
+    follows_preview = data.get("follows_preview", False)
+    
+    async def _process_plan_async() -> Dict[str, Any]:
+        project_id = data.get("project_id")
+        operation_ids = [op["operation_id"] for op in data.get("operations", [])]
+        supabase: Client = get_supabase()
+        
+        try:
+            # Per-operation status rows are kept for the frontend
+            if not follows_preview:
+                await _set_clip_status(operation_ids, "processing", tier=tier)
+            
+            video_id = await _get_project_video_id(project_id)
+            progress = _job_progress(project_id, operation_ids, tier)
+            with progress.activate():
+                result = await render_plan(data, video_id, supabase)
+            
+            attached_ids = _attached_operations(operation_ids)
+            await _set_clip_status(attached_ids, "completed", result, tier)
+            
+            for operation_id in attached_ids:
+                _emit_timeline_update(project_id, {
+                    "operation_id": operation_id,
+                    "status": "completed",
+                    "tier": tier,
+                    "result": result
+                })
             
-            supabase.table("realtime_events").insert({
-                "event": "timeline_update",
-                "project_id": data.get("project_id"),
-                "payload": {
-                    "operation_id": data.get("operation_id"),
+            return {
+                "success": True,
+                "operation_ids": operation_ids,
+                "result": result
+            }
+        
+        except Exception as e:
+            attached_ids = _attached_operations(operation_ids)
+            if not follows_preview:
+                await _set_clip_status(attached_ids, "failed", {"error": str(e)}, tier)
+            
+            for operation_id in attached_ids:
+                _emit_timeline_update(project_id, {
+                    "operation_id": operation_id,
                     "status": "failed",
+                    "tier": tier,
                     "error": str(e)
-                }
-            }).execute()
+                })
             
             return {
                 "success": False,
                 "error": str(e)
             }
     
-    # Run the async function in a new event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
     try:
-        return loop.run_until_complete(_process_clip_async())
+        return _run_async(_process_plan_async())
     finally:
-        loop.close()
+        realtime_publisher.flush()
+
+
+def _source_object(
+    supabase: Client,
+    video_id: str,
+    tier: str
+) -> Tuple[str, Optional[str]]:
+    """
+    Pick the stored object a render tier reads.
+    
+    Previews read the video's proxy when one exists; final renders always
+    read the original.
+    
+    Args:
+        supabase: Supabase client
+        video_id: ID of the source video
+        tier: Render tier
+        
+    Returns:
+        Tuple of (object_path, content_hash); the hash is None when unknown
+    """
+    if tier == PREVIEW:
+        proxy_path = proxy_object_path(video_id)
+        proxy_hash = source_fingerprint(supabase, "videos", proxy_path)
+        if proxy_hash is not None:
+            return proxy_path, proxy_hash
+    
+    object_path = f"{video_id}.mp4"
+    return object_path, source_fingerprint(supabase, "videos", object_path)
+
+
+def _render_key(
+    source_hash: Optional[str],
+    operations: List[Dict[str, Any]],
+    profile: EncoderProfile
+) -> Optional[str]:
+    """
+    Render cache key for operations applied to a stored source object.
+    
+    Args:
+        source_hash: Content hash of the object the render reads
+        operations: Operations in application order
+        profile: Encoder profile of the render tier
+        
+    Returns:
+        Cache key, or None when the source's content hash is unknown
+    """
+    if source_hash is None:
+        return None
+    
+    # Everything that can change the encoded bytes of a render
+    encoder = {
+        "smart_cut": settings.smart_cut_enabled,
+        "render": chunked_render.RENDER_ENCODE,
+        "profile": profile.as_dict(),
+    }
+    return render_cache_key(source_hash, operations, encoder)
+
+
+def _upload_render(
+    supabase: Client,
+    render_key: Optional[str],
+    output_path: str,
+    result_path: str
+) -> str:
+    """
+    Upload a rendered file to its result path and return its public URL.
+    
+    Cacheable renders are also copied to their cache key. Only that copy
+    is ever evicted; the result stays where clips and undo history point.
+    """
+    storage_transfer.upload_file("assets", result_path, output_path, "video/mp4", upsert=True)
+    if render_key:
+        try:
+            storage_transfer.copy_object("assets", result_path, render_cache.object_path(render_key))
+        except StorageTransferError:
+            # A concurrent render of the same key already cached it
+            pass
+    return supabase.storage.from_("assets").get_public_url(result_path)
+
+
+def _reuse_render(
+    supabase: Client,
+    render_key: Optional[str],
+    result_path: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Copy a cached render to a result path of its own.
+    
+    Returns:
+        The cached result pointing at `result_path`, or None when the
+        render has to be made (not cached, evicted meanwhile, or the
+        result path is already taken)
+    """
+    if not render_key:
+        return None
+    cached = render_cache.lookup(render_key)
+    if cached is None:
+        return None
+    try:
+        storage_transfer.copy_object("assets", render_cache.object_path(render_key), result_path)
+    except StorageTransferError:
+        return None
+    return dict(cached, result_url=supabase.storage.from_("assets").get_public_url(result_path))
+
+
+def _result_path(output_id: str, tier: str) -> str:
+    """Storage path of a render result; never evicted."""
+    if tier == FINAL:
+        return f"results/{output_id}.mp4"
+    return f"results/{output_id}_{tier}.mp4"
+
+
+@contextmanager
+def open_source(
+    supabase: Client,
+    video_id: str,
+    object_path: str,
+    operation_type: str
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Open the source video for an operation.
+    
+    Segment operations read the stored object directly with HTTP range
+    requests; everything else uses a local copy from the media cache.
+    
+    Args:
+        supabase: Supabase client
+        video_id: ID of the source video
+        object_path: Stored object to read (the original or its proxy)
+        operation_type: Type of operation that will read the source
+        
+    Yields:
+        Tuple of (path_or_url, ffmpeg_input_options)
+    """
+    if settings.range_fetch_enabled and operation_type in RANGE_FETCH_OPERATIONS:
+        yield storage_transfer.ffmpeg_input("videos", object_path)
+        return
+    
+    with cached_source(supabase, video_id, object_path=object_path) as video_path:
+        yield video_path, {}
 
 
 async def process_operation(
@@ -178,7 +526,7 @@ async def process_operation(
     Process a specific operation type.
     
     Args:
-        data: Operation data
+        data: Operation data, with an optional render_tier (default: final)
         video_id: ID of the source video
         supabase: Supabase client
         
@@ -194,25 +542,58 @@ async def process_operation(
     end_time = data.get("end_time")
     parameters = data.get("parameters", {})
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Download source video
-        video_path = os.path.join(temp_dir, f"{video_id}.mp4")
+    profile = encoder_profile(data.get("render_tier", FINAL))
+    object_path, source_hash = _source_object(supabase, video_id, profile.tier)
+    
+    # Identical edits of the same source bytes reuse the earlier render
+    render_key = _render_key(source_hash, [data], profile)
+    result_path = _result_path(data["operation_id"], profile.tier)
+    cached = _reuse_render(supabase, render_key, result_path)
+    if cached is not None:
+        return cached
+    
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            open_source(supabase, video_id, object_path, operation_type) as (video_path, input_options):
+        # Process based on operation type
+        output_path = os.path.join(temp_dir, f"output_{video_id}.mp4")
+        duration = end_time - start_time
         
-        # Get file from storage
-        res = supabase.storage.from_("videos").download(f"{video_id}.mp4")
+        # A downloaded source is probed once and its keyframe index reused;
+        # a range-fetched one only has the cut's window scanned
+        scan = None
+        if settings.smart_cut_enabled and not input_options:
+            scan = (await load_media_info(video_path, source_hash)).keyframe_scan()
         
-        # Save to temporary file
-        with open(video_path, "wb") as f:
-            f.write(res)
+        if operation_type == "cut" and settings.smart_cut_enabled:
+            # Keep only the section, frame-accurately
+            smart_cut(
+                video_path,
+                [(start_time, end_time)],
+                output_path,
+                input_options,
+                encode=profile.video_options,
+                scan=scan
+            )
         
-        # Process based on operation type
-        output_path = os.path.join(temp_dir, f"output_{video_id}.mp4")
+        elif operation_type == "trim" and settings.smart_cut_enabled:
+            # Remove the section, frame-accurately
+            segments = [(end_time, None)]
+            if start_time > 0:
+                segments.insert(0, (0, start_time))
+            smart_cut(
+                video_path,
+                segments,
+                output_path,
+                input_options,
+                encode=profile.video_options,
+                scan=scan
+            )
         
-        if operation_type == "cut":
+        elif operation_type == "cut":
             # Cut a section from the video
             (
                 ffmpeg
-                .input(video_path, ss=start_time, to=end_time)
+                .input(video_path, ss=start_time, to=end_time, **input_options)
                 .output(output_path, c="copy")
                 .run(quiet=True)
             )
@@ -256,16 +637,14 @@ async def process_operation(
             )
         
         elif operation_type == "speed":
-            # Change playback speed
-            speed_factor = parameters.get("speed_factor", 1.0)
-            
-            (
-                ffmpeg
-                .input(video_path, ss=start_time, to=end_time)
-                .filter("setpts", f"{1/speed_factor}*PTS")
-                .output(output_path)
-                .run(quiet=True)
+            # Change the playback speed of [start_time, end_time] in the
+            # whole video, exactly as a fused plan does
+            media_info = await load_media_info(video_path, source_hash)
+            plan = compile_plan([data], media_info.duration)
+            chunked_render.render(
+                video_path, plan, output_path, media_info.has_audio, profile=profile
             )
+            duration = plan.output_duration
         
         else:
             # Default to simple copy of the specified segment
@@ -277,27 +656,244 @@ async def process_operation(
             )
         
         # Upload result to Supabase Storage
-        result_path = f"results/{data['operation_id']}.mp4"
+        result_url = _upload_render(supabase, render_key, output_path, result_path)
+        
+        result = {
+            "result_url": result_url,
+            "duration": duration,
+            "operation_type": operation_type,
+            "tier": profile.tier
+        }
+        if render_key:
+            render_cache.store(supabase, render_key, os.path.getsize(output_path), result)
         
-        with open(output_path, "rb") as f:
-            supabase.storage.from_("assets").upload(
-                result_path,
-                f.read(),
-                {"content-type": "video/mp4"}
+        return result
+
+
+async def render_plan(
+    data: Dict[str, Any],
+    video_id: str,
+    supabase: Client
+) -> Dict[str, Any]:
+    """
+    Compile a command's operations into one filtergraph and render it.
+    
+    Args:
+        data: Plan data with plan_id, operations and an optional
+              render_tier (default: final)
+        video_id: ID of the source video
+        supabase: Supabase client
+        
+    Returns:
+        Render results shared by every operation of the plan
+    """
+    import tempfile
+    import os
+    
+    profile = encoder_profile(data.get("render_tier", FINAL))
+    object_path, source_hash = _source_object(supabase, video_id, profile.tier)
+    
+    render_key = _render_key(source_hash, data["operations"], profile)
+    result_path = _result_path(data["plan_id"], profile.tier)
+    cached = _reuse_render(supabase, render_key, result_path)
+    if cached is not None:
+        return dict(cached, plan_id=data["plan_id"])
+    
+    with tempfile.TemporaryDirectory() as temp_dir, \
+            cached_source(supabase, video_id, object_path=object_path) as video_path:
+        # Probed once per source; the keyframe index plans the smart cut
+        media_info = await load_media_info(video_path, source_hash)
+        
+        plan = compile_plan(data["operations"], media_info.duration)
+        
+        output_path = os.path.join(temp_dir, f"plan_{data['plan_id']}.mp4")
+        if settings.smart_cut_enabled and all(seg.speed == 1.0 for seg in plan.segments):
+            # Pure cut/trim plans only need their segment edges re-encoded
+            smart_cut(
+                video_path,
+                [(seg.start, seg.end) for seg in plan.segments],
+                output_path,
+                work_dir=temp_dir,
+                encode=profile.video_options,
+                scan=media_info.keyframe_scan()
+            )
+        else:
+            # One decode, one encode for the whole command (split into
+            # parallel chunks when it is long)
+            chunked_render.render(
+                video_path, plan, output_path, media_info.has_audio, profile=profile
             )
         
-        # Get public URL
-        result_url = supabase.storage.from_("assets").get_public_url(result_path)
+        # Upload result to Supabase Storage
+        result_url = _upload_render(supabase, render_key, output_path, result_path)
         
-        return {
+        result = {
             "result_url": result_url,
-            "duration": end_time - start_time,
-            "operation_type": operation_type
+            "duration": plan.output_duration,
+            "operation_type": "plan",
+            "plan_id": data["plan_id"],
+            "operation_types": [op["operation_type"] for op in data["operations"]],
+            "tier": profile.tier
         }
+        if render_key:
+            render_cache.store(supabase, render_key, os.path.getsize(output_path), result)
+        
+        return result
+
+
+async def _enqueue_audio_analysis(video_id: str) -> List[str]:
+    """
+    Queue `analyze_audio` for every project of a video, or for the video
+    alone (waveform peaks only) while no project uses it yet.
+    """
+    async with db.read_connection() as conn:
+        projects = await conn.fetch(
+            """
+            SELECT id FROM projects WHERE video_id = $1
+            """,
+            video_id
+        )
+    
+    if not projects:
+        return [await enqueue_task("analyze_audio", {"video_id": video_id})]
+    return [
+        await enqueue_task("analyze_audio", {"project_id": str(project["id"])})
+        for project in projects
+    ]
+
+
+def generate_proxy(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Make the preview proxy of a stored video, then queue its audio analysis.
+    
+    Audio analysis is queued once the proxy is in storage (or has failed),
+    so it decodes the proxy rather than the original.
+    
+    Args:
+        data: Dictionary with the video_id of the original in storage
+    
+    Returns:
+        Storage path of the proxy and the queued analysis job IDs
+    """
+    import tempfile
+    
+    video_id = data["video_id"]
+    supabase = get_supabase()
+    
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                cached_source(supabase, video_id) as video_path:
+            output_path = os.path.join(temp_dir, f"proxy_{video_id}.mp4")
+            build_proxy(video_path, output_path)
+            
+            proxy_path = proxy_object_path(video_id)
+            storage_transfer.upload_file("videos", proxy_path, output_path, "video/mp4", upsert=True)
+        
+        result = {
+            "success": True,
+            "proxy_path": proxy_path
+        }
+    
+    except Exception as e:
+        # Previews fall back to the original without a proxy
+        result = {
+            "success": False,
+            "error": str(e)
+        }
+    
+    result["analysis_jobs"] = _run_async(_enqueue_audio_analysis(video_id))
+    return result
+
+
+def analyze_audio(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract a project's audio features and its video's waveform peaks.
+    
+    The audio is decoded once, from the video's proxy (same audio as the
+    original) when there is one: every decoded block feeds both the
+    audio_features rows and the waveform peak pyramid.
+    
+    With only a video_id, just the waveform peaks are built; features
+    are stored per project.
+    
+    Args:
+        data: Dictionary with the project_id (or video_id) to analyse
+    
+    Returns:
+        Number of analysis frames stored and the waveform levels
+    """
+    from app.core.audio_features import SAMPLE_RATE, extract_features
+    from app.core.waveform import PeakPyramidBuilder
+    from app.services.audio_analysis import store_audio_features
+    from app.services.waveforms import store_waveform
+    
+    project_id = data.get("project_id")
+    supabase = get_supabase()
+    
+    async def _analyze_audio_async() -> Dict[str, Any]:
+        video_id = data.get("video_id") or await _get_project_video_id(project_id)
+        peaks = PeakPyramidBuilder()
+        with cached_preview_source(supabase, video_id) as media_path:
+            blocks = extract_features(media_path, tap=peaks.add)
+            if project_id:
+                frames = await store_audio_features(project_id, blocks)
+            else:
+                frames = sum(len(block) for block in blocks)
+        await store_waveform(str(video_id), peaks.finish(), SAMPLE_RATE, peaks.bits)
+        return {"frames": frames, "waveform_levels": peaks.levels}
+    
+    try:
+        result = _run_async(_analyze_audio_async())
+        return {
+            "success": True,
+            **result
+        }
+    
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def backfill_embeddings(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store packed float32 embeddings for transcript segments missing one.
+    
+    Args:
+        data: Dictionary with optional project_id and batch_size
+    
+    Returns:
+        Number of rows backfilled
+    """
+    from app.core.embedding_cache import MODEL
+    from app.services.embeddings import backfill_embedding_column
+    
+    backfilled = _run_async(
+        backfill_embedding_column(
+            lambda texts: MODEL.encode(list(texts)),
+            data.get("project_id"),
+            data.get("batch_size", 500)
+        )
+    )
+    
+    return {
+        "success": True,
+        "backfilled": backfilled
+    }
+
+
+class InProcessWorker(WeightedWorker, SimpleWorker):
+    """
+    Weighted worker that runs jobs in its own process instead of a forked
+    work horse, so shared clients keep their connections between jobs.
+    """
 
 
 def run_worker():
     """Start the RQ worker process."""
     with Connection(redis_conn):
-        worker = Worker([queue])
+        # Queues are served in weighted order, with per-user fair share
+        worker_class = WeightedWorker if settings.worker_fork_jobs else InProcessWorker
+        worker = worker_class(list(queues.values()))
         worker.work() 
\ No newline at end of file
@@ -1,13 +1,16 @@
 import os
-import tempfile
 import ffmpeg
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
+
+from app.core.ffmpeg_async import run_ffmpeg
+from app.services.media_info import load_media_info
 
 async def create_thumbnail_sprite(
     video_path: str, 
     output_dir: str,
     columns: int = 10,
-    fps: float = 1.0
+    fps: float = 1.0,
+    timeout: Optional[float] = None
 ) -> Tuple[str, float]:
     """
     Creates a sprite sheet of thumbnails from a video.
@@ -17,17 +20,16 @@ async def create_thumbnail_sprite(
         output_dir: Directory to save the sprite
         columns: Number of thumbnails per row
         fps: Frames per second for thumbnails
+        timeout: Seconds before ffmpeg is killed (default: FFMPEG_TIMEOUT)
         
     Returns:
         Tuple of (sprite_path, actual_fps)
     """
-    # Get video information
-    probe = ffmpeg.probe(video_path)
-    video_info = next(s for s in probe['streams'] if s['codec_type'] == 'video')
-    duration = float(probe['format']['duration'])
+    # Get video information (probed once per file, see media_info)
+    duration = (await load_media_info(video_path, keyframes=False)).duration
     
     # Calculate thumbnail count and actual fps
-    total_thumbs = min(300, int(duration * fps))  # Cap at 300 thumbnails
+    total_thumbs = max(1, min(300, int(duration * fps)))  # Cap at 300 thumbnails
     actual_fps = total_thumbs / duration
     
     # Calculate sprite dimensions
@@ -35,15 +37,17 @@ async def create_thumbnail_sprite(
     
     sprite_path = os.path.join(output_dir, "sprite.jpg")
     
-    # Create sprite using ffmpeg
-    (
+    # Create sprite using ffmpeg: sample at actual_fps and tile the
+    # thumbnails into one image
+    await run_ffmpeg(
         ffmpeg
-        .input(video_path, r=actual_fps)
+        .input(video_path)
+        .filter('fps', actual_fps)
         .filter('scale', 160, 90)
-        .filter('tile', columns, rows)
-        .output(sprite_path)
-        .overwrite_output()
-        .run(quiet=True)
+        .filter('tile', f"{columns}x{rows}")
+        .output(sprite_path, vframes=1)
+        .overwrite_output(),
+        timeout
     )
     
     return sprite_path, actual_fps
@@ -54,7 +58,8 @@ async def extract_frame(
     timestamp: float,
     output_path: str,
     width: int = 640,
-    height: int = 360
+    height: int = 360,
+    timeout: Optional[float] = None
 ) -> str:
     """
     Extract a single frame from a video at a specific timestamp.
@@ -65,17 +70,18 @@ async def extract_frame(
         output_path: Path to save the frame
         width: Width of the output frame
         height: Height of the output frame
+        timeout: Seconds before ffmpeg is killed (default: FFMPEG_TIMEOUT)
         
     Returns:
         Path to the extracted frame
     """
-    (
+    await run_ffmpeg(
         ffmpeg
         .input(video_path, ss=timestamp)
         .filter('scale', width, height)
         .output(output_path, vframes=1)
-        .overwrite_output()
-        .run(quiet=True)
+        .overwrite_output(),
+        timeout
     )
     
     return output_path
@@ -91,16 +97,18 @@ async def get_video_info(video_path: str) -> Dict[str, Any]:
     Returns:
         Dictionary with video metadata
     """
-    probe = ffmpeg.probe(video_path)
+    media_info = await load_media_info(video_path, keyframes=False)
     
-    video_stream = next(s for s in probe['streams'] if s['codec_type'] == 'video')
+    video_stream = media_info.video
+    if video_stream is None:
+        raise ValueError(f"No video stream in {video_path}")
     
     info = {
-        'duration': float(probe['format']['duration']),
+        'duration': media_info.duration,
         'width': int(video_stream['width']),
         'height': int(video_stream['height']),
-        'fps': eval(video_stream.get('r_frame_rate', '30/1')),
-        'format': probe['format']['format_name'],
+        'fps': video_stream['fps'] or 30.0,
+        'format': media_info.format_name,
         'codec': video_stream['codec_name']
     }
     
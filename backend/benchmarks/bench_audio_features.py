@@ -0,0 +1,63 @@
+"""
+Benchmark: streaming audio feature extraction on a long file.
+
+Generates a long stereo AAC track of speech-like bursts and pauses, then
+runs `extract_features` over it and reports the realtime factor (seconds
+of audio analysed per second of wall time), the frame and silence counts
+and the peak Python heap size, which should not grow with the duration.
+
+Usage:
+    python benchmarks/bench_audio_features.py [--duration 3600] [--block-frames 2048]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.audio_features import extract_features  # noqa: E402
+
+
+def make_audio(path, duration):
+    # A tone gated on for 3 s of every 4 s, as a stand-in for speech and pauses
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=48000:duration={duration}",
+        "-af", "volume='if(lt(mod(t,4),3),0.5,0)':eval=frame",
+        "-ac", "2", "-c:a", "aac", "-b:a", "96k", path,
+    ], check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=3600, help="Audio length in seconds")
+    parser.add_argument("--block-frames", type=int, default=2048, help="Frames per block")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "audio.m4a")
+        make_audio(source, args.duration)
+
+        frames = silent = 0
+        tracemalloc.start()
+        began = time.perf_counter()
+        for block in extract_features(source, block_frames=args.block_frames):
+            frames += len(block)
+            silent += int(block.is_silent.sum())
+        elapsed = time.perf_counter() - began
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"audio: {args.duration}s, {args.block_frames} frames per block")
+        print(f"frames: {frames} ({silent} silent, {silent / max(frames, 1):.0%})")
+        print(f"time: {elapsed:.2f}s, {args.duration / elapsed:.0f}x realtime")
+        print(f"peak heap: {peak / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
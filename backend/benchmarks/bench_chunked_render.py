@@ -0,0 +1,65 @@
+"""
+Benchmark: chunked parallel rendering over degrees of parallelism.
+
+Generates a test clip and renders a speed-change plan over the whole of it
+with 1, 2, 4, ... concurrent chunk encodes (up to the core count), printing
+wall time and speed-up over the single-pass render.
+
+Usage:
+    python benchmarks/bench_chunked_render.py [--duration 120] [--max-parallelism N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "tests")]
+
+from media_fixtures import make_clip  # noqa: E402
+from app.core.chunked_render import render  # noqa: E402
+from app.core.render_plan import compile_plan  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=120, help="Source clip length in seconds")
+    parser.add_argument(
+        "--max-parallelism", type=int, default=os.cpu_count() or 1,
+        help="Highest degree of parallelism to try"
+    )
+    args = parser.parse_args()
+
+    levels = []
+    n = 1
+    while n <= args.max_parallelism:
+        levels.append(n)
+        n *= 2
+    if levels[-1] != args.max_parallelism:
+        levels.append(args.max_parallelism)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        make_clip(source, args.duration, size="1280x720", gop=60)
+        plan = compile_plan([{
+            "operation_type": "speed",
+            "start_time": args.duration / 4,
+            "end_time": args.duration / 2,
+            "parameters": {"speed_factor": 1.5},
+        }], args.duration)
+        output = os.path.join(temp_dir, "out.mp4")
+
+        print(f"source: {args.duration}s 1280x720, {os.cpu_count()} cores")
+        print(f"{'parallelism':>12} {'chunks':>7} {'wall':>8} {'speed-up':>9}")
+        baseline = None
+        for level in levels:
+            began = time.perf_counter()
+            chunks = render(source, plan, output, parallelism=level, min_chunk_seconds=5)
+            elapsed = time.perf_counter() - began
+            baseline = baseline or elapsed
+            print(f"{level:>12} {chunks:>7} {elapsed:>7.2f}s {baseline / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
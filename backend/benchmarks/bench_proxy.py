@@ -0,0 +1,96 @@
+"""
+Benchmark: preview work on the original vs. on its ingest proxy.
+
+Generates a high-resolution, long-GOP clip (as a camera would), makes its
+proxy, then times the preview-side jobs on both: the thumbnail sprite,
+single-frame seeks (scrubbing) and a short preview render.
+
+Usage:
+    python benchmarks/bench_proxy.py [--duration 60] [--size 3840x2160]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import ffmpeg
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "tests")]
+
+from media_fixtures import make_clip  # noqa: E402
+from app.core.proxy import build_proxy  # noqa: E402
+from app.utils.ffmpeg_helpers import extract_frame  # noqa: E402
+
+RATE = 30
+
+
+def sprite(source, temp_dir, duration):
+    # One 160x90 thumbnail per second tiled into a sheet, as
+    # create_thumbnail_sprite does (without its ffprobe call)
+    (
+        ffmpeg
+        .input(source)
+        .filter("fps", 1)
+        .filter("scale", 160, 90)
+        .filter("tile", f"10x{(duration + 9) // 10}")
+        .output(os.path.join(temp_dir, "sprite.jpg"), vframes=1)
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def seeks(source, temp_dir, duration):
+    frame = os.path.join(temp_dir, "frame.jpg")
+    for i in range(10):
+        # Off the keyframe grid, as a scrub usually is
+        asyncio.run(extract_frame(source, duration * (i + 0.5) / 10 + 0.37, frame))
+
+
+def preview(source, temp_dir, duration):
+    start = duration / 3 + 0.37
+    (
+        ffmpeg
+        .input(source, ss=start, t=5)
+        .output(os.path.join(temp_dir, "preview.mp4"), vcodec="libx264", preset="veryfast")
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def timed(fn, *args):
+    began = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=60, help="Source clip length in seconds")
+    parser.add_argument("--size", default="3840x2160", help="Source frame size")
+    parser.add_argument("--gop", type=int, default=250, help="Source keyframe interval in frames")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        make_clip(source, args.duration, size=args.size, rate=RATE, gop=args.gop)
+        proxy = os.path.join(temp_dir, "proxy.mp4")
+        print(f"source: {args.duration}s {args.size}@{RATE}, keyframe every {args.gop} frames")
+        print(f"proxy build: {timed(build_proxy, source, proxy):.2f}s (once, at ingest)")
+
+        print(f"{'job':>12} {'original':>10} {'proxy':>10} {'speed-up':>9}")
+        jobs = (
+            ("sprite", lambda src: sprite(src, temp_dir, args.duration)),
+            ("10 seeks", lambda src: seeks(src, temp_dir, args.duration)),
+            ("5s preview", lambda src: preview(src, temp_dir, args.duration)),
+        )
+        for name, job in jobs:
+            original = timed(job, source)
+            proxied = timed(job, proxy)
+            print(f"{name:>12} {original:>9.2f}s {proxied:>9.2f}s {original / proxied:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: bytes transferred by range-fetch segment reads vs. operation length.
+
+Generates a test clip, serves it from the local storage stand-in and runs a
+stream-copy cut of increasing length through an HTTP range input, printing
+how many bytes the server sent compared with a full download.
+
+Usage:
+    python benchmarks/bench_range_fetch.py [--duration 120]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import ffmpeg
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "tests")]
+
+from media_fixtures import make_clip  # noqa: E402
+from storage_standin import serve  # noqa: E402
+from app.services.storage_transfer import StorageTransfer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=120, help="Source clip length in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        make_clip(source, args.duration)
+        size = os.path.getsize(source)
+
+        with serve(os.path.join(temp_dir, "storage")) as store:
+            with open(source, "rb") as f:
+                store.put_object("videos", "bench.mp4", f.read())
+            url, options = StorageTransfer(store.url, "bench").ffmpeg_input("videos", "bench.mp4")
+
+            print(f"source: {args.duration}s, {size / 1e6:.1f} MB")
+            print(f"{'op length':>10} {'bytes read':>12} {'of source':>10} {'wall':>8}")
+            lengths = sorted({n for n in (1, 5, 15, 30, 60) if n < args.duration} | {args.duration})
+            for length in lengths:
+                start = max(0, (args.duration - length) / 2)
+                store.bytes_served = 0
+                began = time.perf_counter()
+                (
+                    ffmpeg
+                    .input(url, ss=start, to=start + length, **options)
+                    .output(os.path.join(temp_dir, "out.mp4"), c="copy")
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
+                elapsed = time.perf_counter() - began
+                print(
+                    f"{length:>9}s {store.bytes_served / 1e6:>10.2f}MB "
+                    f"{store.bytes_served / size:>9.1%} {elapsed:>7.2f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: ffmpeg filtergraph render backend vs. the moviepy backend.
+
+Generates a test clip and renders the same actions with each backend,
+printing wall time and peak RSS. Every render runs in a fresh process so
+peak RSS is not inherited between runs; it is reported for the Python
+process and, separately, for the largest ffmpeg child it spawned.
+moviepy only implements cut and volume (zoom and caption are placeholders
+there), so only those are compared.
+
+Usage:
+    python benchmarks/bench_render_backends.py [--duration 30] [--size 1280x720]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "tests")]
+
+from media_fixtures import clip_media_info, make_clip  # noqa: E402
+
+ACTIONS = [
+    {"action": "cut", "start_sec": 5, "end_sec": 10},
+    {"action": "volume", "factor": 1.5},
+]
+
+
+def render_once(backend_name, source, action, output, media_info, results):
+    from app.core.render_backends import get_render_backend
+
+    backend = get_render_backend(backend_name)
+    began = time.perf_counter()
+    if backend_name == "moviepy":
+        # Keep moviepy's progress bar out of the table
+        import contextlib
+        import io
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            backend.render(source, action, output, media_info)
+    else:
+        backend.render(source, action, output, media_info)
+    elapsed = time.perf_counter() - began
+    results.put((
+        elapsed,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=30, help="Source clip length in seconds")
+    parser.add_argument("--size", default="1280x720", help="Source frame size")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        make_clip(source, args.duration, size=args.size)
+        media_info = clip_media_info(args.duration, size=args.size)
+        output = os.path.join(temp_dir, "out.mp4")
+
+        print(f"source: {args.duration}s {args.size}")
+        print(f"{'action':>8} {'backend':>8} {'wall':>8} {'python RSS':>11} {'child RSS':>10}")
+        for action in ACTIONS:
+            for backend_name in ("moviepy", "ffmpeg"):
+                results = context.Queue()
+                process = context.Process(
+                    target=render_once,
+                    args=(backend_name, source, action, output, media_info, results)
+                )
+                process.start()
+                elapsed, self_rss, child_rss = results.get()
+                process.join()
+                print(
+                    f"{action['action']:>8} {backend_name:>8} {elapsed:>7.2f}s "
+                    f"{self_rss / 1024:>9.0f}MB {child_rss / 1024:>8.0f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
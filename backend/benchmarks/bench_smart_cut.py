@@ -0,0 +1,93 @@
+"""
+Benchmark: smart cut vs. full re-encode vs. plain stream copy.
+
+Generates a test clip and cuts segments of increasing length out of it
+three ways, printing wall time and how many frames each result holds
+compared with the frames the user asked for. Stream copy is fast but snaps
+to keyframes; a full re-encode is exact but slow; the smart cut should be
+exact at close to copy speed.
+
+Usage:
+    python benchmarks/bench_smart_cut.py [--duration 120] [--gop 60]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import ffmpeg
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "tests")]
+
+from media_fixtures import make_clip  # noqa: E402
+from app.core.smart_cut import BOUNDARY_ENCODE, smart_cut  # noqa: E402
+
+RATE = 30
+
+
+def frame_count(path):
+    out = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", path, "-map", "0:v", "-c", "copy", "-f", "framecrc", "-"],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return sum(1 for line in out.splitlines() if not line.startswith("#"))
+
+
+def stream_copy(source, start, end, output):
+    (
+        ffmpeg
+        .input(source, ss=start, to=end)
+        .output(output, c="copy")
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def full_reencode(source, start, end, output):
+    (
+        ffmpeg
+        .input(source, ss=start, to=end)
+        .output(output, vcodec="libx264", acodec="aac", **BOUNDARY_ENCODE)
+        .overwrite_output()
+        .run(quiet=True)
+    )
+
+
+def smart(source, start, end, output):
+    smart_cut(source, [(start, end)], output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=120, help="Source clip length in seconds")
+    parser.add_argument("--gop", type=int, default=60, help="Keyframe interval in frames")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        make_clip(source, args.duration, size="1280x720", rate=RATE, gop=args.gop)
+        output = os.path.join(temp_dir, "out.mp4")
+
+        print(f"source: {args.duration}s 1280x720@{RATE}, keyframe every {args.gop} frames")
+        print(f"{'op length':>10} {'method':>10} {'wall':>8} {'frames':>8} {'wanted':>8}")
+        lengths = sorted({n for n in (5, 15, 30, 60) if n < args.duration})
+        for length in lengths:
+            # Start off the keyframe grid so the edges need work
+            start = round(max(0.0, (args.duration - length) / 2) + 0.35, 2)
+            end = start + length
+            wanted = round(end * RATE) - round(start * RATE)
+            for name, method in (("copy", stream_copy), ("reencode", full_reencode), ("smart", smart)):
+                began = time.perf_counter()
+                method(source, start, end, output)
+                elapsed = time.perf_counter() - began
+                print(
+                    f"{length:>9}s {name:>10} {elapsed:>7.2f}s "
+                    f"{frame_count(output):>8} {wanted:>8}"
+                )
+
+
+if __name__ == "__main__":
+    main()
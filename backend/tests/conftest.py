@@ -0,0 +1,13 @@
+"""
+Shared fixtures
+"""
+import pytest
+
+from storage_standin import serve
+
+
+@pytest.fixture
+def storage_server(tmp_path):
+    """Run a local Supabase Storage stand-in for one test."""
+    with serve(tmp_path / "storage") as store:
+        yield store
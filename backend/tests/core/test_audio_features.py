@@ -0,0 +1,76 @@
+"""
+Tests for streaming audio feature extraction
+"""
+import shutil
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from app.core.audio_features import FLOOR_DB, SAMPLE_RATE, analyse_frames, extract_features
+from media_fixtures import make_clip, make_tone_then_silence
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def test_frame_levels():
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.5 * 32767 * np.sin(2 * np.pi * 400 * t)).astype(np.int16)
+    samples = np.concatenate([tone, np.zeros(SAMPLE_RATE // 2 + 100, dtype=np.int16)])
+
+    block = analyse_frames(samples, 800, silence_db=-40)
+
+    # 1.5 s plus 100 samples: 30 whole frames and a partial one
+    assert len(block) == 31
+    assert block.duration[-1] == 100 / SAMPLE_RATE
+    assert np.allclose(block.rms_db[:20], 20 * np.log10(0.5 / np.sqrt(2)), atol=0.1)
+    assert np.allclose(block.peak_db[:20], 20 * np.log10(0.5), atol=0.1)
+    assert np.all(block.rms_db[20:] == FLOOR_DB)
+    assert block.is_silent.tolist() == [False] * 20 + [True] * 11
+
+
+def test_block_position_offsets_timestamps():
+    block = analyse_frames(np.zeros(1600, dtype=np.int16), 800, start_sample=SAMPLE_RATE)
+
+    assert block.timestamp.tolist() == [1.0, 1.05]
+
+
+@needs_ffmpeg
+def test_stream_finds_silence_across_blocks(tmp_path):
+    path = tmp_path / "audio.wav"
+    make_tone_then_silence(path, 2, 1)
+
+    blocks = list(extract_features(str(path), frame_seconds=0.05, block_frames=7, silence_db=-40))
+    timestamp = np.concatenate([b.timestamp for b in blocks])
+    silent = np.concatenate([b.is_silent for b in blocks])
+
+    assert len(blocks) > 1
+    assert np.allclose(np.diff(timestamp), 0.05)
+    assert len(timestamp) == 60
+    assert not silent[:39].any()
+    assert silent[41:].all()
+
+
+@needs_ffmpeg
+def test_memory_stays_constant_on_long_files(tmp_path):
+    path = tmp_path / "audio.wav"
+    make_tone_then_silence(path, 300, 1)
+
+    tracemalloc.start()
+    try:
+        frames = sum(len(block) for block in extract_features(str(path), block_frames=256))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert frames == 301 * 20
+    # Five minutes of PCM is ~9.6 MB; one block of 256 frames is ~0.4 MB
+    assert peak < 2 * 1024 * 1024
+
+
+@needs_ffmpeg
+def test_file_without_audio_yields_nothing(tmp_path):
+    path = tmp_path / "silent.mp4"
+    make_clip(path, 1, audio=False)
+
+    assert list(extract_features(str(path))) == []
@@ -0,0 +1,132 @@
+"""
+Tests for parallel chunked rendering
+"""
+import shutil
+import subprocess
+import threading
+import time
+from fractions import Fraction
+
+import pytest
+
+from app.core import chunked_render, ffmpeg_async
+from app.core.chunked_render import exclusive_end, render, split_plan
+from app.core.ffmpeg_async import HostSlots
+from app.core.render_plan import RenderPlan, Segment, compile_plan
+from app.core.smart_cut import KeyframeScan
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def stream_timestamps(path):
+    """Sorted presentation times (seconds) of every packet, per stream index."""
+    out = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(path), "-c", "copy", "-f", "framecrc", "-"],
+        capture_output=True, text=True, check=True
+    ).stdout
+    time_bases, times = {}, {}
+    for line in out.splitlines():
+        if line.startswith("#tb"):
+            index, value = line[4:].split(":")
+            time_bases[index.strip()] = Fraction(value.strip())
+        elif not line.startswith("#"):
+            fields = [f.strip() for f in line.split(",")]
+            start = int(fields[2]) * time_bases[fields[0]]
+            end = start + int(fields[3]) * time_bases[fields[0]]
+            times.setdefault(fields[0], []).append((float(start), float(end)))
+    return {index: sorted(values) for index, values in times.items()}
+
+def test_split_plan_cuts_at_keyframes():
+    plan = RenderPlan([Segment(0, 30)])
+    
+    parts = split_plan(plan, [0, 4, 8, 12, 16, 20, 24, 28], 3)
+    
+    assert [p.segments for p in parts] == [
+        [Segment(0, 12)],
+        [Segment(12, 24)],
+        [Segment(24, 30)],
+    ]
+
+def test_split_plan_covers_the_plan():
+    plan = RenderPlan([Segment(0, 10), Segment(15, 25, 2.0), Segment(30, 40)])
+    keyframes = [float(k) for k in range(0, 40, 2)]
+    
+    parts = split_plan(plan, keyframes, 4)
+    
+    assert len(parts) == 4
+    assert sum(p.output_duration for p in parts) == pytest.approx(plan.output_duration)
+    # Re-joining the pieces gives back the original segments
+    joined = []
+    for seg in (seg for p in parts for seg in p.segments):
+        if joined and joined[-1].end == seg.start and joined[-1].speed == seg.speed:
+            joined[-1] = Segment(joined[-1].start, seg.end, seg.speed)
+        else:
+            joined.append(seg)
+    assert joined == plan.segments
+    assert all(p.segments[0].start in keyframes for p in parts)
+
+def test_split_plan_without_keyframes_is_one_chunk():
+    plan = RenderPlan([Segment(0, 30)])
+    
+    assert split_plan(plan, [0], 4) == [plan]
+
+def test_chunk_encodes_take_host_slots(tmp_path, monkeypatch):
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def run(stream, progress=True, encode=True):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    monkeypatch.setattr(ffmpeg_async, "host_slots", HostSlots(str(tmp_path / "slots"), 2))
+    monkeypatch.setattr(chunked_render.ffmpeg_progress, "run", run)
+    monkeypatch.setattr(
+        chunked_render,
+        "scan_keyframes",
+        lambda *args: KeyframeScan(keyframes=[float(k) for k in range(0, 40, 2)], frame_duration=1 / 30)
+    )
+    
+    chunks = render("source.mp4", RenderPlan([Segment(0.0, 40.0)]), str(tmp_path / "out.mp4"),
+                    has_audio=False, parallelism=8, min_chunk_seconds=1.0)
+    
+    # More chunks than slots, yet never more encodes than slots
+    assert chunks > 2
+    assert peak == 2
+
+def test_exclusive_end_drops_the_boundary_frame():
+    plan = RenderPlan([Segment(0, 4), Segment(6, 12, 2.0)])
+    
+    chunk = exclusive_end(plan, 1 / 30)
+    
+    assert chunk.segments[0] == Segment(0, 4)
+    assert chunk.segments[1].end == pytest.approx(12 - 1 / 60)
+    assert chunk.segments[1].speed == 2.0
+
+@needs_ffmpeg
+def test_chunked_render_matches_single_pass_and_stays_in_sync(tmp_path):
+    from media_fixtures import make_clip
+    
+    source = tmp_path / "source.mp4"
+    make_clip(source, 12, rate=30, gop=30)
+    plan = compile_plan([
+        {"operation_type": "trim", "start_time": 2, "end_time": 3},
+        {"operation_type": "speed", "start_time": 5, "end_time": 9, "parameters": {"speed_factor": 2.0}},
+    ], 12)
+    single, chunked = tmp_path / "single.mp4", tmp_path / "chunked.mp4"
+    
+    assert render(str(source), plan, str(single), parallelism=1) == 1
+    assert render(str(source), plan, str(chunked), parallelism=3, min_chunk_seconds=1) == 3
+    
+    single_ts, chunked_ts = stream_timestamps(single), stream_timestamps(chunked)
+    video, audio = chunked_ts["0"], chunked_ts["1"]
+    # Every frame lands exactly where the single-pass render puts it
+    assert [s for s, _ in video] == pytest.approx([s for s, _ in single_ts["0"]], abs=1e-3)
+    # Audio and video both span the planned duration
+    assert video[-1][1] == pytest.approx(plan.output_duration, abs=1 / 30)
+    assert audio[-1][1] == pytest.approx(plan.output_duration, abs=0.05)
@@ -2,7 +2,7 @@
 Tests for quick command pattern matching
 """
 import pytest
-from app.core.command_patterns import match_quick
+from app.core.command_patterns import match_quick, match_silence_removal
 
 @pytest.mark.parametrize("text,expected", [
     ("cut the first 5 seconds", {
@@ -61,4 +61,15 @@ def test_no_match():
 def test_invalid_timestamp():
     """Test that invalid timestamps return None"""
     assert match_quick("cut between invalid and 2:00") is None
-    assert match_quick("add text 'test' at invalid") is None 
\ No newline at end of file
+    assert match_quick("add text 'test' at invalid") is None
+
+@pytest.mark.parametrize("text,expected", [
+    ("remove all the silences", {"silences": True, "fillers": False}),
+    ("Cut dead air", {"silences": True, "fillers": False}),
+    ("cut out the ums and uhs", {"silences": False, "fillers": True}),
+    ("remove pauses and filler words", {"silences": True, "fillers": True}),
+    ("cut the first 5 seconds", None),
+    ("add a silent intro", None),
+])
+def test_match_silence_removal(text, expected):
+    assert match_silence_removal(text) == expected
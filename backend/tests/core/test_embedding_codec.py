@@ -0,0 +1,41 @@
+"""
+Tests for the packed float32 embedding codec
+"""
+import numpy as np
+import pytest
+from app.core.embedding_codec import (
+    decode_embedding,
+    decode_matrix,
+    encode_embedding,
+    stack_embeddings,
+)
+
+def test_round_trip_is_little_endian_float32():
+    vector = [0.5, -1.25, 3.0]
+    data = encode_embedding(vector)
+    
+    assert data == np.array(vector, dtype="<f4").tobytes()
+    assert decode_embedding(data).tolist() == vector
+
+def test_decode_is_zero_copy():
+    data = encode_embedding(np.arange(6, dtype=np.float64))
+    matrix = decode_matrix(data, dim=3)
+    
+    assert matrix.shape == (2, 3)
+    assert not matrix.flags.owndata
+    assert not matrix.flags.writeable
+
+def test_stack_embeddings_builds_contiguous_matrix():
+    blobs = [encode_embedding([i, i + 0.5]) for i in range(4)]
+    matrix = stack_embeddings(blobs)
+    
+    assert matrix.shape == (4, 2)
+    assert matrix.flags.c_contiguous
+    assert matrix[2].tolist() == [2.0, 2.5]
+
+def test_stack_embeddings_empty():
+    assert stack_embeddings([]).shape == (0, 0)
+
+def test_decode_matrix_rejects_ragged_buffer():
+    with pytest.raises(ValueError):
+        decode_matrix(encode_embedding([1.0, 2.0, 3.0]), dim=2)
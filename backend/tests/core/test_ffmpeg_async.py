@@ -0,0 +1,118 @@
+"""
+Tests for non-blocking ffmpeg runs and the per-host process limit
+"""
+import asyncio
+import os
+import shutil
+import uuid
+
+import ffmpeg
+import pytest
+
+from app.core import ffmpeg_async
+from app.core.ffmpeg_async import HostSlots, run_ffmpeg
+from app.utils.ffmpeg_helpers import extract_frame
+from media_fixtures import make_clip
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+@pytest.fixture(autouse=True)
+def slots(tmp_path, monkeypatch):
+    slots = HostSlots(str(tmp_path / "slots"), 2)
+    monkeypatch.setattr(ffmpeg_async, "host_slots", slots)
+    return slots
+
+
+def endless_encode(marker):
+    """An ffmpeg run that only stops when killed, tagged to find its process."""
+    return (
+        ffmpeg
+        .input("testsrc=size=64x64:rate=25", f="lavfi", re=None)
+        .output("-", f="null", metadata=f"comment={marker}")
+    )
+
+
+def running_with(marker):
+    for pid in os.listdir("/proc"):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if marker.encode() in f.read():
+                    return True
+        except (FileNotFoundError, NotADirectoryError, PermissionError, ProcessLookupError):
+            continue
+    return False
+
+
+@pytest.mark.asyncio
+async def test_slots_cap_concurrent_holders(slots):
+    running = 0
+    peak = 0
+
+    async def hold():
+        nonlocal running, peak
+        async with slots.acquire():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.1)
+            running -= 1
+
+    await asyncio.gather(*(hold() for _ in range(5)))
+
+    assert peak == 2
+
+
+@needs_ffmpeg
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_during_encode(tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 2)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.create_task(tick())
+    await extract_frame(str(source), 1.0, str(tmp_path / "frame.jpg"))
+    ticker.cancel()
+
+    assert (tmp_path / "frame.jpg").stat().st_size > 0
+    assert ticks > 1
+
+
+@needs_ffmpeg
+@pytest.mark.asyncio
+async def test_timeout_kills_the_child():
+    marker = uuid.uuid4().hex
+
+    with pytest.raises(asyncio.TimeoutError):
+        await run_ffmpeg(endless_encode(marker), timeout=0.5)
+
+    assert not running_with(marker)
+
+
+@needs_ffmpeg
+@pytest.mark.asyncio
+async def test_cancellation_kills_the_child_and_frees_its_slot(slots):
+    marker = uuid.uuid4().hex
+    task = asyncio.create_task(run_ffmpeg(endless_encode(marker)))
+    await asyncio.sleep(0.5)
+    assert running_with(marker)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert not running_with(marker)
+    async with slots.acquire(), slots.acquire():
+        pass
+
+
+@needs_ffmpeg
+@pytest.mark.asyncio
+async def test_failed_run_raises_ffmpeg_error(tmp_path):
+    with pytest.raises(ffmpeg.Error):
+        await extract_frame(str(tmp_path / "missing.mp4"), 0, str(tmp_path / "frame.jpg"))
@@ -0,0 +1,97 @@
+"""
+Tests for live ffmpeg progress reporting
+"""
+import shutil
+
+import ffmpeg
+import pytest
+
+from app.core import ffmpeg_progress
+from app.core.ffmpeg_progress import JobProgress, encode_speed, out_seconds, parse_progress
+from media_fixtures import make_clip
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_progress_blocks_are_parsed():
+    lines = [
+        "frame=30", "out_time_us=1000000", "speed=2.5x", "progress=continue",
+        "frame=60", "out_time_us=N/A", "out_time_ms=2000000", "speed=N/A", "progress=end",
+    ]
+
+    blocks = list(parse_progress(lines))
+
+    assert len(blocks) == 2
+    assert out_seconds(blocks[0]) == 1.0
+    assert encode_speed(blocks[0]) == 2.5
+    assert out_seconds(blocks[1]) == 2.0
+    assert encode_speed(blocks[1]) is None
+
+
+def test_updates_are_throttled():
+    clock = FakeClock()
+    sent = []
+    progress = JobProgress(sent.append, total=10, min_interval=0.5, clock=clock)
+
+    progress.update(0, 1)
+    clock.now = 0.2
+    progress.update(0, 2)
+    clock.now = 0.6
+    progress.update(0, 3)
+
+    assert sent == [10.0, 30.0]
+
+
+def test_runs_of_one_job_are_summed():
+    sent = []
+    progress = JobProgress(sent.append, total=4, min_interval=0)
+
+    progress.update(0, 1)
+    progress.update(1, 1)
+    progress.update(0, 2)
+
+    assert sent == [25.0, 50.0, 75.0]
+    assert progress.percent == 75.0
+
+
+def test_failed_publish_does_not_raise():
+    def publish(percent):
+        raise RuntimeError("realtime down")
+
+    JobProgress(publish, total=1, min_interval=0).update(0, 1)
+
+
+@needs_ffmpeg
+def test_run_reports_progress_and_speed(tmp_path, monkeypatch):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 2)
+    speeds = []
+    monkeypatch.setattr(
+        ffmpeg_progress.metrics, "observe",
+        lambda name, value: speeds.append(value) if name == "ffmpeg_encode_speed" else None
+    )
+    sent = []
+    progress = JobProgress(sent.append, min_interval=0)
+
+    with progress.activate():
+        ffmpeg_progress.expect(2.0)
+        ffmpeg_progress.run(
+            ffmpeg.input(str(source)).output(str(tmp_path / "out.mp4"), vcodec="libx264", preset="ultrafast")
+        )
+
+    assert sent and sent[-1] >= 95
+    assert speeds and speeds[0] > 0
+
+
+@needs_ffmpeg
+def test_run_raises_ffmpeg_error(tmp_path):
+    with pytest.raises(ffmpeg.Error):
+        ffmpeg_progress.run(ffmpeg.input(str(tmp_path / "missing.mp4")).output(str(tmp_path / "out.mp4")))
@@ -0,0 +1,56 @@
+"""
+Tests for the sorted-array interval index
+"""
+import numpy as np
+from app.core.interval_index import IntervalIndex
+from app.core.timeline import ProjectTimeline
+
+def test_containing_is_half_open():
+    index = IntervalIndex([0.0, 5.0, 10.0], [5.0, 10.0, 15.0])
+    
+    assert index.containing(5.0).tolist() == [1]
+    assert index.containing(14.9).tolist() == [2]
+    assert index.containing(15.0).tolist() == []
+    assert index.containing(-1.0).tolist() == []
+
+def test_overlapping_returns_original_indices():
+    # Unsorted input with a long interval spanning the others
+    index = IntervalIndex([10.0, 0.0, 2.0, 4.0], [12.0, 20.0, 3.0, 6.0])
+    
+    assert index.overlapping(2.5, 4.5).tolist() == [1, 2, 3]
+    assert index.overlapping(6.0, 10.0).tolist() == [1]
+    assert index.overlapping(20.0, 30.0).tolist() == []
+
+def test_matches_linear_scan():
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(0, 100, 200)
+    ends = starts + rng.uniform(0.1, 5, 200)
+    index = IntervalIndex(starts, ends)
+    
+    for lo in rng.uniform(0, 100, 50):
+        hi = lo + 2.0
+        expected = {i for i in range(200) if starts[i] < hi and ends[i] > lo}
+        assert set(index.overlapping(lo, hi).tolist()) == expected
+
+def test_nearest_boundary():
+    index = IntervalIndex([0.0, 4.0], [4.0, 9.5])
+    
+    assert index.nearest_boundary(4.3) == 4.0
+    assert index.nearest_boundary(8.0) == 9.5
+    assert index.nearest_boundary(6.5, max_distance=1.0) is None
+    assert IntervalIndex([], []).nearest_boundary(1.0) is None
+
+def test_timeline_snaps_to_sentence_and_scene_boundaries():
+    timeline = ProjectTimeline.from_project_data({
+        "transcript": [
+            {"start_time": 0.0, "end_time": 4.0, "text": "a"},
+            {"start_time": 4.0, "end_time": 9.5, "text": "b"},
+        ],
+        "scenes": [{"start_time": 0.0, "end_time": 6.2, "description": "intro"}],
+    })
+    
+    assert timeline.snap(6.0, tolerance=0.5) == 6.2
+    assert timeline.snap(9.2, tolerance=0.5) == 9.5
+    assert timeline.snap(7.5, tolerance=0.5) == 7.5
+    assert timeline.sentence_at(5.0).text == "b"
+    assert timeline.scene_at(7.0) is None
@@ -0,0 +1,37 @@
+"""
+Tests for ingest proxy generation
+"""
+import shutil
+
+import pytest
+
+from app.core.proxy import build_proxy
+from app.core.smart_cut import scan_keyframes
+from media_fixtures import make_clip, media_duration
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+@needs_ffmpeg
+def test_proxy_is_small_short_gop_and_keeps_timeline(tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 6, size="1280x720", gop=90)
+    proxy = tmp_path / "proxy.mp4"
+
+    build_proxy(str(source), str(proxy), height=360, gop_seconds=1.0)
+
+    scan = scan_keyframes(str(proxy))
+    assert scan.has_audio
+    assert scan.keyframes == pytest.approx([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+    assert media_duration(proxy) == pytest.approx(media_duration(source), abs=0.05)
+    assert proxy.stat().st_size < source.stat().st_size
+
+@needs_ffmpeg
+def test_proxy_of_silent_video(tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 2, audio=False)
+    proxy = tmp_path / "proxy.mp4"
+
+    build_proxy(str(source), str(proxy), height=180)
+
+    assert not scan_keyframes(str(proxy)).has_audio
@@ -0,0 +1,96 @@
+"""
+Tests for the render backends behind video_editor.apply_command
+"""
+import shutil
+
+import pytest
+
+from app.core.render_backends import FFmpegBackend, MoviePyBackend, get_render_backend
+from media_fixtures import clip_media_info, make_clip, media_duration
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def args_for(action, media_info=None):
+    media_info = media_info or clip_media_info(10)
+    return FFmpegBackend().build("in.mp4", action, "out.mp4", media_info).get_args()
+
+def filtergraph(args):
+    return args[args.index("-filter_complex") + 1]
+
+def test_backend_is_selected_by_name():
+    assert isinstance(get_render_backend("ffmpeg"), FFmpegBackend)
+    assert isinstance(get_render_backend("moviepy"), MoviePyBackend)
+    
+    with pytest.raises(ValueError):
+        get_render_backend("gstreamer")
+
+def test_unsupported_action_is_rejected():
+    with pytest.raises(ValueError):
+        args_for({"action": "reverse"})
+
+def test_volume_only_reencodes_audio():
+    args = args_for({"action": "volume", "factor": 2.0, "start_sec": 1, "end_sec": 3})
+    
+    assert "volume=2.0:enable=between(t\\,1\\,3)" in filtergraph(args)
+    assert args[args.index("-vcodec") + 1] == "copy"
+
+def test_zoom_within_a_window_overlays_the_crop():
+    graph = filtergraph(args_for({"action": "zoom", "factor": 2.0, "start_sec": 2, "end_sec": 4}))
+    
+    assert "crop=" in graph
+    assert "scale=640:360" in graph
+    assert "overlay=enable=between(t\\,2\\,4)" in graph
+
+def test_caption_defaults_to_a_short_window():
+    graph = filtergraph(args_for({"action": "caption", "text": "Hello", "start_sec": 5}))
+    
+    assert "drawtext=" in graph
+    assert "Hello" in graph
+    assert "between(t\\,5\\,8.0)" in graph
+
+@needs_ffmpeg
+def test_cut_removes_the_range(tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 6)
+    output = tmp_path / "cut.mp4"
+    
+    FFmpegBackend().render(
+        str(source), {"action": "cut", "start_sec": 1, "end_sec": 3}, str(output), clip_media_info(6)
+    )
+    
+    assert media_duration(output) == pytest.approx(4, abs=0.1)
+
+@needs_ffmpeg
+@pytest.mark.parametrize("action", [
+    {"action": "volume", "factor": 0.5},
+    {"action": "zoom", "factor": 1.5, "start_sec": 1, "end_sec": 2},
+])
+def test_render_keeps_duration(tmp_path, action):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 3)
+    output = tmp_path / "out.mp4"
+    
+    FFmpegBackend().render(str(source), action, str(output), clip_media_info(3))
+    
+    assert media_duration(output) == pytest.approx(3, abs=0.1)
+
+def test_moviepy_rejects_actions_it_cannot_render():
+    for action in ({"action": "zoom", "factor": 2.0}, {"action": "caption", "text": "Hi"}):
+        with pytest.raises(ValueError, match="moviepy"):
+            MoviePyBackend().render("in.mp4", action, "out.mp4")
+
+def test_ffmpeg_backend_uses_the_injected_probe(monkeypatch):
+    from app.core import render_backends
+    probed, ran = [], []
+    
+    def probe(path):
+        probed.append(path)
+        return clip_media_info(10)
+    
+    monkeypatch.setattr(render_backends.ffmpeg_progress, "run", ran.append)
+    backend = get_render_backend("ffmpeg", probe=probe)
+    backend.render("in.mp4", {"action": "volume", "factor": 2.0}, "out.mp4")
+    
+    assert probed == ["in.mp4"]
+    assert len(ran) == 1
@@ -0,0 +1,103 @@
+"""
+Tests for compiling operation lists into a single render
+"""
+import shutil
+
+import pytest
+
+from app.core.render_plan import Segment, build_output, compile_plan, is_fusable
+
+
+def op(operation_type, start, end, **parameters):
+    return {
+        "operation_type": operation_type,
+        "start_time": start,
+        "end_time": end,
+        "parameters": parameters
+    }
+
+def test_cut_keeps_only_the_range():
+    plan = compile_plan([op("cut", 10, 20)], 60)
+    
+    assert plan.segments == [Segment(10, 20)]
+    assert plan.output_duration == 10
+
+def test_trim_removes_the_range():
+    plan = compile_plan([op("trim", 10, 20)], 60)
+    
+    assert plan.segments == [Segment(0, 10), Segment(20, 60)]
+
+def test_speed_splits_segments():
+    plan = compile_plan([op("speed", 10, 20, speed_factor=2.0)], 60)
+    
+    assert plan.segments == [Segment(0, 10), Segment(10, 20, 2.0), Segment(20, 60)]
+    assert plan.output_duration == 55
+
+def test_operations_apply_in_order():
+    plan = compile_plan([
+        op("cut", 0, 30),
+        op("trim", 5, 10),
+        op("speed", 20, 40, speed_factor=0.5),
+    ], 60)
+    
+    assert plan.segments == [Segment(0, 5), Segment(10, 20), Segment(20, 30, 0.5)]
+
+def test_neighbours_at_the_same_speed_are_merged():
+    plan = compile_plan([
+        op("speed", 10, 20, speed_factor=2.0),
+        op("speed", 10, 20, speed_factor=0.5),
+    ], 60)
+    
+    assert plan.segments == [Segment(0, 60)]
+
+def test_unknown_operation_is_rejected():
+    assert is_fusable([op("trim", 0, 1), op("speed", 2, 3, speed_factor=2.0)])
+    assert not is_fusable([op("trim", 0, 1), op("caption", 2, 3)])
+    assert not is_fusable([])
+    
+    with pytest.raises(ValueError):
+        compile_plan([op("caption", 0, 1)], 60)
+
+def test_disjoint_cuts_are_not_fused():
+    # Each cut is its own clip; intersecting them would leave nothing
+    cuts = [op("cut", 5, 10), op("cut", 20, 30)]
+    
+    assert not is_fusable(cuts)
+    assert compile_plan(cuts, 60).segments == []
+
+def test_cut_and_speed_are_not_fused():
+    # A cut renders only its range, which a fused plan with a speed
+    # change (which keeps the whole video) would not reproduce
+    assert not is_fusable([op("cut", 0, 30), op("speed", 10, 20, speed_factor=2.0)])
+    assert not is_fusable([op("speed", 10, 20, speed_factor=2.0), op("cut", 0, 30)])
+
+def test_trims_and_speed_fuse_into_the_edited_video():
+    operations = [op("trim", 0, 5), op("speed", 10, 20, speed_factor=2.0), op("trim", 50, 60)]
+    
+    assert is_fusable(operations)
+    assert compile_plan(operations, 60).segments == [
+        Segment(5, 10), Segment(10, 20, 2.0), Segment(20, 50)
+    ]
+
+def test_removing_everything_cannot_be_built():
+    plan = compile_plan([op("trim", 0, 60)], 60)
+    
+    assert plan.segments == []
+    with pytest.raises(ValueError):
+        build_output("in.mp4", plan, "out.mp4")
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_plan_renders_in_one_pass(tmp_path):
+    from media_fixtures import make_clip, media_duration
+    
+    source = tmp_path / "source.mp4"
+    make_clip(source, 12)
+    plan = compile_plan([
+        op("trim", 2, 4),
+        op("speed", 6, 10, speed_factor=2.0),
+    ], 12)
+    output = tmp_path / "plan.mp4"
+    
+    build_output(str(source), plan, str(output)).run(quiet=True)
+    
+    assert media_duration(output) == pytest.approx(plan.output_duration, abs=0.1)
@@ -0,0 +1,56 @@
+"""
+Tests for preview and final render tiers
+"""
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from app.core import chunked_render
+from app.core.config import settings
+from app.core.render_plan import RenderPlan, Segment
+from app.core.render_tiers import FINAL, PREVIEW, EncoderProfile, encoder_profile
+from media_fixtures import make_clip
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def frame_size(path):
+    """Video frame size as (width, height), read from `ffmpeg -i`."""
+    proc = subprocess.run(["ffmpeg", "-hide_banner", "-i", str(path)], capture_output=True, text=True)
+    match = re.search(r"Video: .*?(\d{2,5})x(\d{2,5})", proc.stderr)
+    return int(match.group(1)), int(match.group(2))
+
+
+def test_profiles_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "render_preview_max_height", 360)
+    monkeypatch.setattr(settings, "render_preview_crf", 32)
+    monkeypatch.setattr(settings, "render_final_max_height", 0)
+
+    preview = encoder_profile(PREVIEW)
+    final = encoder_profile(FINAL)
+
+    assert preview.max_height == 360
+    assert preview.video_options == {"preset": settings.render_preview_preset, "crf": 32}
+    assert final.max_height is None
+    assert encoder_profile() == final
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError):
+        encoder_profile("draft")
+
+@needs_ffmpeg
+def test_preview_render_is_scaled_down(tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 2, size="1280x720")
+    plan = RenderPlan([Segment(0.5, 1.5)])
+    preview = EncoderProfile(PREVIEW, max_height=360, preset="ultrafast", crf=35)
+    final = EncoderProfile(FINAL, max_height=None, preset="ultrafast", crf=18)
+
+    chunked_render.render(str(source), plan, str(tmp_path / "preview.mp4"), profile=preview)
+    chunked_render.render(str(source), plan, str(tmp_path / "final.mp4"), profile=final)
+
+    assert frame_size(tmp_path / "preview.mp4") == (640, 360)
+    assert frame_size(tmp_path / "final.mp4") == (1280, 720)
+    assert (tmp_path / "preview.mp4").stat().st_size < (tmp_path / "final.mp4").stat().st_size
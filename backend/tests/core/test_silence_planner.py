@@ -0,0 +1,109 @@
+"""
+Tests for the silence and filler removal planner
+"""
+import numpy as np
+from app.core.render_plan import compile_plan
+from app.core.silence_planner import is_filler, merge_ranges, plan_silence_removal, runs
+from app.core.timeline import ProjectTimeline
+
+FRAME = 0.05
+
+def timeline_with(levels, transcript=(), duration=None):
+    """A timeline with one 50 ms audio frame per level (dBFS)."""
+    return ProjectTimeline.from_project_data({
+        "project": {"duration": duration},
+        "transcript": [
+            {"start_time": start, "end_time": end, "text": text}
+            for start, end, text in transcript
+        ],
+        "audio_features": [
+            {"timestamp": i * FRAME, "duration": FRAME, "rms_db": level}
+            for i, level in enumerate(levels)
+        ],
+    })
+
+def spans(operations):
+    return [(round(op["start_time"], 6), round(op["end_time"], 6)) for op in operations]
+
+def test_runs():
+    first, stop = runs(np.array([True, True, False, True, False, False, True]))
+    
+    assert first.tolist() == [0, 3, 6]
+    assert stop.tolist() == [2, 4, 7]
+
+def test_merge_ranges():
+    starts, ends = merge_ranges(np.array([5.0, 0.0, 1.0, 2.0]), np.array([6.0, 3.0, 1.5, 4.0]))
+    
+    assert starts.tolist() == [0.0, 5.0]
+    assert ends.tolist() == [4.0, 6.0]
+
+def test_long_pauses_are_trimmed_with_padding():
+    # 1 s speech, 1 s pause, 0.3 s speech, 0.2 s pause, 0.5 s speech
+    levels = [-20] * 20 + [-60] * 20 + [-20] * 6 + [-60] * 4 + [-20] * 10
+    
+    operations = plan_silence_removal(
+        timeline_with(levels), threshold_db=-40, min_duration=0.5, padding=0.1
+    )
+    
+    assert spans(operations) == [(1.1, 1.9)]
+    assert operations[0]["operation_type"] == "trim"
+
+def test_trailing_pause_is_clamped_to_the_duration():
+    operations = plan_silence_removal(
+        timeline_with([-20] * 10 + [-60] * 20, duration=1.4),
+        threshold_db=-40, min_duration=0.5, padding=0.0
+    )
+    
+    assert spans(operations) == [(0.5, 1.4)]
+
+def test_fillers_merge_with_adjacent_silence():
+    levels = [-20] * 20 + [-60] * 20 + [-20] * 40
+    transcript = [
+        (0.0, 1.0, "So here we go."),
+        (1.9, 2.4, "Um, uh..."),
+        (2.4, 4.0, "The second take."),
+    ]
+    timeline = timeline_with(levels, transcript)
+    
+    assert spans(plan_silence_removal(timeline, silences=False, fillers=True)) == [(1.9, 2.4)]
+    assert spans(plan_silence_removal(
+        timeline, fillers=True, threshold_db=-40, min_duration=0.5, padding=0.1
+    )) == [(1.1, 2.4)]
+
+def test_is_filler():
+    assert is_filler("Umm... uh")
+    assert not is_filler("um, so the plan")
+    assert not is_filler("")
+
+def test_no_audio_features_plans_nothing():
+    assert plan_silence_removal(timeline_with([])) == []
+
+def test_thousands_of_pauses_compile_to_one_render():
+    # 5000 one-second pauses between one-second phrases
+    levels = np.tile([-20.0] * 20 + [-60.0] * 20, 5000)
+    
+    operations = plan_silence_removal(
+        timeline_with(levels), threshold_db=-40, min_duration=0.5, padding=0.1
+    )
+    plan = compile_plan(operations, len(levels) * FRAME)
+    
+    assert len(operations) == 5000
+    # Phrases keep 0.1 s of each neighbouring pause; the last pause leaves
+    # its leading padding as a segment of its own
+    assert len(plan.segments) == 5001
+    assert abs(plan.output_duration - 5000 * 1.2) < 1e-6
+
+def test_streamed_batches_plan_like_one_load():
+    # Pauses straddle the batch boundaries of the streamed columns
+    levels = np.tile([-20.0] * 7 + [-60.0] * 13, 10)
+    whole = timeline_with(levels)
+    rows = [
+        {"timestamp": i * FRAME, "duration": FRAME, "rms_db": level}
+        for i, level in enumerate(levels)
+    ]
+    streamed = timeline_with([])
+    streamed.set_audio([ProjectTimeline.audio_batch(rows[i:i + 16]) for i in range(0, len(rows), 16)])
+    
+    options = dict(threshold_db=-40, min_duration=0.5, padding=0.1)
+    assert spans(plan_silence_removal(streamed, **options)) == spans(plan_silence_removal(whole, **options))
+    assert len(plan_silence_removal(streamed, **options)) == 10
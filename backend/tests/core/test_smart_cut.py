@@ -0,0 +1,135 @@
+"""
+Tests for the keyframe-aware smart cut engine
+"""
+import shutil
+import subprocess
+
+import pytest
+
+from app.core import smart_cut as smart_cut_module
+from app.core.smart_cut import Piece, boundary_options, plan_pieces, scan_keyframes, smart_cut
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+needs_ffprobe = pytest.mark.skipif(shutil.which("ffprobe") is None, reason="ffprobe not installed")
+
+
+def frame_hashes(path):
+    """Decoded frame hashes of the video stream, in presentation order."""
+    out = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(path), "-map", "0:v",
+         "-fps_mode", "passthrough", "-f", "framemd5", "-"],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return [line.rsplit(",", 1)[1].strip() for line in out.splitlines() if not line.startswith("#")]
+
+def test_interior_gops_are_copied():
+    pieces = plan_pieces(1.5, 7.3, [0.0, 2.0, 4.0, 6.0, 8.0])
+    
+    assert pieces == [
+        Piece(1.5, 2.0, copy=False),
+        Piece(2.0, 6.0, copy=True),
+        Piece(6.0, 7.3, copy=False),
+    ]
+
+def test_keyframe_aligned_edges_are_not_encoded():
+    assert plan_pieces(2.0, 6.0, [0.0, 2.0, 4.0, 6.0]) == [Piece(2.0, 6.0, copy=True)]
+    assert plan_pieces(2.0, None, [0.0, 2.0, 4.0]) == [Piece(2.0, None, copy=True)]
+
+def test_segment_within_one_gop_is_encoded():
+    assert plan_pieces(2.5, 3.5, [0.0, 2.0, 4.0]) == [Piece(2.5, 3.5, copy=False)]
+    assert plan_pieces(1.5, 2.5, [0.0, 2.0, 4.0]) == [Piece(1.5, 2.5, copy=False)]
+
+@needs_ffmpeg
+def test_scan_finds_gop_starts(tmp_path):
+    from media_fixtures import make_clip
+    
+    source = tmp_path / "source.mp4"
+    make_clip(source, 6, gop=60)
+    
+    scan = scan_keyframes(str(source))
+    
+    assert scan.codec == "h264"
+    assert scan.has_audio
+    assert scan.keyframes == [0.0, 2.0, 4.0]
+    assert scan.frame_duration == pytest.approx(1 / 30)
+
+def video_stream(path):
+    """Profile, level, pixel format and time base of the video stream."""
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-of", "default=nw=1",
+         "-show_entries", "stream=profile,level,pix_fmt,time_base", str(path)],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return dict(line.split("=", 1) for line in out.splitlines())
+
+def test_boundary_options_match_the_source_stream():
+    assert boundary_options(
+        "h264", {"profile": "High", "level": 41, "pix_fmt": "yuv420p", "time_base": "1/90000"}
+    ) == {"profile:v": "high", "level": "4.1", "pix_fmt": "yuv420p", "video_track_timescale": 90000}
+    assert boundary_options(
+        "hevc", {"profile": "Main 10", "level": 93, "pix_fmt": "yuv420p10le", "time_base": "1/15360"}
+    ) == {
+        "profile:v": "main10",
+        "x265-params": "level-idc=3.1",
+        "pix_fmt": "yuv420p10le",
+        "video_track_timescale": 15360,
+    }
+
+def test_unmatched_streams_get_no_boundary_options():
+    stream = {"profile": "High", "level": 41, "pix_fmt": "yuv420p", "time_base": "1/90000"}
+    
+    assert boundary_options("h264", dict(stream, profile="High 10 Intra")) is None
+    assert boundary_options("h264", dict(stream, level=-99)) is None
+    assert boundary_options("h264", dict(stream, time_base=None)) is None
+    assert boundary_options("h264", {}) is None
+
+@needs_ffmpeg
+@needs_ffprobe
+def test_smart_cut_is_frame_accurate(tmp_path):
+    from media_fixtures import make_clip
+    
+    source = tmp_path / "source.mp4"
+    make_clip(source, 10, rate=30, gop=60)
+    output = tmp_path / "cut.mp4"
+    
+    pieces = smart_cut(str(source), [(0, 2.5), (4.2, None)], str(output))
+    
+    original = frame_hashes(source)
+    result = frame_hashes(output)
+    # 0-2.5s and 4.2-10s at 30 fps
+    assert len(result) == 75 + 174
+    # Whole GOPs come through bit-exact
+    assert [p for p in pieces if p.copy] == [Piece(0.0, 2.0, copy=True), Piece(6.0, None, copy=True)]
+    assert result[:60] == original[:60]
+    assert result[-120:] == original[-120:]
+
+@needs_ffmpeg
+@needs_ffprobe
+def test_boundary_pieces_match_the_source(tmp_path):
+    from media_fixtures import make_clip
+    
+    source = tmp_path / "source.mp4"
+    make_clip(source, 4, rate=30, gop=60)
+    output = tmp_path / "cut.mp4"
+    
+    # The output starts with a re-encoded piece, so its stream parameters
+    # are the boundary encoder's
+    pieces = smart_cut(str(source), [(1.0, None)], str(output))
+    
+    assert pieces[0] == Piece(1.0, 2.0, copy=False)
+    assert video_stream(output) == video_stream(source)
+    assert len(frame_hashes(output)) == 90
+
+@needs_ffmpeg
+def test_unmatched_source_is_encoded_throughout(tmp_path, monkeypatch):
+    from media_fixtures import make_clip
+    
+    source = tmp_path / "source.mp4"
+    make_clip(source, 4, rate=30, gop=60)
+    output = tmp_path / "cut.mp4"
+    monkeypatch.setattr(smart_cut_module, "probe_video_format", lambda source, input_options: {})
+    
+    pieces = smart_cut(str(source), [(1.0, None)], str(output))
+    
+    assert pieces == [Piece(1.0, None, copy=False)]
+    assert len(frame_hashes(output)) == 90
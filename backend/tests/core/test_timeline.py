@@ -0,0 +1,94 @@
+"""
+Tests for the columnar ProjectTimeline
+"""
+import numpy as np
+import pytest
+from app.core.embedding_codec import encode_embedding
+from app.core.timeline import ProjectTimeline
+
+@pytest.fixture
+def project_data():
+    return {
+        "project": {"duration": 30.0},
+        "transcript": [
+            {"start_time": 0.0, "end_time": 4.0, "text": "hello world",
+             "embedding_f32": encode_embedding([1.0, 0.0])},
+            {"start_time": 4.0, "end_time": 9.5, "text": "the sunset scene",
+             "embedding_f32": encode_embedding([0.0, 1.0])},
+        ],
+        "scenes": [{"start_time": 0.0, "end_time": 9.5, "description": "beach"}],
+        "clips": [{"start_time": 1.0, "end_time": 2.5}],
+        "audio_features": [
+            {"timestamp": 0.0, "rms_db": -20.0, "is_silent": False},
+            {"timestamp": 0.5, "rms_db": -60.0, "is_silent": True},
+        ],
+    }
+
+def test_columns_are_numpy_arrays(project_data):
+    timeline = ProjectTimeline.from_project_data(project_data)
+    
+    assert timeline.transcript_start.tolist() == [0.0, 4.0]
+    assert timeline.transcript_end.dtype == np.float64
+    assert timeline.embeddings.shape == (2, 2)
+    assert timeline.audio["is_silent"].dtype == bool
+    assert timeline.duration == 30.0
+
+def test_audio_columns_cover_fields_missing_from_some_rows():
+    timeline = ProjectTimeline.from_project_data({
+        "audio_features": [
+            {"timestamp": 0.0, "rms_db": None, "is_silent": False, "label": "a"},
+            {"timestamp": 0.5, "rms_db": -60.0, "is_silent": True, "peak_db": -55.0},
+            {"timestamp": 1.0, "rms_db": -20.0, "is_silent": None},
+        ],
+    })
+    audio = timeline.audio
+    
+    assert set(audio) == {"rms_db", "is_silent", "peak_db"}
+    assert np.isnan(audio["rms_db"][0]) and audio["rms_db"][1:].tolist() == [-60.0, -20.0]
+    assert audio["is_silent"].dtype == np.float64
+    assert audio["is_silent"][:2].tolist() == [0.0, 1.0] and np.isnan(audio["is_silent"][2])
+    assert np.isnan(audio["peak_db"][[0, 2]]).all() and audio["peak_db"][1] == -55.0
+
+def test_audio_batches_with_different_fields_are_joined():
+    timeline = ProjectTimeline.from_project_data({})
+    
+    timeline.set_audio([
+        ProjectTimeline.audio_batch([{"timestamp": 0.0, "rms_db": -20.0}]),
+        ProjectTimeline.audio_batch([{"timestamp": 0.5, "rms_db": -60.0, "peak_db": -55.0}]),
+    ])
+    
+    assert timeline.audio["rms_db"].tolist() == [-20.0, -60.0]
+    assert np.isnan(timeline.audio["peak_db"][0]) and timeline.audio["peak_db"][1] == -55.0
+
+def test_row_views_match_dict_fields(project_data):
+    timeline = ProjectTimeline.from_project_data(project_data)
+    row = timeline.transcript[1]
+    
+    assert (row.start_time, row.end_time, row.text) == (4.0, 9.5, "the sunset scene")
+    assert row.embedding.tolist() == [0.0, 1.0]
+    assert timeline.scenes[0].description == "beach"
+    with pytest.raises(AttributeError):
+        row.extra = 1
+
+def test_text_is_interned(project_data):
+    project_data["transcript"][1]["text"] = "".join(["hello", " world"])
+    timeline = ProjectTimeline.from_project_data(project_data)
+    
+    assert timeline.transcript_text[0] is timeline.transcript_text[1]
+
+def test_similarities_and_context(project_data):
+    timeline = ProjectTimeline.from_project_data(project_data)
+    
+    assert int(np.argmax(timeline.similarities(np.array([0.1, 0.9])))) == 1
+    assert timeline.clips_summary() == "1. 1.00s - 2.50s\n"
+    assert timeline.audio_mask("rms_db", below=-40.0).tolist() == [False, True]
+
+def test_missing_embeddings():
+    timeline = ProjectTimeline.from_project_data({
+        "transcript": [{"start_time": 0.0, "end_time": 1.0, "text": "hi"}]
+    })
+    
+    assert timeline.embeddings is None
+    assert len(timeline.scene_start) == 0
+    with pytest.raises(ValueError):
+        timeline.similarities(np.ones(2))
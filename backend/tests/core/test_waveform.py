@@ -0,0 +1,81 @@
+"""
+Tests for the waveform peak pyramid
+"""
+import shutil
+
+import numpy as np
+import pytest
+
+from app.core.audio_features import extract_features
+from app.core.waveform import PeakPyramidBuilder, bucket_range
+from media_fixtures import make_tone_then_silence
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(7)
+    return rng.integers(-32768, 32768, size=10_000, dtype=np.int16)
+
+
+def reference(samples, samples_per_bucket):
+    """Direct min/max per bucket, the last bucket partial."""
+    starts = np.arange(0, len(samples), samples_per_bucket)
+    return np.stack((np.minimum.reduceat(samples, starts), np.maximum.reduceat(samples, starts)), axis=1)
+
+
+def test_levels_match_a_direct_reduction(samples):
+    builder = PeakPyramidBuilder([256, 1024, 4096], bits=16)
+    # Blocks that do not line up with buckets
+    for block in np.array_split(samples, [100, 1000, 1001, 7777]):
+        builder.add(block)
+
+    pyramid = builder.finish()
+
+    assert sorted(pyramid) == [256, 1024, 4096]
+    for level, peaks in pyramid.items():
+        assert len(peaks) == -(-len(samples) // level)
+        assert np.array_equal(peaks, reference(samples, level))
+
+
+def test_8_bit_peaks_keep_the_top_byte():
+    builder = PeakPyramidBuilder([4], bits=8)
+    builder.add(np.array([-32768, 32767, -256, 255, 0, 0], dtype=np.int16))
+
+    peaks = builder.finish()[4]
+
+    assert peaks.dtype == np.int8
+    assert peaks.tolist() == [[-128, 127], [0, 0]]
+    assert peaks.tobytes() == bytes([0x80, 0x7F, 0, 0])
+
+
+def test_levels_must_nest():
+    with pytest.raises(ValueError):
+        PeakPyramidBuilder([256, 1000])
+    with pytest.raises(ValueError):
+        PeakPyramidBuilder([256], bits=12)
+
+
+def test_bucket_range():
+    # 16 kHz at 1024 samples per bucket: 15.625 buckets per second
+    assert bucket_range(2.0, 4.0, 16000, 1024, 100) == (31, 32)
+    assert bucket_range(5.0, None, 16000, 1024, 100) == (78, 22)
+    assert bucket_range(10.0, 20.0, 16000, 1024, 100) == (100, 0)
+
+
+@needs_ffmpeg
+def test_peaks_share_the_feature_decode(tmp_path):
+    path = tmp_path / "audio.wav"
+    make_tone_then_silence(path, 2, 1)
+    builder = PeakPyramidBuilder([256, 1024], bits=16)
+
+    frames = sum(len(block) for block in extract_features(str(path), block_frames=7, tap=builder.add))
+    pyramid = builder.finish()
+
+    # 3 s at 16 kHz
+    assert frames == 60
+    assert len(pyramid[256]) == -(-48000 // 256)
+    # A tone peaking at 1/16 of full scale, then digital silence
+    assert abs(int(pyramid[1024][0, 1]) - 2048) < 100
+    assert pyramid[1024][-1].tolist() == [0, 0]
@@ -0,0 +1,72 @@
+"""
+Generated media for tests and benchmarks (requires the ffmpeg binary)
+"""
+import subprocess
+
+
+def make_clip(path, seconds, size="640x360", rate=30, gop=30, audio=True, faststart=True):
+    """
+    Generate an H.264/AAC test clip.
+    
+    Args:
+        path: Output file
+        seconds: Clip length
+        size: Frame size as WxH
+        rate: Frame rate
+        gop: Keyframe interval in frames
+        audio: Include a sine-tone audio track
+        faststart: Put the container index at the front of the file
+    """
+    cmd = [
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={rate}:duration={seconds}",
+    ]
+    if audio:
+        cmd += ["-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={seconds}"]
+    cmd += ["-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-g", str(gop)]
+    if audio:
+        cmd += ["-c:a", "aac", "-shortest"]
+    if faststart:
+        cmd += ["-movflags", "+faststart"]
+    cmd.append(str(path))
+    subprocess.run(cmd, check=True)
+
+
+def media_duration(path):
+    """Container duration in seconds, read from `ffmpeg -i` (no ffprobe needed)."""
+    proc = subprocess.run(["ffmpeg", "-hide_banner", "-i", str(path)], capture_output=True, text=True)
+    for line in proc.stderr.splitlines():
+        line = line.strip()
+        if line.startswith("Duration:"):
+            hours, minutes, seconds = line.split(",")[0].split()[1].split(":")
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    raise ValueError(f"No duration reported for {path}")
+
+
+def clip_media_info(seconds, size="640x360", audio=True):
+    """ffprobe-shaped media info for a clip made by make_clip."""
+    width, height = (int(n) for n in size.split("x"))
+    streams = [{"codec_type": "video", "width": width, "height": height}]
+    if audio:
+        streams.append({"codec_type": "audio"})
+    return {"format": {"duration": str(seconds)}, "streams": streams}
+
+
+def make_tone_then_silence(path, tone_seconds, silence_seconds):
+    """
+    Generate a mono WAV file: a 440 Hz tone followed by digital silence.
+    
+    The tone peaks at 1/16 of full scale (lavfi's 1/8, halved).
+    
+    Args:
+        path: Output file
+        tone_seconds: Length of the tone
+        silence_seconds: Length of the silence after it
+    """
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={tone_seconds}",
+        "-f", "lavfi", "-i", f"anullsrc=r=48000:cl=mono:d={silence_seconds}",
+        "-filter_complex", "[0:a]volume=0.5[t];[t][1:a]concat=n=2:v=0:a=1",
+        str(path),
+    ], check=True)
@@ -0,0 +1,271 @@
+"""
+Local HTTP stand-in for Supabase Storage, used by tests and benchmarks
+"""
+import os
+import re
+import io
+import json
+import base64
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SIGN_PATH = re.compile(r"^/storage/v1/object/sign/(?P<bucket>[^/]+)/(?P<path>[^?]+)(?:\?token=(?P<token>.*))?$")
+COPY_PATH = "/storage/v1/object/copy"
+OBJECT_PATH = re.compile(r"^/storage/v1/object/(?P<bucket>[^/]+)/(?P<path>.+)$")
+RESUMABLE_PATH = re.compile(r"^/storage/v1/upload/resumable(?:/(?P<upload_id>[^/]+))?$")
+REST_PATH = re.compile(r"^/rest/v1/(?P<table>[^/?]+)")
+RANGE = re.compile(r"bytes=(?P<start>\d+)-(?P<end>\d*)")
+
+
+class StorageStandIn:
+    """
+    Minimal Supabase Storage server backed by a directory.
+
+    Supports authenticated object GET (with byte ranges), signed URLs, POST
+    uploads, copies and the TUS resumable upload endpoints, plus PostgREST-style inserts that
+    are recorded in `rows`. Counts the bytes it serves and the connections
+    it accepts so tests can assert how much was transferred and reused.
+    """
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.bytes_served = 0
+        self.requests = []
+        self.uploads = {}
+        self.signed = {}
+        self.fail_next_patch = False
+        self.fail_next_head = False
+        self.omit_upload_offset = False
+        self.rows = {}
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def object_file(self, bucket, path):
+        full = os.path.join(self.root, bucket, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        return full
+
+    def put_object(self, bucket, path, data):
+        with open(self.object_file(bucket, path), "wb") as f:
+            f.write(data)
+
+    def get_object(self, bucket, path):
+        with open(self.object_file(bucket, path), "rb") as f:
+            return f.read()
+
+
+def make_handler(store):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            # Small send buffer so bytes_served tracks what the client
+            # actually read, not what the kernel buffered before a seek
+            self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+            with store.lock:
+                store.connections += 1
+            super().setup()
+
+        def _reply(self, status, headers=None, body=b""):
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _read_body_to(self, f):
+            remaining = int(self.headers.get("Content-Length", 0))
+            while remaining:
+                chunk = self.rfile.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+
+        def do_HEAD(self):
+            self._dispatch()
+
+        def do_GET(self):
+            self._dispatch()
+
+        def do_POST(self):
+            self._dispatch()
+
+        def do_PATCH(self):
+            self._dispatch()
+
+        def _dispatch(self):
+            store.requests.append((self.command, self.path, dict(self.headers)))
+            if m := SIGN_PATH.match(self.path):
+                return self._signed(m["bucket"], m["path"], m["token"])
+            if self.headers.get("Authorization") is None:
+                return self._reply(401)
+
+            if self.path == COPY_PATH and self.command == "POST":
+                return self._copy()
+            if m := OBJECT_PATH.match(self.path):
+                return self._object(m["bucket"], m["path"])
+            if m := RESUMABLE_PATH.match(self.path):
+                return self._resumable(m["upload_id"])
+            if (m := REST_PATH.match(self.path)) and self.command == "POST":
+                return self._insert(m["table"])
+            return self._reply(404)
+
+        def _insert(self, table):
+            body = io.BytesIO()
+            self._read_body_to(body)
+            rows = json.loads(body.getvalue() or b"[]")
+            rows = rows if isinstance(rows, list) else [rows]
+            with store.lock:
+                store.rows.setdefault(table, []).extend(rows)
+            return self._reply(201, {"Content-Type": "application/json"}, json.dumps(rows).encode())
+
+        def _copy(self):
+            body = io.BytesIO()
+            self._read_body_to(body)
+            request = json.loads(body.getvalue())
+            source = store.object_file(request["bucketId"], request["sourceKey"])
+            destination = store.object_file(request["bucketId"], request["destinationKey"])
+            if not os.path.exists(source):
+                return self._reply(404)
+            if os.path.exists(destination):
+                return self._reply(400)
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                dst.write(src.read())
+            return self._reply(200, {"Content-Type": "application/json"}, b'{"Key": "ok"}')
+
+        def _signed(self, bucket, path, token):
+            if self.command == "POST":
+                if self.headers.get("Authorization") is None:
+                    return self._reply(401)
+                self._read_body_to(io.BytesIO())
+                token = uuid.uuid4().hex
+                store.signed[token] = (bucket, path)
+                body = json.dumps({"signedURL": f"/object/sign/{bucket}/{path}?token={token}"})
+                return self._reply(200, {"Content-Type": "application/json"}, body.encode())
+            if store.signed.get(token) != (bucket, path) or self.command not in ("GET", "HEAD"):
+                return self._reply(400)
+            return self._object(bucket, path)
+
+        def _object(self, bucket, path):
+            full = store.object_file(bucket, path)
+
+            if self.command == "POST":
+                if os.path.exists(full) and self.headers.get("x-upsert") != "true":
+                    with open(os.devnull, "wb") as sink:
+                        self._read_body_to(sink)
+                    return self._reply(409)
+                with open(full, "wb") as f:
+                    self._read_body_to(f)
+                return self._reply(200, body=b'{"Key": "ok"}')
+
+            if not os.path.exists(full):
+                return self._reply(404)
+
+            size = os.path.getsize(full)
+            start, end, status = 0, size - 1, 200
+            if m := RANGE.match(self.headers.get("Range", "")):
+                start = int(m["start"])
+                end = min(int(m["end"]) if m["end"] else size - 1, size - 1)
+                status = 206
+
+            self.send_response(status)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(end - start + 1))
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if self.command == "HEAD":
+                return
+
+            with open(full, "rb") as f:
+                f.seek(start)
+                remaining = end - start + 1
+                try:
+                    while remaining:
+                        chunk = f.read(min(remaining, 64 * 1024))
+                        self.wfile.write(chunk)
+                        remaining -= len(chunk)
+                        with store.lock:
+                            store.bytes_served += len(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        def _resumable(self, upload_id):
+            if self.command == "POST" and upload_id is None:
+                meta = {}
+                for item in self.headers.get("Upload-Metadata", "").split(","):
+                    key, _, value = item.partition(" ")
+                    meta[key] = base64.b64decode(value).decode()
+                upload_id = uuid.uuid4().hex
+                store.uploads[upload_id] = {
+                    "length": int(self.headers["Upload-Length"]),
+                    "offset": 0,
+                    "file": store.object_file(meta["bucketName"], meta["objectName"]),
+                }
+                open(store.uploads[upload_id]["file"], "wb").close()
+                return self._reply(201, {
+                    "Location": f"/storage/v1/upload/resumable/{upload_id}",
+                    "Tus-Resumable": "1.0.0",
+                })
+
+            upload = store.uploads.get(upload_id)
+            if upload is None:
+                return self._reply(404)
+
+            if self.command == "HEAD":
+                if store.fail_next_head:
+                    store.fail_next_head = False
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+                    return
+                if store.omit_upload_offset:
+                    return self._reply(200)
+                return self._reply(200, {"Upload-Offset": str(upload["offset"])})
+
+            if self.command == "PATCH":
+                if int(self.headers["Upload-Offset"]) != upload["offset"]:
+                    return self._reply(409)
+                with open(upload["file"], "r+b") as f:
+                    f.seek(upload["offset"])
+                    if store.fail_next_patch:
+                        # Accept half the part, then drop the connection
+                        store.fail_next_patch = False
+                        half = int(self.headers["Content-Length"]) // 2
+                        f.write(self.rfile.read(half))
+                        upload["offset"] += half
+                        self.close_connection = True
+                        self.connection.shutdown(2)
+                        return
+                    before = f.tell()
+                    self._read_body_to(f)
+                    upload["offset"] += f.tell() - before
+                return self._reply(204, {"Upload-Offset": str(upload["offset"])})
+
+            return self._reply(405)
+
+    return Handler
+
+
+@contextmanager
+def serve(root):
+    """Run a storage stand-in on a random local port until the block exits."""
+    store = StorageStandIn(root)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(store))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    store.url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield store
+    finally:
+        server.shutdown()
+        server.server_close()
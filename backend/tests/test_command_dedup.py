@@ -0,0 +1,144 @@
+"""
+Tests for attaching retried commands to the job already rendering them
+"""
+from itertools import count
+
+import pytest
+from starlette.requests import Request
+
+command = pytest.importorskip("app.routers.command")
+
+from app.core.config import settings
+from app.services import job_queues
+from app.services.job_queues import INTERACTIVE, close_operations
+
+
+class FakeRedis:
+    """Keys and sets, as the job dedup uses them."""
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them together on execute."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.ops.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        values = self.redis.values
+        results = []
+        for name, args, kwargs in self.ops:
+            if name == "set":
+                results.append(self.redis.set(*args, **kwargs))
+            elif name == "sadd":
+                values.setdefault(args[0], set()).update(args[1:])
+                results.append(len(args) - 1)
+            elif name == "smembers":
+                results.append(set(values.get(args[0], set())))
+            elif name == "exists":
+                results.append(int(args[0] in values))
+            elif name == "delete":
+                results.append(sum(values.pop(key, None) is not None for key in args))
+            else:
+                results.append(True)
+        return results
+
+
+class FakeJob:
+    def __init__(self, status):
+        self.status = status
+
+    def get_status(self):
+        return self.status
+
+
+class FakeQueue:
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.enqueued = []
+
+    def enqueue(self, func, data, job_id, **options):
+        self.enqueued.append((job_id, data))
+        self.jobs[job_id] = FakeJob("queued")
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    jobs = {}
+    queue = FakeQueue(jobs)
+    redis = FakeRedis()
+    monkeypatch.setattr(job_queues, "redis_conn", redis)
+    monkeypatch.setattr(job_queues, "queues", {INTERACTIVE: queue})
+    monkeypatch.setattr(job_queues, "_fetch_job", jobs.get)
+    monkeypatch.setattr(job_queues.metrics, "incr", lambda *args: None)
+    monkeypatch.setattr(settings, "job_dedup_window", 600)
+    monkeypatch.setattr(settings, "render_final_auto", False)
+    monkeypatch.setattr(command.limiter, "enabled", False)
+
+    ids = count(1)
+
+    async def process_command(project_id, command_text, user_id):
+        # Every command stores new clip rows
+        operation_ids = [f"op{next(ids)}"]
+        return {
+            "operation_ids": operation_ids,
+            "operations": [{
+                "operation_type": "cut",
+                "start_time": 1.0,
+                "end_time": 4.0,
+                "parameters": {}
+            }]
+        }
+
+    monkeypatch.setattr(command, "process_command", process_command)
+    return queue
+
+
+def request():
+    return Request({"type": "http", "method": "POST", "path": "/command/", "headers": []})
+
+
+@pytest.mark.asyncio
+async def test_retried_command_attaches_to_the_running_job(queued):
+    body = {"project_id": "p1", "command_text": "keep 1s to 4s"}
+
+    first = await command.execute_command(request(), dict(body), user_id="u1")
+    retry = await command.execute_command(request(), dict(body), user_id="u1")
+
+    job_id = first["operations"][0]["job_id"]
+    assert retry["operations"][0]["job_id"] == job_id
+    assert [enqueued for enqueued, _ in queued.enqueued] == [job_id]
+    # The job writes its result to the clip rows of both commands
+    assert close_operations(job_id, ["op1"]) == ["op1", "op2"]
+
+
+@pytest.mark.asyncio
+async def test_command_after_the_job_wrote_its_result_runs_again(queued):
+    body = {"project_id": "p1", "command_text": "keep 1s to 4s"}
+
+    first = await command.execute_command(request(), dict(body), user_id="u1")
+    job_id = first["operations"][0]["job_id"]
+    close_operations(job_id, ["op1"])
+    retry = await command.execute_command(request(), dict(body), user_id="u1")
+
+    assert retry["operations"][0]["job_id"] == job_id
+    assert [data["operation_id"] for _, data in queued.enqueued] == ["op1", "op2"]
+    assert close_operations(job_id, ["op2"]) == ["op2"]
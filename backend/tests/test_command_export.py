@@ -0,0 +1,73 @@
+"""
+Tests for queueing the full-quality render of a processed command
+"""
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+command = pytest.importorskip("app.routers.command")
+
+from app.core.render_tiers import FINAL
+from app.services.job_queues import EXPORT
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    calls = []
+    stored = {
+        "op1": {"operation_type": "trim", "start_time": 1.0, "end_time": 2.0, "parameters": {}},
+        "op2": {"operation_type": "speed", "start_time": 4.0, "end_time": 6.0,
+                "parameters": {"speed_factor": 2.0}},
+        "op3": {"operation_type": "cut", "start_time": 0.0, "end_time": 3.0, "parameters": {}},
+    }
+
+    async def load_operations(project_id, operation_ids, user_id):
+        return [dict(stored[op_id]) for op_id in operation_ids if op_id in stored]
+
+    async def enqueue_task(task_type, data, queue_name=None, user_id=None, key=None, operation_ids=None):
+        calls.append((task_type, data, queue_name, operation_ids))
+        return f"job-{len(calls)}"
+
+    monkeypatch.setattr(command, "load_operations", load_operations)
+    monkeypatch.setattr(command, "enqueue_task", enqueue_task)
+    monkeypatch.setattr(command.limiter, "enabled", False)
+    return calls
+
+
+def request():
+    return Request({"type": "http", "method": "POST", "path": "/command/export", "headers": []})
+
+
+@pytest.mark.asyncio
+async def test_export_queues_the_final_tier_on_the_export_queue(enqueued):
+    body = {"project_id": "p1", "operation_ids": ["op1", "op2"]}
+
+    response = await command.export_command(request(), body, user_id="u1")
+
+    [(task_type, data, queue_name, operation_ids)] = enqueued
+    assert task_type == "process_plan"
+    assert queue_name == EXPORT
+    assert data["render_tier"] == FINAL and data["follows_preview"]
+    assert operation_ids == ["op1", "op2"]
+    assert [op["final_job_id"] for op in response["operations"]] == ["job-1", "job-1"]
+
+
+@pytest.mark.asyncio
+async def test_export_of_a_single_cut_renders_the_clip(enqueued):
+    await command.export_command(request(), {"project_id": "p1", "operation_ids": ["op3"]}, user_id="u1")
+
+    [(task_type, data, queue_name, _)] = enqueued
+    assert task_type == "process_clip"
+    assert data["operation_id"] == "op3" and data["render_tier"] == FINAL
+    assert queue_name == EXPORT
+
+
+@pytest.mark.asyncio
+async def test_export_of_unknown_operations_is_rejected(enqueued):
+    with pytest.raises(HTTPException) as error:
+        await command.export_command(
+            request(), {"project_id": "p1", "operation_ids": ["op1", "nope"]}, user_id="u1"
+        )
+
+    assert error.value.status_code == 400
+    assert enqueued == []
@@ -0,0 +1,140 @@
+"""
+Tests for read/write routing in the Database layer
+"""
+import os
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db import Database, mark_write
+
+
+class FakeConnection:
+    def __init__(self, name: str, lag: float = 0.0):
+        self.name = name
+        self.lag = lag
+        self.readonly_transactions = 0
+
+    async def fetchval(self, query, *args):
+        return self.lag
+
+    @asynccontextmanager
+    async def _transaction(self):
+        self.readonly_transactions += 1
+        yield
+
+    def transaction(self, readonly: bool = False):
+        assert readonly
+        return self._transaction()
+
+
+class FakePool:
+    def __init__(self, name: str, lag: float = 0.0):
+        self.conn = FakeConnection(name, lag)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+    async def close(self):
+        pass
+
+
+def make_db(*replica_lags: float) -> Database:
+    database = Database(
+        replica_dsns=[],
+        read_after_write_window=5.0,
+        max_replica_lag=1.0,
+        lag_check_interval=60.0
+    )
+    database.pool = FakePool("primary")
+    database.replica_pools = [
+        FakePool(f"replica{i}", lag) for i, lag in enumerate(replica_lags)
+    ]
+    database.replica_dsns = [f"replica{i}" for i in range(len(replica_lags))]
+    database._replica_cycle = iter(
+        [i % len(replica_lags) for i in range(100)] if replica_lags else []
+    )
+    return database
+
+
+async def _read_from(database: Database) -> str:
+    async with database.read_connection() as conn:
+        assert conn.readonly_transactions > 0
+        return conn.name
+
+
+@pytest.mark.asyncio
+async def test_reads_without_replicas_use_primary():
+    database = make_db()
+    assert await _read_from(database) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_across_replicas():
+    database = make_db(0.0, 0.0)
+    names = [await asyncio.create_task(_read_from(database)) for _ in range(4)]
+    assert names == ["replica0", "replica1", "replica0", "replica1"]
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_goes_to_primary():
+    database = make_db(0.0)
+
+    async def request():
+        async with database.connection():
+            pass
+        return await _read_from(database)
+
+    assert await asyncio.create_task(request()) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_write_in_another_request_does_not_pin_primary():
+    database = make_db(0.0)
+    contextvars.copy_context().run(mark_write)
+    assert await asyncio.create_task(_read_from(database)) == "replica0"
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_is_skipped():
+    database = make_db(30.0, 0.0)
+    assert await _read_from(database) == "replica1"
+
+    database = make_db(30.0)
+    assert await _read_from(database) == "primary"
+
+
+@pytest.mark.skipif(
+    not (os.getenv("TEST_PRIMARY_DSN") and os.getenv("TEST_REPLICA_DSN")),
+    reason="Set TEST_PRIMARY_DSN and TEST_REPLICA_DSN to two local Postgres instances"
+)
+@pytest.mark.asyncio
+async def test_routing_against_two_local_instances():
+    database = Database(
+        dsn=os.environ["TEST_PRIMARY_DSN"],
+        replica_dsns=[os.environ["TEST_REPLICA_DSN"]]
+    )
+    port_query = "SELECT current_setting('port')"
+
+    async def request():
+        async with database.connection() as conn:
+            primary_port = await conn.fetchval(port_query)
+        async with database.read_connection() as conn:
+            after_write_port = await conn.fetchval(port_query)
+        return primary_port, after_write_port
+
+    async def read_only_request():
+        async with database.read_connection() as conn:
+            return await conn.fetchval(port_query)
+
+    try:
+        primary_port, after_write_port = await asyncio.create_task(request())
+        replica_port = await asyncio.create_task(read_only_request())
+    finally:
+        await database.disconnect()
+
+    assert after_write_port == primary_port
+    assert replica_port != primary_port
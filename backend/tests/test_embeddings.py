@@ -0,0 +1,87 @@
+"""
+Tests for stored transcript embeddings
+"""
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.services.embeddings import backfill_embedding_column, fetch_embedding_matrix
+
+
+class FakeConnection:
+    """Keeps transcripts rows in memory and answers the embedding queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch(self, query, project_id, last_id, limit):
+        pending = sorted(
+            (r for r in self.rows if r["embedding_f32"] is None
+             and (project_id is None or r["project_id"] == project_id)
+             and (last_id is None or r["id"] > last_id)),
+            key=lambda r: r["id"]
+        )
+        return pending[:limit]
+
+    async def executemany(self, query, records):
+        for row_id, blob in records:
+            next(r for r in self.rows if r["id"] == row_id)["embedding_f32"] = blob
+
+    async def fetchrow(self, query, project_id):
+        rows = sorted(
+            (r for r in self.rows if r["project_id"] == project_id and r["embedding_f32"]),
+            key=lambda r: (r["start_time"], r["id"])
+        )
+        if not rows:
+            return {"ids": None, "matrix": None}
+        return {"ids": [r["id"] for r in rows], "matrix": b"".join(r["embedding_f32"] for r in rows)}
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection([
+        {"id": i, "project_id": "p1" if i < 5 else "p2", "start_time": 10.0 - i,
+         "text": f"sentence {i}", "embedding_f32": None}
+        for i in range(7)
+    ])
+
+    @asynccontextmanager
+    async def connection():
+        yield conn
+
+    monkeypatch.setattr(embeddings.db, "connection", connection)
+    monkeypatch.setattr(embeddings.db, "read_connection", connection)
+    return conn
+
+
+def fake_encode(texts):
+    return np.array([[float(t.split()[-1]), 1.0] for t in texts])
+
+
+@pytest.mark.asyncio
+async def test_backfill_embeds_one_project_in_batches(conn):
+    assert await backfill_embedding_column(fake_encode, "p1", batch_size=2) == 5
+    
+    assert all(r["embedding_f32"] for r in conn.rows if r["project_id"] == "p1")
+    assert not any(r["embedding_f32"] for r in conn.rows if r["project_id"] == "p2")
+    assert await backfill_embedding_column(fake_encode, "p1") == 0
+
+
+@pytest.mark.asyncio
+async def test_matrix_is_in_transcript_order(conn):
+    ids, matrix = await fetch_embedding_matrix("p1")
+    assert ids == [] and matrix.size == 0
+    
+    await backfill_embedding_column(fake_encode, "p1")
+    
+    ids, matrix = await fetch_embedding_matrix("p1")
+    
+    assert ids == [4, 3, 2, 1, 0]
+    assert matrix.dtype == np.float32 and matrix.shape == (5, 2)
+    assert matrix[:, 0].tolist() == [4.0, 3.0, 2.0, 1.0, 0.0]
@@ -0,0 +1,192 @@
+"""
+Tests for priority queues, fair-share scheduling and job deduplication
+"""
+import random
+from collections import Counter
+
+import pytest
+from rq.job import JobStatus
+
+from app.core.config import settings
+from app.services import job_queues
+from app.services.job_queues import (
+    BACKFILL,
+    EXPORT,
+    INTERACTIVE,
+    QUEUE_NAMES,
+    THUMBNAILS,
+    FairShare,
+    enqueue_job,
+    job_id_for,
+    queue_for,
+    weighted_order,
+)
+
+
+class FakeRedis:
+    """Counters with the pipeline API FairShare uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self._ops = []
+
+    def pipeline(self):
+        self._ops = []
+        return self
+
+    def incr(self, key):
+        self._ops.append(("incr", key))
+        return self
+
+    def expire(self, key, ttl):
+        self._ops.append(("expire", key, ttl))
+        return self
+
+    def execute(self):
+        results = []
+        for op in self._ops:
+            if op[0] == "incr":
+                self.values[op[1]] = self.values.get(op[1], 0) + 1
+                results.append(self.values[op[1]])
+            else:
+                self.ttls[op[1]] = op[2]
+                results.append(True)
+        return results
+
+    def decr(self, key):
+        self.values[key] = self.values.get(key, 0) - 1
+        return self.values[key]
+
+
+def test_tasks_go_to_their_queues():
+    assert queue_for("process_clip") == INTERACTIVE
+    assert queue_for("generate_proxy") == THUMBNAILS
+    assert queue_for("backfill_embeddings") == BACKFILL
+    assert queue_for("something_new") == INTERACTIVE
+
+
+def test_weighted_order_favours_heavy_queues_without_starving_light_ones():
+    rng = random.Random(7)
+    weights = {INTERACTIVE: 8, THUMBNAILS: 4, EXPORT: 2, BACKFILL: 1}
+
+    firsts = Counter(weighted_order(QUEUE_NAMES, weights, rng)[0] for _ in range(3000))
+
+    assert firsts[INTERACTIVE] > firsts[THUMBNAILS] > firsts[EXPORT] > firsts[BACKFILL] > 0
+    # P(first) = w / sum(w) for the first draw
+    assert abs(firsts[INTERACTIVE] / 3000 - 8 / 15) < 0.05
+
+
+def test_unweighted_queue_is_served_last():
+    order = weighted_order(QUEUE_NAMES, {INTERACTIVE: 1, THUMBNAILS: 1, EXPORT: 1})
+
+    assert order[-1] == BACKFILL
+    assert sorted(order) == sorted(QUEUE_NAMES)
+
+
+def test_fair_share_limits_running_jobs_per_user():
+    conn = FakeRedis()
+    share = FairShare(conn, max_running=2)
+
+    assert share.acquire("alice", ttl=60)
+    assert share.acquire("alice", ttl=60)
+    assert not share.acquire("alice", ttl=60)
+    # Other users keep their own share
+    assert share.acquire("bob", ttl=60)
+
+    share.release("alice")
+    assert share.acquire("alice", ttl=60)
+    assert conn.values["cre8rflow:fair_share:alice"] == 2
+
+
+def test_jobs_without_user_are_not_limited():
+    share = FairShare(FakeRedis(), max_running=1)
+
+    assert all(share.acquire(None, ttl=60) for _ in range(5))
+
+
+class FakeJob:
+    def __init__(self, status):
+        self.status = status
+
+    def get_status(self):
+        return self.status
+
+
+class FakeQueue:
+    def __init__(self):
+        self.enqueued = []
+
+    def enqueue(self, func, data, **options):
+        self.enqueued.append(options["job_id"])
+
+
+class ClaimRedis:
+    def __init__(self):
+        self.claims = set()
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.claims:
+            return None
+        self.claims.add(key)
+        return True
+
+
+@pytest.fixture
+def dedup(monkeypatch):
+    jobs = {}
+    queue = FakeQueue()
+    monkeypatch.setattr(job_queues, "redis_conn", ClaimRedis())
+    monkeypatch.setattr(job_queues, "queues", {INTERACTIVE: queue})
+    monkeypatch.setattr(job_queues, "_fetch_job", jobs.get)
+    monkeypatch.setattr(job_queues.metrics, "incr", lambda *args: None)
+    monkeypatch.setattr(settings, "job_dedup_window", 600)
+    return jobs, queue
+
+
+def test_job_id_ignores_key_order():
+    first = {"operation_id": "a", "parameters": {"x": 1, "y": 2}}
+    retry = {"parameters": {"y": 2, "x": 1}, "operation_id": "a"}
+
+    assert job_id_for("process_clip", first, INTERACTIVE) == job_id_for("process_clip", retry, INTERACTIVE)
+    assert job_id_for("process_clip", first, INTERACTIVE) != job_id_for("process_plan", first, INTERACTIVE)
+
+
+def test_duplicate_attaches_to_queued_job(dedup):
+    jobs, queue = dedup
+    data = {"operation_id": "a"}
+
+    job_id = enqueue_job(INTERACTIVE, "process_clip", "f", data)
+    jobs[job_id] = FakeJob(JobStatus.QUEUED)
+
+    assert enqueue_job(INTERACTIVE, "process_clip", "f", dict(data)) == job_id
+    assert queue.enqueued == [job_id]
+
+
+def test_duplicate_in_window_attaches_to_finished_job(dedup):
+    jobs, queue = dedup
+    job_id = enqueue_job(INTERACTIVE, "process_clip", "f", {"operation_id": "a"})
+    jobs[job_id] = FakeJob(JobStatus.FINISHED)
+
+    assert enqueue_job(INTERACTIVE, "process_clip", "f", {"operation_id": "a"}) == job_id
+    assert queue.enqueued == [job_id]
+
+
+def test_failed_job_runs_again_under_the_same_id(dedup):
+    jobs, queue = dedup
+    job_id = enqueue_job(INTERACTIVE, "process_clip", "f", {"operation_id": "a"})
+    jobs[job_id] = FakeJob(JobStatus.FAILED)
+
+    assert enqueue_job(INTERACTIVE, "process_clip", "f", {"operation_id": "a"}) == job_id
+    assert queue.enqueued == [job_id, job_id]
+
+
+def test_dedup_can_be_disabled(dedup, monkeypatch):
+    _, queue = dedup
+    monkeypatch.setattr(settings, "job_dedup_window", 0)
+
+    first = enqueue_job(INTERACTIVE, "process_clip", "f", {"operation_id": "a"})
+    second = enqueue_job(INTERACTIVE, "process_clip", "f", {"operation_id": "a"})
+
+    assert first != second
+    assert queue.enqueued == [first, second]
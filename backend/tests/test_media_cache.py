@@ -0,0 +1,151 @@
+"""
+Tests for the content-addressed media cache
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from app.core import metrics
+from app.services.media_cache import MediaCache
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    counters = {}
+    
+    def incr(name, amount=1):
+        counters[name] = counters.get(name, 0) + amount
+    
+    monkeypatch.setattr(metrics, "incr", incr)
+    return counters
+
+
+def test_concurrent_jobs_share_one_download(tmp_path, recorded):
+    cache = MediaCache(str(tmp_path), max_bytes=1024)
+    fetches = []
+    
+    def fetch(path):
+        fetches.append(path)
+        time.sleep(0.1)
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+    
+    seen = []
+    
+    def job():
+        with cache.open("video", "etag1", fetch) as path:
+            with open(path, "rb") as f:
+                seen.append(len(f.read()))
+    
+    threads = [threading.Thread(target=job) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert len(fetches) == 1
+    assert seen == [100] * 4
+    assert recorded["media_cache_misses"] == 1
+    assert recorded["media_cache_hits"] == 3
+    assert recorded["media_cache_bytes_saved"] == 300
+
+
+def test_new_content_hash_is_a_miss(tmp_path, recorded):
+    cache = MediaCache(str(tmp_path), max_bytes=1024)
+    
+    def fetch(path):
+        with open(path, "wb") as f:
+            f.write(b"data")
+    
+    with cache.open("video", "v1", fetch) as first:
+        pass
+    with cache.open("video", "v2", fetch) as second:
+        pass
+    
+    assert first != second
+    assert recorded["media_cache_misses"] == 2
+
+
+def test_failed_fetch_leaves_no_entry(tmp_path, recorded):
+    cache = MediaCache(str(tmp_path), max_bytes=1024)
+    
+    def fetch(path):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise IOError("connection reset")
+    
+    with pytest.raises(IOError):
+        with cache.open("video", "v1", fetch):
+            pass
+    
+    assert [n for n in os.listdir(tmp_path) if not n.endswith(".lock")] == []
+
+
+def test_eviction_keeps_entries_in_use(tmp_path, recorded):
+    cache = MediaCache(str(tmp_path), max_bytes=150)
+    
+    def fetch(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+    
+    with cache.open("a", "1", fetch) as in_use:
+        with cache.open("b", "1", fetch) as newest:
+            # Over budget, but "a" is still being read by this job
+            assert os.path.exists(in_use)
+        
+        with cache.open("c", "1", fetch):
+            pass
+        
+        assert os.path.exists(in_use)
+        assert not os.path.exists(newest)
+
+
+def test_eviction_removes_lock_files(tmp_path, recorded):
+    cache = MediaCache(str(tmp_path), max_bytes=150)
+    
+    def fetch(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+    
+    for video_id in "abc":
+        with cache.open(video_id, "1", fetch):
+            pass
+    
+    assert sorted(os.listdir(tmp_path)) == ["c-1.mp4", "c-1.mp4.lock"]
+
+
+def test_waiter_on_an_evicted_lock_starts_over(tmp_path, recorded):
+    cache = MediaCache(str(tmp_path), max_bytes=0)
+    fetches = []
+    
+    def fetch(path):
+        fetches.append(path)
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+    
+    with cache.open("a", "1", fetch) as path:
+        pass
+    stale_fd = os.open(f"{path}.lock", os.O_RDWR)
+    cache.evict()
+    
+    assert not os.path.exists(f"{path}.lock")
+    assert not cache._lock_is_current(stale_fd, f"{path}.lock")
+    os.close(stale_fd)
+    
+    with cache.open("a", "1", fetch):
+        pass
+    assert len(fetches) == 2
+
+
+def test_cache_directory_is_created_on_first_use(tmp_path, recorded):
+    root = tmp_path / "cache"
+    cache = MediaCache(str(root), max_bytes=1024)
+    
+    assert not root.exists()
+    assert cache.evict() == 0
+    
+    with cache.open("a", "1", lambda path: open(path, "wb").close()):
+        pass
+    assert root.exists()
@@ -0,0 +1,148 @@
+"""
+Tests for the media info probe cache
+"""
+import os
+import shutil
+
+import pytest
+
+from app.core.smart_cut import scan_keyframes
+from app.services import media_info
+from app.services.media_info import (
+    MediaInfo,
+    MediaInfoCache,
+    load_media_info,
+    media_info_from_probe,
+    parse_frame_rate,
+    probe_media,
+)
+from app.utils.ffmpeg_helpers import get_video_info
+from media_fixtures import make_clip
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+PROBE = {
+    "format": {"duration": "2.000000", "format_name": "mov,mp4,m4a,3gp,3g2,mj2"},
+    "streams": [
+        {
+            "index": 0, "codec_type": "video", "codec_name": "h264",
+            "width": 320, "height": 240, "r_frame_rate": "0/0", "avg_frame_rate": "30000/1001",
+            "profile": "High", "level": 31, "pix_fmt": "yuv420p", "time_base": "1/30000",
+        },
+        {"index": 1, "codec_type": "audio", "codec_name": "aac", "sample_rate": "48000", "channels": 2},
+    ],
+}
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Count ffprobe runs, answering with PROBE."""
+    calls = []
+
+    def fake_probe(path, *args):
+        calls.append(path)
+        return PROBE
+
+    async def fake_probe_async(path, *args):
+        return fake_probe(path)
+
+    monkeypatch.setattr(media_info.ffmpeg, "probe", fake_probe)
+    monkeypatch.setattr(media_info, "probe_async", fake_probe_async)
+    monkeypatch.setattr(media_info, "media_info_cache", MediaInfoCache(8))
+    monkeypatch.setattr(media_info.metrics, "incr", lambda *args: None)
+    return calls
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("30000/1001", 30000 / 1001),
+    ("25", 25.0),
+    ("25/1", 25.0),
+    ("0/0", None),
+    ("__import__('os')", None),
+    (None, None),
+])
+def test_frame_rate_is_parsed_without_eval(value, expected):
+    assert parse_frame_rate(value) == expected
+
+
+def test_probe_is_summarized():
+    info = media_info_from_probe(PROBE)
+
+    assert info.duration == 2.0
+    assert info.has_audio
+    assert info.video == {
+        "index": 0, "codec_type": "video", "codec_name": "h264",
+        "width": 320, "height": 240, "fps": 30000 / 1001,
+        "profile": "High", "level": 31, "pix_fmt": "yuv420p", "time_base": "1/30000",
+    }
+    assert info.streams[1]["sample_rate"] == 48000
+    assert MediaInfo.from_dict(info.to_dict()) == info
+
+
+def test_file_is_probed_once_per_identity(probes, tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"v1")
+
+    first = probe_media(str(path), keyframes=False)
+    assert probe_media(str(path), keyframes=False) is first
+    assert len(probes) == 1
+
+    # A rewritten file is a different identity
+    path.write_bytes(b"v2-longer")
+    probe_media(str(path), keyframes=False)
+    assert len(probes) == 2
+
+
+def test_cache_is_bounded():
+    cache = MediaInfoCache(2)
+    for i in range(3):
+        cache.put(("path", i, 0), MediaInfo(duration=i))
+
+    assert cache.get(("path", 0, 0)) is None
+    assert cache.get(("path", 2, 0)).duration == 2
+
+
+@pytest.mark.asyncio
+async def test_stored_info_is_used_before_probing(probes, tmp_path, monkeypatch):
+    stored = MediaInfo(duration=7.0, keyframes=[0.0, 2.0])
+    lookups = []
+
+    async def load_stored(content_hash):
+        lookups.append(content_hash)
+        return stored
+
+    monkeypatch.setattr(media_info, "_load_stored", load_stored)
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"v1")
+
+    assert await load_media_info(str(path), "etag-1") is stored
+    assert await load_media_info(str(path), "etag-1") is stored
+    assert lookups == ["etag-1"]
+    assert probes == []
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_helpers_share_one_probe(probes, tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"v1")
+
+    info = await get_video_info(str(path))
+    await get_video_info(str(path))
+
+    assert info["fps"] == 30000 / 1001
+    assert len(probes) == 1
+
+
+@needs_ffmpeg
+@pytest.mark.asyncio
+async def test_keyframe_index_matches_a_scan(probes, tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 4, gop=25)
+
+    info = await load_media_info(str(source))
+
+    assert info.keyframes == scan_keyframes(str(source)).keyframes
+    assert info.keyframe_scan().codec == "h264"
+    assert info.keyframe_scan().video_format == {
+        "profile": "High", "level": 31, "pix_fmt": "yuv420p", "time_base": "1/30000",
+    }
@@ -0,0 +1,165 @@
+"""
+Tests for streaming and keyset-paginated project data
+"""
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from app.core.timeline import ProjectTimeline
+from app.services import project_stream
+from app.services.project_stream import (
+    fetch_audio_features_page,
+    fetch_transcript_page,
+    load_audio_columns,
+    stream_audio_features,
+    stream_transcripts,
+)
+
+
+class FakeCursor:
+    def __init__(self, rows, prefetch):
+        self.rows = rows
+        self.prefetch = prefetch
+
+    async def __aiter__(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeConnection:
+    """Answers the project_stream queries from in-memory tables."""
+
+    def __init__(self, transcripts, audio_features):
+        self.transcripts = transcripts
+        self.audio_features = audio_features
+        self.cursors = []
+
+    def _transcripts(self, project_id, start, end):
+        rows = [
+            r for r in self.transcripts
+            if r["project_id"] == project_id
+            and (start is None or r["end_time"] > start)
+            and (end is None or r["start_time"] < end)
+        ]
+        return sorted(rows, key=lambda r: (r["start_time"], r["id"]))
+
+    def _audio(self, project_id, start, end):
+        rows = [
+            r for r in self.audio_features
+            if r["project_id"] == project_id
+            and (start is None or r["timestamp"] >= start)
+            and (end is None or r["timestamp"] < end)
+        ]
+        return sorted(rows, key=lambda r: (r["timestamp"], r["id"]))
+
+    def cursor(self, query, project_id, start, end, prefetch):
+        table = self._transcripts if "FROM transcripts" in query else self._audio
+        cursor = FakeCursor(table(project_id, start, end), prefetch)
+        self.cursors.append(cursor)
+        return cursor
+
+    async def fetch(self, query, project_id, start, end, *args):
+        if "FROM transcripts" in query:
+            limit, after_time, after_id = args
+            rows = self._transcripts(project_id, start, end)
+            if after_time is not None:
+                rows = [r for r in rows if (r["start_time"], r["id"]) > (after_time, after_id)]
+        else:
+            limit, after_time, after_id = args
+            rows = self._audio(project_id, start, end)
+            if after_time is not None:
+                rows = [r for r in rows if (r["timestamp"], r["id"]) > (after_time, after_id)]
+        return rows[:limit]
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    # Segments share start times so the keyset has to break ties on id
+    transcripts = [
+        {"id": i, "project_id": "p1", "start_time": float(i // 2), "end_time": float(i // 2) + 1.0,
+         "text": f"segment {i}"}
+        for i in range(9)
+    ]
+    transcripts.append({"id": 99, "project_id": "p2", "start_time": 0.0, "end_time": 1.0, "text": "other"})
+    audio_features = [
+        {"id": i, "project_id": "p1", "timestamp": i * 0.5, "duration": 0.5,
+         "rms_db": -60.0 if 4 <= i < 10 else -20.0}
+        for i in range(20)
+    ]
+    # Re-analysed frames repeat their timestamps
+    audio_features += [
+        {"id": 100 + i, "project_id": "p3", "timestamp": float(i // 3), "duration": 1.0, "rms_db": -20.0}
+        for i in range(9)
+    ]
+    conn = FakeConnection(transcripts, audio_features)
+
+    @asynccontextmanager
+    async def read_connection():
+        yield conn
+
+    monkeypatch.setattr(project_stream.db, "read_connection", read_connection)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_stream_transcripts_yields_overlapping_segments_in_order(conn):
+    rows = [r async for r in stream_transcripts("p1", start=1.5, end=3.0, batch_size=4)]
+    
+    assert [r["id"] for r in rows] == [2, 3, 4, 5]
+    assert conn.cursors[-1].prefetch == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_audio_features_window_is_half_open(conn):
+    rows = [r async for r in stream_audio_features("p1", start=1.0, end=2.0)]
+    
+    assert [r["timestamp"] for r in rows] == [1.0, 1.5]
+
+
+@pytest.mark.asyncio
+async def test_transcript_pages_cover_every_row_once(conn):
+    seen, cursor = [], None
+    while True:
+        page, cursor = await fetch_transcript_page("p1", after=cursor, limit=2)
+        seen.extend(r["id"] for r in page)
+        if cursor is None:
+            break
+    
+    assert seen == list(range(9))
+
+
+@pytest.mark.asyncio
+async def test_audio_pages_end_with_a_short_page(conn):
+    page, cursor = await fetch_audio_features_page("p1", limit=8, start=2.0)
+    assert len(page) == 8 and cursor == (5.5, 11)
+    
+    page, cursor = await fetch_audio_features_page("p1", after=cursor, limit=8, start=2.0)
+    assert [r["timestamp"] for r in page] == [6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0, 9.5]
+    
+    page, cursor = await fetch_audio_features_page("p1", after=cursor, limit=8, start=2.0)
+    assert page == [] and cursor is None
+
+
+@pytest.mark.asyncio
+async def test_audio_pages_split_duplicate_timestamps_without_losing_rows(conn):
+    seen, cursor = [], None
+    while True:
+        # Every page boundary falls inside a run of equal timestamps
+        page, cursor = await fetch_audio_features_page("p3", after=cursor, limit=2)
+        seen.extend(r["id"] for r in page)
+        if cursor is None:
+            break
+    
+    assert seen == list(range(100, 109))
+
+
+@pytest.mark.asyncio
+async def test_audio_columns_are_built_batch_by_batch(conn):
+    timeline = ProjectTimeline(np.empty(0), np.empty(0), [])
+    
+    await load_audio_columns(timeline, "p1", batch_size=3)
+    
+    assert timeline.audio_timestamp.tolist() == [i * 0.5 for i in range(20)]
+    assert timeline.audio["rms_db"].tolist() == [r["rms_db"] for r in conn.audio_features if r["project_id"] == "p1"]
+    assert "project_id" not in timeline.audio
@@ -0,0 +1,45 @@
+"""
+Tests for the queue stats endpoint
+"""
+import jwt
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.routers import queues
+
+
+def token(**claims):
+    return jwt.encode(claims, settings.supabase_jwt_secret, algorithm="HS256")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(queues, "queue_stats", lambda: {"interactive": {"depth": 3}})
+    app = FastAPI()
+    app.include_router(queues.router)
+    return TestClient(app)
+
+
+def test_service_role_reads_queue_stats(client):
+    response = client.get(
+        "/queues/stats",
+        headers={"Authorization": f"Bearer {token(sub='autoscaler', role='service_role')}"}
+    )
+    
+    assert response.status_code == 200
+    assert response.json() == {"interactive": {"depth": 3}}
+
+
+def test_user_tokens_are_refused(client):
+    response = client.get(
+        "/queues/stats",
+        headers={"Authorization": f"Bearer {token(sub='u1', role='authenticated')}"}
+    )
+    
+    assert response.status_code == 403
+
+
+def test_anonymous_requests_are_refused(client):
+    assert client.get("/queues/stats").status_code in (401, 403)
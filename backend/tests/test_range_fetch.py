@@ -0,0 +1,33 @@
+"""
+Tests for reading short segments over HTTP range requests
+"""
+import shutil
+
+import ffmpeg
+import pytest
+
+from app.services.storage_transfer import StorageTransfer
+from media_fixtures import make_clip
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def test_short_cut_reads_a_fraction_of_the_source(storage_server, tmp_path):
+    source = tmp_path / "source.mp4"
+    make_clip(source, 20)
+    storage_server.put_object("videos", "abc.mp4", source.read_bytes())
+    size = source.stat().st_size
+    
+    url, options = StorageTransfer(storage_server.url, "test_key").ffmpeg_input("videos", "abc.mp4")
+    output = tmp_path / "cut.mp4"
+    (
+        ffmpeg
+        .input(url, ss=10, to=11, **options)
+        .output(str(output), c="copy")
+        .run(quiet=True)
+    )
+    
+    assert output.stat().st_size > 0
+    assert "test_key" not in url + str(options)
+    assert all(r[2].get("Authorization") is None for r in storage_server.requests if r[0] == "GET")
+    assert storage_server.bytes_served < size * 0.3
@@ -0,0 +1,86 @@
+"""
+Tests for batched realtime event publishing
+"""
+import threading
+import time
+
+import pytest
+
+from app.services import realtime_publisher as publisher_module
+from app.services.realtime_publisher import RealtimePublisher
+
+
+@pytest.fixture(autouse=True)
+def no_metrics(monkeypatch):
+    monkeypatch.setattr(publisher_module.metrics, "incr", lambda *args: None)
+    monkeypatch.setattr(publisher_module.metrics, "observe", lambda *args: None)
+
+
+def test_burst_is_sent_as_one_batch_grouped_by_project():
+    batches = []
+    publisher = RealtimePublisher(batches.append, window=0.05)
+
+    for i in range(3):
+        publisher.publish("p2", {"operation_id": f"b{i}", "status": "completed"})
+        publisher.publish("p1", {"operation_id": f"a{i}", "status": "completed"})
+
+    assert publisher.flush(timeout=2)
+    assert len(batches) == 1
+    assert [row["project_id"] for row in batches[0]] == ["p1"] * 3 + ["p2"] * 3
+    assert [row["payload"]["operation_id"] for row in batches[0][:3]] == ["a0", "a1", "a2"]
+
+
+def test_progress_updates_coalesce():
+    batches = []
+    publisher = RealtimePublisher(batches.append, window=0.05)
+
+    for percent in (10, 20, 30):
+        publisher.publish("p1", {"operation_id": "a", "progress": percent}, coalesce_key="a")
+    publisher.publish("p1", {"operation_id": "a", "status": "completed"})
+
+    assert publisher.flush(timeout=2)
+    assert [row["payload"] for row in batches[0]] == [
+        {"operation_id": "a", "progress": 30},
+        {"operation_id": "a", "status": "completed"},
+    ]
+
+
+def test_full_buffer_drops_progress_before_final_statuses():
+    release = threading.Event()
+    batches = []
+
+    def send(rows):
+        release.wait(2)
+        batches.append(rows)
+
+    publisher = RealtimePublisher(send, window=0, max_buffer=2)
+    # Occupy the sender so later events stay buffered
+    publisher.publish("p", {"n": "first"})
+    time.sleep(0.05)
+
+    assert publisher.publish("p", {"n": "progress"}, coalesce_key="a")
+    assert publisher.publish("p", {"n": "done-1"})
+    # The progress event makes room for a final status...
+    assert publisher.publish("p", {"n": "done-2"})
+    # ...but a progress event never displaces one
+    assert not publisher.publish("p", {"n": "progress-2"}, coalesce_key="b")
+
+    release.set()
+    assert publisher.flush(timeout=2)
+    sent = [row["payload"]["n"] for batch in batches for row in batch]
+    assert sent == ["first", "done-1", "done-2"]
+
+
+def test_publish_never_blocks_or_raises():
+    def send(rows):
+        time.sleep(0.2)
+        raise RuntimeError("realtime down")
+
+    publisher = RealtimePublisher(send, window=0, max_buffer=10)
+
+    started = time.monotonic()
+    for i in range(100):
+        publisher.publish("p", {"n": i})
+    assert time.monotonic() - started < 0.1
+
+    assert publisher.flush(timeout=2)
@@ -0,0 +1,207 @@
+"""
+Tests for the render result cache
+"""
+import os
+
+import pytest
+
+from app.core import metrics
+from app.services import render_cache as render_cache_module
+from app.services.media_cache import MediaCache
+from app.services.render_cache import (
+    RenderCache,
+    hit_rate,
+    render_cache_key,
+    render_to_disk_cache,
+)
+
+
+class FakeRedis:
+    """The slice of the Redis API the render cache uses."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.zsets = {}
+        self.values = {}
+
+    def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    def hsetnx(self, name, key, value):
+        entry = self.hashes.setdefault(name, {})
+        if key in entry:
+            return 0
+        entry[key] = value
+        return 1
+
+    def zadd(self, name, mapping):
+        self.zsets.setdefault(name, {}).update(mapping)
+
+    def zrange(self, name, start, end):
+        members = sorted(self.zsets.get(name, {}).items(), key=lambda item: item[1])
+        return [m.encode() for m, _ in members][start:end + 1]
+
+    def zrem(self, name, member):
+        return 1 if self.zsets.get(name, {}).pop(member, None) is not None else 0
+
+    def incrby(self, name, amount):
+        self.values[name] = int(self.values.get(name, 0)) + amount
+        return self.values[name]
+
+    def get(self, name):
+        return self.values.get(name)
+
+    def delete(self, name):
+        self.hashes.pop(name, None)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.removed = []
+        self.storage = self
+
+    def from_(self, bucket):
+        return self
+
+    def remove(self, paths):
+        self.removed.extend(paths)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    counters = {}
+
+    def incr(name, amount=1):
+        counters[name] = counters.get(name, 0) + amount
+
+    monkeypatch.setattr(metrics, "incr", incr)
+    return counters
+
+
+def test_key_ignores_ids_and_parameter_order():
+    first = {
+        "operation_id": "a",
+        "operation_type": "speed",
+        "start_time": 1.0,
+        "end_time": 2.00001,
+        "parameters": {"speed_factor": 2.0, "mode": "smooth"},
+    }
+    repeat = {
+        "operation_id": "b",
+        "operation_type": "speed",
+        "start_time": 1,
+        "end_time": 2.0,
+        "parameters": {"mode": "smooth", "speed_factor": 2.0},
+    }
+
+    assert render_cache_key("etag", [first], {}) == render_cache_key("etag", [repeat], {})
+
+
+def test_key_changes_with_source_edits_and_encoder():
+    op = {"operation_type": "cut", "start_time": 1.0, "end_time": 2.0}
+    key = render_cache_key("etag", [op], {"crf": 18})
+
+    assert key != render_cache_key("other", [op], {"crf": 18})
+    assert key != render_cache_key("etag", [dict(op, end_time=3.0)], {"crf": 18})
+    assert key != render_cache_key("etag", [op], {"crf": 23})
+    assert key != render_cache_key("etag", [op, op], {"crf": 18})
+
+
+def test_repeat_lookup_returns_stored_result(recorded):
+    cache = RenderCache(FakeRedis(), max_bytes=1000)
+    result = {"result_url": "https://storage/renders/k.mp4", "operation_type": "cut"}
+
+    assert cache.lookup("k") is None
+    cache.store(FakeSupabase(), "k", 100, result)
+
+    assert cache.lookup("k") == result
+    assert recorded["render_cache_misses"] == 1
+    assert recorded["render_cache_hits"] == 1
+    assert hit_rate({"render_cache_hits": 1, "render_cache_misses": 1}) == 0.5
+
+
+def test_storage_tier_evicts_least_recently_used():
+    conn = FakeRedis()
+    supabase = FakeSupabase()
+    cache = RenderCache(conn, max_bytes=250)
+
+    cache.store(supabase, "old", 100, {})
+    cache.store(supabase, "used", 100, {})
+    conn.zadd("cre8rflow:render_cache:lru", {"old": 0, "used": 2})
+    cache.store(supabase, "new", 100, {})
+
+    assert supabase.removed == ["renders/old.mp4"]
+    assert cache.lookup("old") is None
+    assert cache.lookup("used") == {}
+    assert conn.get("cre8rflow:render_cache:bytes") == 200
+
+
+def test_disk_tier_renders_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        render_cache_module,
+        "render_disk_cache",
+        MediaCache(str(tmp_path / "cache"), 1024, metric_prefix="render_disk_cache")
+    )
+    source = tmp_path / "source.mp4"
+    source.write_bytes(b"source")
+    renders = []
+
+    def render(dest):
+        renders.append(dest)
+        with open(dest, "wb") as f:
+            f.write(b"rendered")
+
+    action = {"action": "volume", "factor": 2.0}
+    for name in ("first.mp4", "second.mp4"):
+        out = render_to_disk_cache(str(source), [action], {}, render, str(tmp_path / name))
+        with open(out, "rb") as f:
+            assert f.read() == b"rendered"
+
+    assert len(renders) == 1
+    assert os.path.exists(tmp_path / "first.mp4")
+
+
+class StandInSupabase:
+    """Public URLs and removals against the storage stand-in."""
+
+    def __init__(self, store):
+        self.store = store
+        self.storage = self
+
+    def from_(self, bucket):
+        self.bucket = bucket
+        return self
+
+    def get_public_url(self, path):
+        return f"{self.store.url}/public/{self.bucket}/{path}"
+
+    def remove(self, paths):
+        for path in paths:
+            os.remove(self.store.object_file(self.bucket, path))
+
+
+def test_evicted_render_leaves_job_results_in_place(storage_server, tmp_path, monkeypatch):
+    from app.services import worker
+    from app.services.storage_transfer import StorageTransfer
+
+    monkeypatch.setattr(worker, "storage_transfer", StorageTransfer(storage_server.url, "test_key"))
+    monkeypatch.setattr(worker, "render_cache", RenderCache(FakeRedis(), max_bytes=10))
+    supabase = StandInSupabase(storage_server)
+    output = tmp_path / "out.mp4"
+    output.write_bytes(b"rendered")
+
+    url = worker._upload_render(supabase, "k", str(output), "results/op1.mp4")
+    worker.render_cache.store(supabase, "k", 8, {"result_url": url})
+    reused = worker._reuse_render(supabase, "k", "results/op2.mp4")
+    # Over budget: the cache copy goes, both results stay
+    worker.render_cache.store(supabase, "other", 8, {})
+
+    assert url.endswith("/assets/results/op1.mp4")
+    assert reused == {"result_url": url.replace("op1", "op2")}
+    assert not os.path.exists(storage_server.object_file("assets", "renders/k.mp4"))
+    assert storage_server.get_object("assets", "results/op1.mp4") == b"rendered"
+    assert storage_server.get_object("assets", "results/op2.mp4") == b"rendered"
+    assert worker._reuse_render(supabase, "k", "results/op3.mp4") is None
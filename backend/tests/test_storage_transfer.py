@@ -0,0 +1,142 @@
+"""
+Tests for streaming storage transfers against a local storage stand-in
+"""
+import os
+import tracemalloc
+
+import httpx
+import pytest
+
+from app.services.storage_transfer import StorageTransfer, StorageTransferError
+
+MB = 1024 * 1024
+
+
+def _transfer(storage_server, **kwargs):
+    return StorageTransfer(storage_server.url, "test_key", chunk_size=64 * 1024, **kwargs)
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_download_streams_in_bounded_chunks(storage_server, tmp_path):
+    payload = os.urandom(16 * MB)
+    storage_server.put_object("videos", "abc.mp4", payload)
+    transfer = _transfer(storage_server)
+    dest = tmp_path / "abc.mp4"
+    
+    peak = _peak_memory(lambda: transfer.download_to_file("videos", "abc.mp4", str(dest)))
+    
+    assert dest.read_bytes() == payload
+    assert peak < 2 * MB
+
+
+def test_download_missing_object_raises(storage_server, tmp_path):
+    with pytest.raises(StorageTransferError):
+        _transfer(storage_server).download_to_file("videos", "nope.mp4", str(tmp_path / "x"))
+
+
+def test_small_upload_streams_from_disk(storage_server, tmp_path):
+    src = tmp_path / "out.mp4"
+    src.write_bytes(os.urandom(8 * MB))
+    transfer = _transfer(storage_server, multipart_threshold=64 * MB)
+    
+    peak = _peak_memory(
+        lambda: transfer.upload_file("assets", "results/1.mp4", str(src), "video/mp4")
+    )
+    
+    assert storage_server.get_object("assets", "results/1.mp4") == src.read_bytes()
+    assert peak < 2 * MB
+
+
+def test_existing_object_requires_upsert(storage_server, tmp_path):
+    storage_server.put_object("assets", "results/1.mp4", b"old")
+    src = tmp_path / "out.mp4"
+    src.write_bytes(b"new")
+    transfer = _transfer(storage_server)
+    
+    with pytest.raises(StorageTransferError):
+        transfer.upload_file("assets", "results/1.mp4", str(src), "video/mp4")
+    
+    transfer.upload_file("assets", "results/1.mp4", str(src), "video/mp4", upsert=True)
+    assert storage_server.get_object("assets", "results/1.mp4") == b"new"
+
+
+def test_large_upload_is_multipart(storage_server, tmp_path):
+    src = tmp_path / "export.mp4"
+    src.write_bytes(os.urandom(5 * MB + 123))
+    transfer = _transfer(storage_server, multipart_threshold=MB, part_size=MB)
+    
+    peak = _peak_memory(
+        lambda: transfer.upload_file("assets", "exports/1.mp4", str(src), "video/mp4")
+    )
+    
+    patches = [r for r in storage_server.requests if r[0] == "PATCH"]
+    assert len(patches) == 6
+    assert storage_server.get_object("assets", "exports/1.mp4") == src.read_bytes()
+    assert peak < 3 * MB
+
+
+def test_interrupted_part_resumes_from_server_offset(storage_server, tmp_path):
+    src = tmp_path / "export.mp4"
+    src.write_bytes(os.urandom(3 * MB))
+    transfer = _transfer(storage_server, multipart_threshold=MB, part_size=MB)
+    storage_server.fail_next_patch = True
+    
+    transfer.upload_file("assets", "exports/2.mp4", str(src), "video/mp4")
+    
+    assert any(r[0] == "HEAD" for r in storage_server.requests)
+    assert storage_server.get_object("assets", "exports/2.mp4") == src.read_bytes()
+
+
+def test_transport_error_while_resuming_is_retried(storage_server, tmp_path):
+    src = tmp_path / "export.mp4"
+    src.write_bytes(os.urandom(3 * MB))
+    transfer = _transfer(storage_server, multipart_threshold=MB, part_size=MB)
+    storage_server.fail_next_patch = True
+    storage_server.fail_next_head = True
+    
+    transfer.upload_file("assets", "exports/3.mp4", str(src), "video/mp4")
+    
+    assert [r[0] for r in storage_server.requests].count("HEAD") == 2
+    assert storage_server.get_object("assets", "exports/3.mp4") == src.read_bytes()
+
+
+def test_missing_upload_offset_is_an_upload_error(storage_server, tmp_path):
+    src = tmp_path / "export.mp4"
+    src.write_bytes(os.urandom(3 * MB))
+    transfer = _transfer(storage_server, multipart_threshold=MB, part_size=MB)
+    storage_server.fail_next_patch = True
+    storage_server.omit_upload_offset = True
+    
+    with pytest.raises(StorageTransferError, match="Upload-Offset"):
+        transfer.upload_file("assets", "exports/4.mp4", str(src), "video/mp4")
+
+
+def test_copy_object_makes_an_independent_copy(storage_server):
+    storage_server.put_object("assets", "results/1.mp4", b"render")
+    transfer = _transfer(storage_server)
+    
+    transfer.copy_object("assets", "results/1.mp4", "renders/k.mp4")
+    os.remove(storage_server.object_file("assets", "results/1.mp4"))
+    
+    assert storage_server.get_object("assets", "renders/k.mp4") == b"render"
+    with pytest.raises(StorageTransferError):
+        transfer.copy_object("assets", "results/1.mp4", "renders/k2.mp4")
+
+
+def test_ffmpeg_input_is_a_signed_url_without_the_key(storage_server, tmp_path):
+    storage_server.put_object("videos", "abc.mp4", b"x" * 1000)
+    
+    url, options = _transfer(storage_server).ffmpeg_input("videos", "abc.mp4", expires_in=60)
+    
+    assert "test_key" not in url + str(options)
+    assert "headers" not in options
+    response = httpx.get(url, headers={"Range": "bytes=0-99"})
+    assert response.status_code == 206 and response.content == b"x" * 100
@@ -0,0 +1,66 @@
+"""
+Tests for stored waveform pyramids
+"""
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from app.core.waveform import PeakPyramidBuilder
+from app.services import waveforms
+from app.services.waveforms import load_waveform_range, store_waveform
+
+
+class FakeConnection:
+    """Keeps waveform_peaks rows in memory and answers the range query."""
+
+    def __init__(self):
+        self.rows = {}
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query, video_id):
+        self.rows = {key: row for key, row in self.rows.items() if key[0] != video_id}
+
+    async def executemany(self, query, records):
+        for video_id, level, sample_rate, bits, count, peaks in records:
+            self.rows[video_id, level] = {
+                "sample_rate": sample_rate, "bits": bits, "bucket_count": count, "peaks": peaks,
+            }
+
+    async def fetchrow(self, query, video_id, level):
+        return self.rows.get((video_id, level))
+
+    async def fetchval(self, query, video_id, level, offset, length):
+        # substring() is 1-based
+        return self.rows[video_id, level]["peaks"][offset - 1:offset - 1 + length]
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection()
+
+    @asynccontextmanager
+    async def connection():
+        yield conn
+
+    monkeypatch.setattr(waveforms.db, "connection", connection)
+    monkeypatch.setattr(waveforms.db, "read_connection", connection)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_range_reads_return_only_the_requested_buckets(conn):
+    samples = np.arange(-16000, 16000, dtype=np.int16)
+    builder = PeakPyramidBuilder([256, 1024], bits=16)
+    builder.add(samples)
+    pyramid = builder.finish()
+    await store_waveform("video-1", pyramid, 16000, 16)
+
+    meta, peaks = await load_waveform_range("video-1", 256, start=0.5, end=1.0)
+
+    assert (meta["first_bucket"], meta["buckets"], meta["bucket_count"]) == (31, 32, 125)
+    assert np.array_equal(np.frombuffer(peaks, dtype="<i2").reshape(-1, 2), pyramid[256][31:63])
+    assert await load_waveform_range("video-1", 4096) is None
@@ -0,0 +1,278 @@
+"""
+Tests for worker task chaining
+"""
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest
+
+from app import db as app_db
+from app.services import worker
+
+
+class FakeConnection:
+    """Answers the projects lookup from a fixed list of rows."""
+
+    def __init__(self, projects):
+        self.projects = projects
+
+    async def fetch(self, query, video_id):
+        return [p for p in self.projects if p["video_id"] == video_id]
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    conn = FakeConnection([
+        {"id": "p1", "video_id": "v1"},
+        {"id": "p2", "video_id": "v1"},
+        {"id": "p3", "video_id": "v2"},
+    ])
+
+    @asynccontextmanager
+    async def connection():
+        yield conn
+
+    calls = []
+
+    async def enqueue_task(task_type, data, queue_name=None, user_id=None):
+        calls.append((task_type, data))
+        return f"job-{len(calls)}"
+
+    monkeypatch.setattr(worker.db, "read_connection", connection)
+    monkeypatch.setattr(worker, "enqueue_task", enqueue_task)
+    monkeypatch.setattr(worker, "get_supabase", lambda: None)
+    return calls
+
+
+def test_generate_proxy_queues_audio_analysis_after_the_proxy(monkeypatch, enqueued):
+    uploads = []
+
+    @contextmanager
+    def cached_source(supabase, video_id):
+        yield f"/media/{video_id}.mp4"
+
+    def build_proxy(source, output):
+        assert not enqueued
+        open(output, "wb").close()
+
+    monkeypatch.setattr(worker, "cached_source", cached_source)
+    monkeypatch.setattr(worker, "build_proxy", build_proxy)
+    monkeypatch.setattr(
+        worker.storage_transfer, "upload_file",
+        lambda bucket, path, *args, **kwargs: uploads.append(path)
+    )
+
+    result = worker.generate_proxy({"video_id": "v1"})
+
+    assert result["success"]
+    assert uploads == ["proxies/v1.mp4"]
+    assert enqueued == [
+        ("analyze_audio", {"project_id": "p1"}),
+        ("analyze_audio", {"project_id": "p2"}),
+    ]
+    assert result["analysis_jobs"] == ["job-1", "job-2"]
+
+
+def test_failed_proxy_still_queues_audio_analysis(monkeypatch, enqueued):
+    @contextmanager
+    def cached_source(supabase, video_id):
+        raise RuntimeError("source missing")
+        yield
+
+    monkeypatch.setattr(worker, "cached_source", cached_source)
+
+    result = worker.generate_proxy({"video_id": "v2"})
+
+    assert not result["success"]
+    assert enqueued == [("analyze_audio", {"project_id": "p3"})]
+
+
+def test_video_without_projects_still_gets_its_waveform(monkeypatch, enqueued):
+    monkeypatch.setattr(worker, "cached_source", lambda *args: None)
+
+    worker.generate_proxy({"video_id": "v3"})
+
+    assert enqueued == [("analyze_audio", {"video_id": "v3"})]
+
+
+class RecordingConnection:
+    """Records the statements it is asked to run."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, query, *args):
+        self.statements.append((" ".join(query.split()), args))
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    conn = RecordingConnection()
+
+    @asynccontextmanager
+    async def connection():
+        yield conn
+
+    monkeypatch.setattr(worker.db, "connection", connection)
+    return conn.statements
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, result", [
+    ("processing", None),
+    ("completed", {"result_url": "preview.mp4", "tier": "preview"}),
+    ("failed", {"error": "boom"}),
+])
+async def test_preview_jobs_leave_final_results_alone(recorded, status, result):
+    await worker._set_clip_status(["op1"], status, result, worker.PREVIEW)
+
+    query, _ = recorded[0]
+    assert "IS DISTINCT FROM 'final'" in query
+
+
+@pytest.mark.asyncio
+async def test_final_jobs_update_every_row(recorded):
+    await worker._set_clip_status(["op1"], "completed", {"tier": "final"}, worker.FINAL)
+
+    query, args = recorded[0]
+    assert "'final'" not in query
+    assert args[2] == ["op1"]
+
+
+def test_progress_ticks_only_go_out_as_realtime_events(monkeypatch):
+    events = []
+    monkeypatch.setattr(
+        worker, "_emit_timeline_update",
+        lambda project_id, payload, coalesce=False: events.append((project_id, payload, coalesce))
+    )
+
+    worker._job_progress("p1", ["op1", "op2"], worker.PREVIEW).publish(42.04)
+
+    assert events == [
+        ("p1", {"operation_id": op, "status": "processing", "tier": "preview", "progress": 42.0}, True)
+        for op in ("op1", "op2")
+    ]
+
+
+def test_finished_job_updates_every_attached_clip_row(monkeypatch):
+    updates, events = [], []
+
+    async def set_clip_status(operation_ids, status, result=None, tier=worker.FINAL):
+        updates.append((status, operation_ids))
+
+    async def get_project_video_id(project_id):
+        return "v1"
+
+    async def process_operation(data, video_id, supabase):
+        return {"result_url": "clip.mp4", "tier": data["render_tier"]}
+
+    class CurrentJob:
+        id = "job-1"
+
+    monkeypatch.setattr(worker, "_set_clip_status", set_clip_status)
+    monkeypatch.setattr(worker, "_get_project_video_id", get_project_video_id)
+    monkeypatch.setattr(worker, "process_operation", process_operation)
+    monkeypatch.setattr(worker, "get_supabase", lambda: None)
+    monkeypatch.setattr(worker, "get_current_job", CurrentJob)
+    monkeypatch.setattr(
+        worker, "close_operations",
+        lambda job_id, operation_ids: sorted(set(operation_ids) | {"op2"})
+    )
+    monkeypatch.setattr(
+        worker, "_emit_timeline_update",
+        lambda project_id, payload, coalesce=False: events.append(payload["operation_id"])
+    )
+    monkeypatch.setattr(worker.realtime_publisher, "flush", lambda: None)
+
+    result = worker.process_clip({
+        "operation_id": "op1",
+        "project_id": "p1",
+        "operation_type": "cut",
+        "render_tier": worker.PREVIEW
+    })
+
+    assert result["success"]
+    assert updates == [("processing", ["op1"]), ("completed", ["op1", "op2"])]
+    assert events == ["op1", "op2"]
+
+
+class LoopBoundPool:
+    """Pool that, like asyncpg's, only works on the loop it was made in."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+    @asynccontextmanager
+    async def acquire(self):
+        if asyncio.get_running_loop() is not self.loop:
+            raise RuntimeError("pool is attached to a different loop")
+        yield self
+
+    @asynccontextmanager
+    async def _transaction(self):
+        yield
+
+    def transaction(self, readonly=False):
+        return self._transaction()
+
+    async def fetchrow(self, query, project_id):
+        return {"video_id": f"video-of-{project_id}"}
+
+
+def test_in_process_jobs_share_the_database_pool(monkeypatch):
+    pools = []
+
+    async def create_pool(*args, **kwargs):
+        pools.append(LoopBoundPool())
+        return pools[-1]
+
+    monkeypatch.setattr(app_db.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(worker, "db", app_db.Database(dsn="postgres://test", replica_dsns=[]))
+
+    # Two jobs in a row, as an in-process worker runs them
+    assert worker._run_async(worker._get_project_video_id("p1")) == "video-of-p1"
+    assert worker._run_async(worker._get_project_video_id("p2")) == "video-of-p2"
+    assert len(pools) == 1
+
+
+class StubMediaInfo:
+    duration = 20.0
+    has_audio = True
+
+    def keyframe_scan(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_speed_renders_the_same_alone_and_fused(monkeypatch):
+    plans = []
+
+    @contextmanager
+    def cached_source(supabase, video_id, object_path=None):
+        yield f"/media/{video_id}.mp4"
+
+    async def load_media_info(path, content_hash=None, keyframes=True):
+        return StubMediaInfo()
+
+    def render(source, plan, output_path, has_audio=None, **kwargs):
+        plans.append(plan)
+
+    monkeypatch.setattr(worker, "_source_object", lambda supabase, video_id, tier: ("videos/v1.mp4", None))
+    monkeypatch.setattr(worker, "cached_source", cached_source)
+    monkeypatch.setattr(worker, "load_media_info", load_media_info)
+    monkeypatch.setattr(worker.chunked_render, "render", render)
+    monkeypatch.setattr(worker, "_upload_render", lambda *args: "https://assets/result.mp4")
+
+    speed = {
+        "operation_id": "op1",
+        "operation_type": "speed",
+        "start_time": 5.0,
+        "end_time": 10.0,
+        "parameters": {"speed_factor": 2.0},
+    }
+    alone = await worker.process_operation(speed, "v1", None)
+    fused = await worker.render_plan({"plan_id": "plan1", "operations": [speed]}, "v1", None)
+
+    assert plans[0] == plans[1]
+    # The rest of the video is kept around the sped-up range
+    assert alone["duration"] == fused["duration"] == 17.5